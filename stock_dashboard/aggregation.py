@@ -0,0 +1,44 @@
+"""
+🕯️ 봉 단위 변환 (일봉 → 주봉/월봉)
+- 시가=첫 값, 고가=최대, 저가=최소, 종가=마지막 값, 거래량=합계
+- 조회 기간 길이와 목표 캔들 수를 보고 봉 단위를 자동으로 고름
+- 긴 기간(3년/5년) 차트에서 브라우저로 보내는 점 개수를 줄이기 위한 용도
+"""
+
+import numpy as np
+import pandas as pd
+
+TIMEFRAMES = {'D': '일봉', 'W': '주봉', 'M': '월봉'}
+TIMEFRAME_UNITS = {'D': '일', 'W': '주', 'M': '월'}
+TRADING_DAYS = {'D': 1, 'W': 5, 'M': 21}  # 봉 하나에 들어가는 대략적인 거래일 수
+DEFAULT_TARGET_POINTS = 400
+
+
+def auto_timeframe(n_rows, target_points=DEFAULT_TARGET_POINTS):
+    """일봉 개수가 target_points를 넘지 않는 가장 촘촘한 봉 단위 선택"""
+    for timeframe in ('D', 'W'):
+        if n_rows / TRADING_DAYS[timeframe] <= target_points:
+            return timeframe
+    return 'M'
+
+
+def resample_ohlcv(df, timeframe):
+    """일봉 OHLCV를 주봉/월봉으로 변환 (인덱스는 각 구간의 마지막 거래일)
+
+    정렬된 인덱스에서 구간이 연속으로 붙어 있으므로 groupby 대신 ufunc.reduceat으로 한 번에 집계합니다.
+    """
+    if timeframe == 'D' or df is None or df.empty:
+        return df
+
+    periods = df.index.to_period(timeframe).asi8
+    starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+    ends = np.r_[starts[1:] - 1, len(df) - 1]
+
+    out = {
+        'Open': df['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(df['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(df['Low'].to_numpy(), starts),
+        'Close': df['Close'].to_numpy()[ends],
+        'Volume': np.add.reduceat(df['Volume'].to_numpy(), starts)
+    }
+    return pd.DataFrame(out, index=df.index[ends])
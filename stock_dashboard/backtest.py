@@ -0,0 +1,223 @@
+"""
+🧪 벡터화 백테스트
+- 차트에 그리는 신호(이동평균 교차, 볼린저 밴드 터치)를 포지션 배열로 바꿔 성과를 계산
+- 봉마다 도는 Python 반복문 없이 NumPy 배열 연산만 사용
+- 포지션/성과 함수는 (전략 수 × 거래일) 2차원 배열도 받으므로 파라미터 조합 전체를 한 번에 계산
+- 여러 종목 파라미터 스윕은 공용 프로세스 풀에서 종목 묶음 단위로 병렬 처리
+"""
+
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from indicators import compute_arrays
+from ohlcv_store import OHLCVStore, to_timestamp
+from process_pool import chunked, get_process_pool
+
+TRADING_DAYS_PER_YEAR = 252
+DEFAULT_COST = 0.0015           # 매수/매도 한 번당 비용 (수수료 + 세금 근사)
+DEFAULT_SWEEP_WINDOWS = tuple(range(5, 121, 5))
+SIGNAL_HISTORY = timedelta(days=200)  # 가장 긴 이동평균 계산용으로 시작일 이전에 더 읽는 기간
+
+METRIC_LABELS = {
+    'total_return': '총 수익률(%)',
+    'cagr': '연환산 수익률(%)',
+    'sharpe': '샤프 지수',
+    'max_drawdown': '최대 낙폭(%)',
+    'trades': '거래 수',
+    'win_rate': '승률(%)',
+    'exposure': '보유 비중(%)'
+}
+
+
+# ==================== 신호 → 포지션 ====================
+
+def crossover_positions(fast, slow):
+    """단기선이 장기선 위에 있으면 1, 아니면 0 (어느 한쪽이 NaN이면 0)"""
+    with np.errstate(invalid="ignore"):
+        return (fast > slow).astype(float)
+
+
+def _hold_last_event(events):
+    """마지막 사건(1=진입, 0=청산)을 다음 사건 전까지 유지, 사건 전은 0 (마지막 축 기준)"""
+    valid = ~np.isnan(events)
+    idx = np.where(valid, np.arange(events.shape[-1]), 0)
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    held = np.take_along_axis(np.where(valid, events, 0.0), idx, axis=-1)
+    return held
+
+
+def band_touch_positions(close, lower, middle):
+    """종가가 하단 밴드 이하로 내려오면 진입, 중심선 이상으로 돌아오면 청산"""
+    events = np.full(np.broadcast(close, lower, middle).shape, np.nan)
+    with np.errstate(invalid="ignore"):
+        events[close >= middle] = 0.0
+        events[close <= lower] = 1.0
+    return _hold_last_event(events)
+
+
+def moving_averages(close, windows):
+    """여러 기간 단순이동평균을 누적합 하나로 계산 → (기간 수, 거래일)"""
+    c = np.concatenate(([0.0], np.cumsum(close - close[0])))
+    out = np.full((len(windows), len(close)), np.nan)
+    for i, w in enumerate(windows):
+        if len(close) >= w:
+            out[i, w - 1:] = (c[w:] - c[:-w]) / w + close[0]
+    return out
+
+
+def bollinger(close):
+    """(하단, 중심, 상단) 밴드 (차트와 같은 indicators의 BB 정의)"""
+    bands = compute_arrays({'Close': close}, ['BB'])
+    return bands['BB_Lower'], bands['BB_Middle'], bands['BB_Upper']
+
+
+# ==================== 성과 ====================
+
+def simulate(close, positions, cost=DEFAULT_COST):
+    """포지션(마지막 축 = 거래일) → (전략 일간 수익률, 누적 자산, 낙폭)
+
+    t일 종가에 나온 신호로 t+1일부터 보유하므로 미래 정보를 쓰지 않습니다.
+    """
+    close = np.asarray(close, dtype=float)
+    asset_returns = np.zeros_like(close)
+    asset_returns[1:] = close[1:] / close[:-1] - 1
+
+    held = np.zeros_like(positions, dtype=float)
+    held[..., 1:] = positions[..., :-1]
+    turnover = np.abs(np.diff(held, axis=-1, prepend=0.0))
+    strategy = held * asset_returns - turnover * cost
+
+    equity = np.cumprod(1 + strategy, axis=-1)
+    drawdown = equity / np.maximum.accumulate(equity, axis=-1) - 1
+    return strategy, equity, drawdown, held
+
+
+def performance(close, positions, cost=DEFAULT_COST):
+    """전략별 성과 지표 dict (값은 전략 수 길이 배열, 1차원 입력이면 스칼라 배열)"""
+    positions = np.atleast_2d(positions)
+    strategy, equity, drawdown, held = simulate(close, positions, cost)
+    n_days = strategy.shape[-1]
+
+    total = equity[:, -1] - 1
+    years = max(n_days / TRADING_DAYS_PER_YEAR, 1 / TRADING_DAYS_PER_YEAR)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cagr = np.sign(1 + total) * np.abs(1 + total) ** (1 / years) - 1
+        sharpe = strategy.mean(axis=-1) / strategy.std(axis=-1, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+    # 거래 구분: 보유 시작(0→1)과 종료(1→0) 위치를 양끝에 0을 붙인 차분으로 찾음
+    edges = np.diff(np.pad(held, ((0, 0), (1, 1))), axis=-1)
+    entry_rows, entry_days = np.nonzero(edges > 0)
+    _, exit_days = np.nonzero(edges < 0)
+    # 청산 비용은 보유를 끝낸 날에 붙으므로 그날까지 포함 (마지막까지 보유한 거래는 마지막 날까지)
+    exit_days = np.minimum(exit_days + 1, n_days)
+    log_equity = np.pad(np.cumsum(np.log1p(strategy), axis=-1), ((0, 0), (1, 0)))
+    trade_returns = np.exp(log_equity[entry_rows, exit_days] - log_equity[entry_rows, entry_days]) - 1
+
+    n_rows = len(positions)
+    trades = np.bincount(entry_rows, minlength=n_rows)
+    wins = np.bincount(entry_rows, weights=trade_returns > 0, minlength=n_rows)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_rate = np.where(trades > 0, wins / trades, np.nan)
+
+    return {
+        'total_return': total * 100,
+        'cagr': cagr * 100,
+        'sharpe': sharpe,
+        'max_drawdown': drawdown.min(axis=-1) * 100,
+        'trades': trades,
+        'win_rate': win_rate * 100,
+        'exposure': held.mean(axis=-1) * 100
+    }
+
+
+# ==================== 파라미터 스윕 ====================
+
+def ma_pairs(windows=DEFAULT_SWEEP_WINDOWS):
+    """(단기 위치, 장기 위치) 배열: 단기 < 장기인 모든 조합"""
+    fast, slow = np.triu_indices(len(windows), k=1)
+    return fast, slow
+
+
+def sweep_ma_crossover(close, windows=DEFAULT_SWEEP_WINDOWS, cost=DEFAULT_COST, trade_from=0):
+    """모든 이동평균 조합 성과 DataFrame (columns: fast, slow, 지표들)
+
+    trade_from 이전 위치는 이동평균 계산에만 쓰고 거래하지 않습니다.
+    """
+    close = np.asarray(close, dtype=float)
+    mas = moving_averages(close, windows)
+    fast, slow = ma_pairs(windows)
+    positions = crossover_positions(mas[fast], mas[slow])[:, trade_from:]
+    metrics = performance(close[trade_from:], positions, cost)
+    windows = np.asarray(windows)
+    return pd.DataFrame({'fast': windows[fast], 'slow': windows[slow], **metrics})
+
+
+def _sweep_chunk(store_root, codes, start, end, windows, cost):
+    """작업 프로세스: 저장소에서 종목을 읽어 종목별 스윕 결과를 이어 붙인 DataFrame 반환"""
+    store = OHLCVStore(store_root)
+    first, begin, last = (np.datetime64(t) for t in (start - SIGNAL_HISTORY, start, end))
+    results = []
+    for code in codes:
+        loaded = store.read_columns(code, ('Close',))
+        if loaded is None:  # 데이터가 없는 종목은 건너뜀 (한 종목 백테스트와 같은 처리)
+            continue
+        dates, data = loaded
+        lo, hi = np.searchsorted(dates, first), np.searchsorted(dates, last, side='right')
+        trade_from = np.searchsorted(dates, begin) - lo
+        if hi - lo - trade_from < 2:
+            continue
+        result = sweep_ma_crossover(data['Close'][lo:hi], windows, cost, trade_from)
+        result.insert(0, 'code', code)
+        results.append(result)
+    return pd.concat(results, ignore_index=True) if results else None
+
+
+class Backtester:
+    """여러 종목 이동평균 교차 스윕 (공용 프로세스 풀 사용, 결과는 잠시 보관)"""
+
+    def __init__(self, market_data, chunk_size=20, ttl=300, pool=None):
+        self.market_data = market_data
+        self.chunk_size = chunk_size
+        self.ttl = ttl
+        self.pool = pool
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def sweep_many(self, codes, start, end, windows=DEFAULT_SWEEP_WINDOWS, cost=DEFAULT_COST):
+        """종목 × 이동평균 조합 성과 DataFrame (columns: code, fast, slow, 지표들)"""
+        start, end = to_timestamp(start), to_timestamp(end)
+        windows = tuple(windows)
+        key = (tuple(codes), start, end, windows, cost)
+        with self._lock:
+            cached = self._results.get(key)
+        if cached is not None and time.time() - cached[0] < self.ttl:
+            return cached[1]
+
+        # 저장소에 없는 종목/구간은 먼저 받아 둠 (작업 프로세스는 저장소 파일만 읽음)
+        self.market_data.ensure_stored(codes, start - SIGNAL_HISTORY, end)
+
+        chunks = chunked(list(codes), self.chunk_size)
+        n = len(chunks)
+        pool = self.pool or get_process_pool()
+        parts = pool.map(_sweep_chunk, [self.market_data.store.root] * n, chunks,
+                         [start] * n, [end] * n, [windows] * n, [cost] * n)
+        parts = [p for p in parts if p is not None]
+        table = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+        with self._lock:
+            self._results = {k: v for k, v in self._results.items() if time.time() - v[0] < self.ttl}
+            self._results[key] = (time.time(), table)
+        return table
+
+
+def summarize_sweep(table):
+    """종목별 결과를 (단기, 장기) 조합별 평균/중앙값으로 요약"""
+    grouped = table.groupby(['fast', 'slow'])
+    summary = grouped[list(METRIC_LABELS)].mean()
+    summary['median_return'] = grouped['total_return'].median()
+    summary['positive_ratio'] = (table['total_return'] > 0).groupby([table['fast'], table['slow']]).mean() * 100
+    return summary.reset_index()
@@ -0,0 +1,264 @@
+"""
+⏱️ 대시보드 핵심 함수 마이크로벤치마크
+- 합성 데이터(synthetic_data.py)로 행 수(1천~1백만)/종목 수(10~3,000)를 바꿔 가며 측정
+- 함수마다 실행 시간(중앙값/최솟값)과 최대 메모리(tracemalloc) 기록
+- 저장해 둔 기준값(baseline)과 비교해 기준보다 느려진 항목을 표시하고 종료 코드 1 반환
+
+    python benchmark.py                          # 전체 실행
+    python benchmark.py --quick --only chart     # 작은 크기, 이름에 chart가 들어간 항목만
+    python benchmark.py --save-baseline benchmark_baseline.json
+    python benchmark.py --baseline benchmark_baseline.json --threshold 0.2
+"""
+
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+import warnings
+from dataclasses import dataclass
+from typing import Callable
+
+ROW_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+TICKER_SIZES = (10, 300, 3_000)
+QUICK_ROW_SIZES = (1_000, 10_000)
+QUICK_TICKER_SIZES = (10, 300)
+SEARCH_QUERIES = ("삼성", "ㅅㅅ", "0001", "전자", "ㅎㄷㅈㄱ")
+MIN_COMPARED_BYTES = 1 << 20  # 이보다 작은 메모리 사용량은 비교하지 않음 (작은 값의 비율은 잡음이 큼)
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    kind: str                 # "rows" 또는 "tickers"
+    prepare: Callable         # prepare(size) -> 측정할 함수 (준비 시간은 측정하지 않음)
+    max_size: int = None      # 이보다 큰 크기는 건너뜀 (너무 오래 걸리는 항목)
+
+
+BENCHMARKS = []
+
+
+def benchmark(name, kind="rows", max_size=None):
+    """벤치마크 등록 데코레이터"""
+    def decorator(prepare):
+        BENCHMARKS.append(Benchmark(name, kind, prepare, max_size))
+        return prepare
+    return decorator
+
+
+# ==================== 벤치마크 목록 ====================
+
+@benchmark("indicators.compute (calculate_indicators, 처음 계산)")
+def _indicators_cold(rows):
+    from indicators import IndicatorEngine
+    from synthetic_data import synthetic_ohlcv
+
+    df = synthetic_ohlcv(rows)
+    return lambda: IndicatorEngine().compute("BENCH", df, ("MA", "Daily_Return", "BB"))
+
+
+@benchmark("indicators.compute (calculate_indicators, 새 봉 1개)")
+def _indicators_incremental(rows):
+    from indicators import IndicatorEngine
+    from synthetic_data import synthetic_ohlcv
+
+    df = synthetic_ohlcv(rows)
+    engine = IndicatorEngine()
+    engine.compute("BENCH", df.iloc[:-1], ("MA", "Daily_Return", "BB"))
+    return lambda: engine.compute("BENCH", df, ("MA", "Daily_Return", "BB"))
+
+
+@benchmark("stats.calculate_stats")
+def _calculate_stats(rows):
+    from indicators import compute_indicators
+    from stats import calculate_stats
+    from synthetic_data import synthetic_ohlcv
+
+    df = synthetic_ohlcv(rows)
+    indicators = compute_indicators(df, ["Daily_Return"])
+    return lambda: calculate_stats(df, indicators)
+
+
+@benchmark("charts.create_candlestick_chart + JSON", max_size=100_000)
+def _candlestick_chart(rows):
+    import plotly.io as pio
+
+    from charts import create_candlestick_chart
+    from indicators import compute_indicators
+    from synthetic_data import synthetic_ohlcv
+
+    df = synthetic_ohlcv(rows)
+    indicators = compute_indicators(df, ["MA", "BB"])
+
+    def run():
+        fig = create_candlestick_chart(df, "BENCH", show_bb=True, indicators=indicators)
+        return pio.to_json(fig, validate=False)
+    return run
+
+
+@benchmark("mpl_charts.render_chart (plot_chart)", max_size=10_000)
+def _plot_chart(rows):
+    from mpl_charts import render_chart
+    from synthetic_data import synthetic_ohlcv
+
+    df = synthetic_ohlcv(rows)
+
+    def run():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # mplfinance의 "데이터가 너무 많음" 경고
+            return render_chart(df)
+    return run
+
+
+@benchmark("aggregation.resample_ohlcv (주봉)")
+def _resample(rows):
+    from aggregation import resample_ohlcv
+    from synthetic_data import synthetic_ohlcv
+
+    df = synthetic_ohlcv(rows)
+    return lambda: resample_ohlcv(df, "W")
+
+
+@benchmark("table_view 종가순 정렬 + 날짜 필터 + 한 페이지 (정렬 캐시 없음)")
+def _table_page(rows):
+    from synthetic_data import synthetic_ohlcv
+    from table_view import filter_dates, sort_positions, table_page
+
+    df = synthetic_ohlcv(rows)
+    start = df.index[len(df) // 2]
+
+    def run():
+        positions = filter_dates(df, sort_positions(df, '종가', ascending=False), start=start)
+        return table_page(df, positions, page=3, page_size=50)
+    return run
+
+
+@benchmark("search_index.SearchIndex (색인 생성)", kind="tickers")
+def _search_build(tickers):
+    from search_index import SearchIndex
+    from synthetic_data import synthetic_listing
+
+    listing = synthetic_listing(tickers)
+    return lambda: SearchIndex(listing)
+
+
+@benchmark("search_index.search (검색어 5개)", kind="tickers")
+def _search(tickers):
+    from search_index import SearchIndex
+    from synthetic_data import synthetic_listing
+
+    index = SearchIndex(synthetic_listing(tickers))
+    return lambda: [index.search(query) for query in SEARCH_QUERIES]
+
+
+@benchmark("comparison 정렬 + 상관계수 행렬 (종목당 750행)", kind="tickers")
+def _comparison(tickers):
+    from comparison import align_closes, correlation_matrix, returns
+    from synthetic_data import synthetic_ohlcv
+
+    frames = {f"{i:06d}": synthetic_ohlcv(750, seed=i) for i in range(tickers)}
+    return lambda: correlation_matrix(returns(align_closes(frames).closes))
+
+
+@benchmark("backtest.sweep_ma_crossover (276개 조합)", max_size=10_000)
+def _backtest_sweep(rows):
+    from backtest import sweep_ma_crossover
+    from synthetic_data import synthetic_ohlcv
+
+    close = synthetic_ohlcv(rows)["Close"].to_numpy()
+    return lambda: sweep_ma_crossover(close)
+
+
+# ==================== 실행 / 비교 ====================
+
+def measure(prepare, size, repeat):
+    """(시간 목록, 최대 메모리 바이트) — 시간은 tracemalloc 없이, 메모리는 한 번 더 실행해서 측정"""
+    times = []
+    for _ in range(repeat):
+        fn = prepare(size)
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    fn = prepare(size)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return times, peak
+
+
+def run(only=None, quick=False, repeat=5):
+    """{"이름 [크기]": {"median_s", "min_s", "peak_bytes"}}"""
+    results = {}
+    for bench in BENCHMARKS:
+        if only and only not in bench.name:
+            continue
+        if bench.kind == "rows":
+            sizes = QUICK_ROW_SIZES if quick else ROW_SIZES
+        else:
+            sizes = QUICK_TICKER_SIZES if quick else TICKER_SIZES
+        for size in sizes:
+            if bench.max_size and size > bench.max_size:
+                continue
+            # 큰 크기는 반복 횟수를 줄임
+            times, peak = measure(bench.prepare, size, repeat if size <= 100_000 else max(1, repeat // 3))
+            key = f"{bench.name} [{bench.kind}={size:,}]"
+            results[key] = {
+                "median_s": statistics.median(times),
+                "min_s": min(times),
+                "peak_bytes": peak
+            }
+            print(f"{key:<75} {results[key]['median_s'] * 1000:>10.2f} ms {peak / 2 ** 20:>9.1f} MiB", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold=0.2):
+    """기준값보다 threshold(비율) 이상 느려지거나 메모리가 늘어난 항목 목록"""
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        time_ratio = current["median_s"] / base["median_s"] if base["median_s"] else 1.0
+        if max(current["peak_bytes"], base["peak_bytes"]) < MIN_COMPARED_BYTES or not base["peak_bytes"]:
+            memory_ratio = 1.0
+        else:
+            memory_ratio = current["peak_bytes"] / base["peak_bytes"]
+        if time_ratio > 1 + threshold or memory_ratio > 1 + threshold:
+            regressions.append((key, time_ratio, memory_ratio))
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="대시보드 핵심 함수 벤치마크")
+    parser.add_argument("--only", help="이름에 이 문자열이 들어간 항목만 실행")
+    parser.add_argument("--quick", action="store_true", help="작은 크기만 실행")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save-baseline", metavar="PATH", help="결과를 기준값으로 저장")
+    parser.add_argument("--baseline", metavar="PATH", help="기준값과 비교")
+    parser.add_argument("--threshold", type=float, default=0.2, help="허용 증가 비율 (기본 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = run(args.only, args.quick, args.repeat)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"기준값 저장: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for key, time_ratio, memory_ratio in regressions:
+            print(f"⚠️ {key}: 시간 ×{time_ratio:.2f}, 메모리 ×{memory_ratio:.2f}")
+        if regressions:
+            sys.exit(1)
+        print("기준값 대비 성능 저하 없음")
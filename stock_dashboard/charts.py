@@ -0,0 +1,238 @@
+"""
+📊 Plotly 캔들스틱 차트
+- 차트 생성 함수와 생성된 Figure 캐시
+- 같은 (종목, 기간, 봉 단위, 표시 옵션, 데이터)면 Figure를 다시 만들지 않음
+- 점 개수가 많으면 선 그래프를 WebGL(Scattergl)로 그림
+  (거래량 막대는 Plotly에 WebGL 버전이 없어 그대로 Bar 사용)
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+
+import metrics
+
+UP_COLOR = '#FF4B4B'
+DOWN_COLOR = '#4B8BFF'
+WEBGL_THRESHOLD = 1000  # 이보다 행이 많으면 선 그래프를 WebGL로
+
+
+def create_candlestick_chart(df, stock_name, show_volume=True, show_ma=True, show_bb=False,
+                             sub_indicators=(), ma_unit='일', indicators=None):
+    """Plotly를 사용한 캔들스틱 차트 생성
+
+    지표는 원본과 같은 인덱스의 별도 DataFrame(indicators)으로 받음 (없으면 df에서 찾음)
+    """
+    if df is None or df.empty:
+        return None
+    ind = indicators if indicators is not None else df
+    
+    # 점이 많으면 선 그래프는 WebGL로 그림
+    scatter = go.Scattergl if len(df) > WEBGL_THRESHOLD else go.Scatter
+    
+    # 서브플롯 설정 (주가 → 거래량 → 보조 지표 순, 높이는 비율로 자동 정규화)
+    titles = [f'{stock_name} 주가 차트']
+    row_heights = [0.7]
+    if show_volume:
+        titles.append('거래량')
+        row_heights.append(0.3)
+    titles.extend(sub_indicators)
+    row_heights.extend([0.25] * len(sub_indicators))
+    rows = len(titles)
+    
+    fig = make_subplots(
+        rows=rows, cols=1,
+        shared_xaxes=True,  # 수정: shared_xaxis -> shared_xaxes
+        vertical_spacing=0.03,
+        row_heights=row_heights,
+        subplot_titles=tuple(titles)
+    )
+    
+    # 캔들스틱
+    fig.add_trace(
+        go.Candlestick(
+            x=df.index,
+            open=df['Open'],
+            high=df['High'],
+            low=df['Low'],
+            close=df['Close'],
+            name='OHLC',
+            increasing_line_color=UP_COLOR,
+            decreasing_line_color=DOWN_COLOR
+        ),
+        row=1, col=1
+    )
+    
+    # 이동평균선
+    if show_ma:
+        ma_configs = [
+            ('MA5', '#00CC96', f'5{ma_unit}'),
+            ('MA20', '#AB63FA', f'20{ma_unit}'),
+            ('MA60', '#FFA15A', f'60{ma_unit}')
+        ]
+        for ma_col, color, name in ma_configs:
+            if ma_col in ind.columns:
+                fig.add_trace(
+                    scatter(
+                        x=df.index,
+                        y=ind[ma_col],
+                        name=name,
+                        line=dict(color=color, width=1.5),
+                        opacity=0.7
+                    ),
+                    row=1, col=1
+                )
+    
+    # 볼린저 밴드
+    if show_bb and 'BB_Upper' in ind.columns:
+        fig.add_trace(
+            scatter(
+                x=df.index,
+                y=ind['BB_Upper'],
+                name='BB Upper',
+                line=dict(color='gray', width=1, dash='dash'),
+                opacity=0.3
+            ),
+            row=1, col=1
+        )
+        fig.add_trace(
+            scatter(
+                x=df.index,
+                y=ind['BB_Lower'],
+                name='BB Lower',
+                line=dict(color='gray', width=1, dash='dash'),
+                fill='tonexty',
+                opacity=0.1
+            ),
+            row=1, col=1
+        )
+    
+    # 거래량
+    if show_volume:
+        colors = np.where(df['Close'].to_numpy() >= df['Open'].to_numpy(), UP_COLOR, DOWN_COLOR)
+        fig.add_trace(
+            go.Bar(
+                x=df.index,
+                y=df['Volume'],
+                name='거래량',
+                marker_color=colors,
+                opacity=0.7
+            ),
+            row=2, col=1
+        )
+    
+    # 보조 지표
+    first_sub_row = 3 if show_volume else 2
+    for row, name in enumerate(sub_indicators, start=first_sub_row):
+        add_sub_indicator(fig, ind, name, row, scatter)
+    
+    # 레이아웃
+    fig.update_layout(
+        height=700 + 175 * len(sub_indicators),
+        showlegend=True,
+        xaxis_rangeslider_visible=False,
+        hovermode='x unified',
+        template='plotly_white',
+        margin=dict(l=50, r=50, t=50, b=50)
+    )
+    
+    fig.update_xaxes(showgrid=True, gridwidth=0.5, gridcolor='lightgray')
+    fig.update_yaxes(showgrid=True, gridwidth=0.5, gridcolor='lightgray')
+    
+    return fig
+
+
+def add_sub_indicator(fig, df, name, row, scatter=go.Scatter):
+    """보조 지표 서브플롯 추가"""
+    line_configs = {
+        'RSI': [('RSI', '#AB63FA', 'RSI(14)')],
+        'MACD': [('MACD', '#00CC96', 'MACD'), ('MACD_Signal', '#FFA15A', 'Signal')],
+        'Stochastic': [('Stoch_K', '#00CC96', '%K'), ('Stoch_D', '#FFA15A', '%D')],
+        'ATR': [('ATR', '#AB63FA', 'ATR(14)')]
+    }
+    for col, color, label in line_configs[name]:
+        fig.add_trace(
+            scatter(x=df.index, y=df[col], name=label, line=dict(color=color, width=1.2)),
+            row=row, col=1
+        )
+    
+    if name == 'MACD':
+        fig.add_trace(
+            go.Bar(
+                x=df.index,
+                y=df['MACD_Hist'],
+                name='MACD Hist',
+                marker_color=np.where(df['MACD_Hist'].to_numpy() >= 0, UP_COLOR, DOWN_COLOR),
+                opacity=0.5
+            ),
+            row=row, col=1
+        )
+    elif name in ('RSI', 'Stochastic'):
+        # 과매수/과매도 기준선
+        upper, lower = (70, 30) if name == 'RSI' else (80, 20)
+        for level in (upper, lower):
+            fig.add_hline(y=level, line=dict(color='gray', width=1, dash='dot'), row=row, col=1)
+
+
+def frame_signature(df):
+    """캐시 키에 넣을 데이터 식별값 (행 수 + 마지막 봉, 장중 갱신/새 봉이 붙으면 달라짐)"""
+    if df is None or df.empty:
+        return (0,)
+    last = df.iloc[-1]
+    return (len(df), df.index[0], df.index[-1], float(last['Close']), float(last['Volume']))
+
+
+class FigureCache:
+    """생성된 Figure를 보관하는 LRU 캐시 (세션 간 공유)
+
+    st.plotly_chart는 받은 Figure를 매번 직접 직렬화하므로 JSON은 보관하지 않고,
+    성능 패널용 전송 크기만 요청이 있을 때 한 번 계산해 둡니다 (json_size).
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> Figure
+        self._sizes = {}               # key -> 직렬화한 JSON 크기(바이트)
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """key에 해당하는 Figure 반환, 없으면 build()로 생성 후 저장"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                metrics.cache_event("figure", "hit")
+                return self._entries[key]
+
+        metrics.cache_event("figure", "miss")
+        fig = build()
+
+        with self._lock:
+            self._entries[key] = fig
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                old, _ = self._entries.popitem(last=False)
+                self._sizes.pop(old, None)
+        return fig
+
+    def json_size(self, key):
+        """key의 Figure를 직렬화한 JSON 크기 (처음 요청할 때만 직렬화, 없으면 0)"""
+        with self._lock:
+            fig = self._entries.get(key)
+            size = self._sizes.get(key)
+        if fig is None:
+            return 0
+        if size is None:
+            size = len(pio.to_json(fig, validate=False))
+            with self._lock:
+                if key in self._entries:
+                    self._sizes[key] = size
+        return size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
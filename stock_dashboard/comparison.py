@@ -0,0 +1,144 @@
+"""
+📊 여러 종목 비교 / 상관관계
+- 종목별 종가를 공통 거래일 인덱스에 맞춰 (거래일 × 종목) 2차원 배열로 정렬
+- 기준일 대비 수익률(정규화), 기준 종목과의 이동 상관계수, 상관계수 행렬을 전체 종목에 대해 한 번에 계산
+- 종목 쌍마다 pandas를 도는 대신 누적합과 행렬곱으로 계산하므로 100개 이상 종목도 빠름
+- 거래 정지/상장 전처럼 값이 없는 칸은 NaN으로 두고, 두 종목 모두 값이 있는 날만 상관계수에 사용
+"""
+
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CORR_WINDOW = 60
+
+
+@dataclass
+class AlignedCloses:
+    index: pd.DatetimeIndex  # 공통 거래일
+    codes: list
+    closes: np.ndarray       # (거래일 수, 종목 수), 값이 없으면 NaN
+
+    def frame(self, values=None):
+        """closes(또는 같은 모양의 values)를 DataFrame으로"""
+        return pd.DataFrame(self.closes if values is None else values, index=self.index, columns=self.codes)
+
+
+def align_closes(frames, column="Close", fill=True):
+    """{종목코드: OHLCV DataFrame} → AlignedCloses
+
+    인덱스는 모든 종목 거래일의 합집합이며, fill=True이면 중간에 빠진 날(거래 정지 등)은 직전 값으로 채웁니다.
+    """
+    codes = [code for code, df in frames.items() if df is not None and not df.empty]
+    if not codes:
+        return AlignedCloses(pd.DatetimeIndex([]), [], np.empty((0, 0)))
+
+    # 종목마다 datetime 단위(ns/us)가 다를 수 있어 ns로 맞춘 정수로 비교
+    stamps = [pd.DatetimeIndex(frames[code].index).as_unit("ns").asi8 for code in codes]
+    union = np.unique(np.concatenate(stamps))
+    closes = np.full((len(union), len(codes)), np.nan)
+    for j, (code, ts) in enumerate(zip(codes, stamps)):
+        closes[np.searchsorted(union, ts), j] = frames[code][column].to_numpy(dtype=float)
+
+    if fill:
+        closes = forward_fill(closes)
+    index = pd.DatetimeIndex(union.view("datetime64[ns]"))
+    return AlignedCloses(index, codes, closes)
+
+
+def forward_fill(values):
+    """열마다 NaN을 직전 값으로 채움 (앞부분 NaN은 그대로)"""
+    valid = ~np.isnan(values)
+    rows = np.where(valid, np.arange(len(values))[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    filled = values[rows, np.arange(values.shape[1])]
+    # 첫 유효값 이전 구간은 0행 값을 가리키므로 다시 NaN
+    filled[np.cumsum(valid, axis=0) == 0] = np.nan
+    return filled
+
+
+def normalized(closes, base=100.0):
+    """종목마다 첫 유효 종가를 base로 맞춘 값"""
+    valid = ~np.isnan(closes)
+    first = np.argmax(valid, axis=0)
+    start = closes[first, np.arange(closes.shape[1])]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return closes / start * base
+
+
+def returns(closes):
+    """일간 수익률 (첫 행은 NaN)"""
+    out = np.full_like(closes, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = closes[1:] / closes[:-1] - 1
+    return out
+
+
+def correlation_matrix(rets, min_periods=20):
+    """두 종목 모두 값이 있는 날만으로 계산한 상관계수 행렬 (행렬곱 몇 번으로 모든 쌍을 계산)
+
+    n_ij = 공통 관측 수, Σx_i·Σx_j·Σx_i x_j 등을 마스크 행렬곱으로 한 번에 구합니다.
+    """
+    mask = (~np.isnan(rets)).astype(float)
+    x = np.where(mask > 0, rets, 0.0)
+    n = mask.T @ mask
+    sx = x.T @ mask            # [i, j]: i, j 모두 있는 날의 x_i 합
+    sxx = (x * x).T @ mask     # [i, j]: i, j 모두 있는 날의 x_i² 합
+    sxy = x.T @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sx.T / n
+        var_i = sxx - sx * sx / n
+        corr = cov / np.sqrt(var_i * var_i.T)
+    corr[n < min_periods] = np.nan
+    np.fill_diagonal(corr, np.where(np.diag(n) >= min_periods, 1.0, np.nan))
+    return np.clip(corr, -1.0, 1.0)
+
+
+def _window_sum(values, window):
+    """axis=0 방향 길이 window 구간 합 (누적합 차이, 앞부분은 NaN)"""
+    c = np.concatenate((np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)))
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = c[window:] - c[:-window]
+    return out
+
+
+def rolling_correlation(rets, benchmark, window=DEFAULT_CORR_WINDOW):
+    """모든 종목과 benchmark(1차원 수익률) 사이의 window일 이동 상관계수 (거래일 × 종목)
+
+    구간 안에 한쪽이라도 값이 없는 날이 있으면 NaN입니다.
+    """
+    y = benchmark[:, None]
+    mask = ~np.isnan(rets) & ~np.isnan(y)
+    # 전체 평균을 빼고 누적합을 구해 오차를 줄임 (상관계수는 평행 이동에 영향받지 않음)
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # 값이 하나도 없는 종목
+        x = np.where(mask, rets - np.nanmean(np.where(mask, rets, np.nan), axis=0), 0.0)
+        y = np.where(mask, y - np.nanmean(np.where(mask, y, np.nan), axis=0), 0.0)
+
+    n = _window_sum(mask.astype(float), window)
+    sx, sy = _window_sum(x, window), _window_sum(y, window)
+    sxx, syy, sxy = _window_sum(x * x, window), _window_sum(y * y, window), _window_sum(x * y, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / n
+        corr = cov / np.sqrt((sxx - sx * sx / n) * (syy - sy * sy / n))
+    corr[n < window] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def summary(aligned, rets=None):
+    """종목별 기간 수익률(%)/변동성(%)/최대 낙폭(%)"""
+    closes = aligned.closes
+    rets = returns(closes) if rets is None else rets
+    norm = normalized(closes, base=1.0)
+    last = norm[-1] if len(norm) else np.array([])
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # 값이 하나도 없는 종목
+        drawdown = norm / np.fmax.accumulate(norm, axis=0) - 1
+        return pd.DataFrame({
+            "기간 수익률(%)": (last - 1) * 100,
+            "변동성(%)": np.nanstd(rets, axis=0, ddof=1) * 100,
+            "최대 낙폭(%)": np.nanmin(drawdown, axis=0) * 100
+        }, index=aligned.codes)
@@ -0,0 +1,310 @@
+"""
+📥 주가 데이터 내보내기 (CSV / gzip 압축 CSV / Parquet)
+- 화면을 그릴 때는 만들지 않고 내려받기 버튼을 눌렀을 때만 생성 (st.download_button에 callable 전달)
+- 만든 파일은 (종목, 기간, 형식, 데이터)별로 보관해 여러 번/여러 세션이 받아도 한 번만 생성
+  (전체 크기 상한이 있는 LRU 캐시)
+- 여러 종목 일괄 내보내기는 백그라운드 작업으로 종목 묶음 단위로 저장소에서 읽어 디스크 파일에 이어 씀
+  (기간/종목 수가 커도 메모리에는 한 묶음만 올라가고, 화면은 진행률만 확인)
+"""
+
+import gzip
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+import pandas as pd
+
+import metrics
+from process_pool import chunked
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow가 없으면 Parquet 형식은 제공하지 않음
+    pa = pq = None
+
+EXPORT_COLUMNS = {'Open': '시가', 'High': '고가', 'Low': '저가', 'Close': '종가', 'Volume': '거래량'}
+PARQUET_COMPRESSION = "zstd"
+DEFAULT_EXPORT_DIR = os.environ.get("STOCK_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "stock_dashboard_exports"))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    label: str
+    extension: str
+    mime: str
+
+
+FORMATS = {
+    'csv': ExportFormat('CSV', 'csv', 'text/csv'),
+    'csv.gz': ExportFormat('CSV (gzip 압축)', 'csv.gz', 'application/gzip'),
+}
+if pq is not None:
+    FORMATS['parquet'] = ExportFormat(f'Parquet ({PARQUET_COMPRESSION} 압축)', 'parquet', 'application/vnd.apache.parquet')
+
+
+def export_table(df):
+    """내보낼 컬럼만 한글 이름으로 (날짜 오름차순, 원본 DataFrame은 수정하지 않음)"""
+    table = df[list(EXPORT_COLUMNS)].rename(columns=EXPORT_COLUMNS)
+    table.index.name = '날짜'
+    return table
+
+
+def export_frame(df, fmt):
+    """한 종목 DataFrame → 파일 바이트 (CSV는 엑셀에서 한글이 깨지지 않도록 BOM 포함)"""
+    table = export_table(df)
+    if fmt == 'csv':
+        return table.to_csv().encode('utf-8-sig')
+    if fmt == 'csv.gz':
+        return gzip.compress(table.to_csv().encode('utf-8-sig'), compresslevel=6)
+    if fmt == 'parquet' and 'parquet' in FORMATS:
+        buffer = io.BytesIO()
+        table.to_parquet(buffer, compression=PARQUET_COMPRESSION)
+        return buffer.getvalue()
+    raise ValueError(f"지원하지 않는 형식: {fmt}")
+
+
+class ExportCache:
+    """만든 파일 바이트 LRU 캐시 (전체 크기가 max_bytes를 넘으면 오래된 것부터 제거)"""
+
+    def __init__(self, max_bytes=128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """key에 해당하는 파일 바이트 반환, 없으면 build()로 생성 후 저장"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                metrics.cache_event("export", "hit")
+                return data
+
+        metrics.cache_event("export", "miss")
+        data = build()
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = data
+                self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self.total_bytes -= len(old)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+# ==================== 여러 종목 일괄 내보내기 ====================
+
+class _Drain(io.RawIOBase):
+    """ParquetWriter가 쓴 바이트를 모아 두었다가 꺼내 가는 출력 스트림"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self):
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _bulk_frames(market_data, codes, start, end, chunk_size, progress=None):
+    """(종목코드, 내보낼 표)를 종목 묶음 단위로 저장소에서 읽어 하나씩 넘김
+
+    progress(처리한 종목 수)는 묶음 하나를 다 넘길 때마다 호출합니다.
+    """
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    done = 0
+    for chunk in chunked(list(codes), chunk_size):
+        # 저장소에 없는 종목/구간만 먼저 받아 둠 (저장소에만 쓰고 구간 캐시에는 올리지 않음)
+        market_data.ensure_stored(chunk, start, end)
+        for code in chunk:
+            df, _ = market_data.store.read(code)
+            if df is None or df.empty:
+                continue
+            df = df.loc[start:end]
+            if not df.empty:
+                yield code, export_table(df)
+        done += len(chunk)
+        if progress is not None:
+            progress(done)
+
+
+def iter_bulk_export(market_data, codes, start, end, fmt, chunk_size=20, progress=None):
+    """여러 종목을 한 파일로 내보내는 바이트 조각 생성기 (종목코드 컬럼 추가, 종목 순서대로)"""
+    frames = (
+        (code, table.reset_index().assign(종목코드=code)[['종목코드', '날짜', *EXPORT_COLUMNS.values()]])
+        for code, table in _bulk_frames(market_data, codes, start, end, chunk_size, progress)
+    )
+
+    if fmt in ('csv', 'csv.gz'):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if fmt == 'csv.gz' else None  # 31: gzip 형식
+        first = True
+        for _, table in frames:
+            # 헤더와 BOM은 파일 맨 앞에 한 번만
+            text = table.to_csv(index=False, header=first).encode('utf-8-sig' if first else 'utf-8')
+            first = False
+            yield compressor.compress(text) if compressor else text
+        if compressor:
+            yield compressor.flush()
+        return
+
+    if fmt == 'parquet' and 'parquet' in FORMATS:
+        sink, writer, schema = _Drain(), None, None
+        for _, table in frames:
+            arrow = pa.Table.from_pandas(table, preserve_index=False)
+            if writer is None:
+                schema = arrow.schema
+                writer = pq.ParquetWriter(sink, schema, compression=PARQUET_COMPRESSION)
+            # 종목마다 거래량이 정수/실수로 다를 수 있어 첫 종목 스키마에 맞춤
+            writer.write_table(arrow.cast(schema))
+            yield sink.take()
+        if writer is not None:
+            writer.close()
+            yield sink.take()
+        return
+
+    raise ValueError(f"지원하지 않는 형식: {fmt}")
+
+
+def bulk_export_file(market_data, codes, start, end, fmt, path, chunk_size=20, progress=None):
+    """일괄 내보내기 결과를 path 파일에 이어 씀 (임시 파일에 쓴 뒤 교체하므로 반쯤 쓰인 파일은 보이지 않음)"""
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "wb") as out:
+            for part in iter_bulk_export(market_data, codes, start, end, fmt, chunk_size, progress):
+                out.write(part)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+class BulkExportJob:
+    """일괄 내보내기 작업 하나의 상태 (진행률은 처리한 종목 수 기준)"""
+
+    def __init__(self, key, path, total):
+        self.key = key
+        self.path = path
+        self.total = total
+        self.done = 0
+        self.error = None
+        self.finished = False
+        self.created_at = time.time()
+
+    @property
+    def running(self):
+        return not self.finished
+
+    @property
+    def progress(self):
+        return self.done / self.total if self.total else 1.0
+
+    @property
+    def size(self):
+        return os.path.getsize(self.path) if self.finished and self.error is None else 0
+
+    def open(self):
+        """완성된 파일을 읽기 모드로 열어 반환 (st.download_button이 받는 BufferedReader)"""
+        return open(self.path, "rb")
+
+
+class BulkExports:
+    """일괄 내보내기 작업 관리 (세션 간 공유)
+
+    작업은 `workers`개짜리 전용 스레드 풀에서 차례로 실행하므로 스크립트 실행을 막지 않고,
+    같은 (종목 목록, 기간, 형식) 요청은 진행 중이거나 만들어 둔 작업을 그대로 돌려줍니다.
+    완료된 작업은 최근 `max_jobs`개만 남기고 오래된 파일부터 지웁니다.
+    run_wrapper(job)는 작업 실행을 감싸는 context manager 팩토리입니다 (성능 기록 등, 선택).
+    """
+
+    def __init__(self, market_data, out_dir=DEFAULT_EXPORT_DIR, workers=1, max_jobs=8, chunk_size=20,
+                 run_wrapper=None):
+        self.market_data = market_data
+        self.out_dir = out_dir
+        self.max_jobs = max_jobs
+        self.chunk_size = chunk_size
+        self.run_wrapper = run_wrapper
+        self._jobs = OrderedDict()  # key -> BulkExportJob
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-export")
+        self._lock = threading.Lock()
+        os.makedirs(out_dir, exist_ok=True)
+
+    @staticmethod
+    def key(codes, start, end, fmt):
+        return (tuple(codes), pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), fmt)
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def start(self, codes, start, end, fmt):
+        """작업 시작 → BulkExportJob (같은 요청이 진행 중이거나 완료돼 있으면 그 작업, 실패한 작업은 다시 시작)"""
+        if fmt not in FORMATS:
+            raise ValueError(f"지원하지 않는 형식: {fmt}")
+        key = self.key(codes, start, end, fmt)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.error is None:
+                self._jobs.move_to_end(key)
+                return job
+            fd, path = tempfile.mkstemp(suffix=f".{FORMATS[fmt].extension}", dir=self.out_dir)
+            os.close(fd)
+            job = BulkExportJob(key, path, len(key[0]))
+            self._jobs[key] = job
+            self._jobs.move_to_end(key)
+            self._evict()
+        self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job):
+        codes, start, end, fmt = job.key
+
+        def progress(done):
+            job.done = done
+
+        try:
+            with self.run_wrapper(job) if self.run_wrapper is not None else nullcontext():
+                bulk_export_file(self.market_data, codes, start, end, fmt, job.path, self.chunk_size, progress)
+        except Exception as e:
+            job.error = e
+            logger.exception("일괄 내보내기 실패: %d개 종목 %s", job.total, fmt)
+        finally:
+            job.finished = True
+
+    def _evict(self):
+        """완료된 작업이 max_jobs개를 넘으면 오래된 것부터 파일과 함께 제거 (잠금을 잡은 상태에서 호출)"""
+        finished = [k for k, job in self._jobs.items() if job.finished]
+        for key in finished[:max(0, len(finished) - self.max_jobs)]:
+            job = self._jobs.pop(key)
+            if os.path.exists(job.path):
+                os.remove(job.path)
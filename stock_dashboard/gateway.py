@@ -0,0 +1,239 @@
+"""
+🚦 원격 조회 게이트웨이
+- 모든 Provider 호출은 이 게이트웨이를 거쳐 원격 서버로 나감
+- 토큰 버킷으로 초당 요청 수 제한, 동시에 진행 중인 요청 수 상한
+- 실패하면 지터를 섞은 지수 백오프로 재시도 (전체 요청 대비 재시도 비율 상한 = 재시도 예산)
+- 연속 실패가 쌓이면 회로 차단기가 열려 원격 호출 없이 바로 실패 → 호출하는 쪽은 캐시/저장소 데이터로 응답
+
+환경 변수
+- STOCK_GATEWAY_RPS: 초당 요청 수 (기본 10)
+- STOCK_GATEWAY_BURST: 순간 허용 요청 수 (기본 20)
+- STOCK_GATEWAY_MAX_IN_FLIGHT: 동시 요청 수 (기본 8)
+- STOCK_GATEWAY_RETRIES: 요청당 최대 재시도 횟수 (기본 2)
+"""
+
+import os
+import random
+import threading
+import time
+from collections import Counter
+
+from providers import MarketDataProvider
+
+
+class GatewayError(Exception):
+    """게이트웨이가 원격 호출 없이 거절한 요청"""
+
+
+class CircuitOpenError(GatewayError):
+    """회로 차단기가 열려 있음"""
+
+
+class GatewayBusyError(GatewayError):
+    """동시 요청 수/초당 요청 수 한도 때문에 제한 시간 안에 호출하지 못함"""
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """토큰 하나를 얻을 때까지 대기 (timeout초 안에 못 얻으면 False)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class RetryBudget:
+    """재시도 예산: 요청 하나마다 ratio개씩 쌓이고 재시도 한 번에 1개씩 소비 (최대 max_tokens개)
+
+    원격 서버가 전반적으로 느려졌을 때 재시도가 요청량을 몇 배로 부풀리지 않게 합니다.
+    """
+
+    def __init__(self, ratio=0.2, max_tokens=10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class CircuitBreaker:
+    """연속 failure_threshold번 실패하면 열리고, reset_timeout초 뒤 한 번 시험 호출을 허용"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial:
+                self._trial = True  # 시험 호출은 하나만
+                return True
+            return False
+
+    def release_trial(self):
+        """시험 호출이 원격까지 가지 못했으면 다음 호출이 다시 시험할 수 있게 함"""
+        with self._lock:
+            self._trial = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+def _retryable(error):
+    """4xx 응답처럼 다시 보내도 같은 결과인 오류는 재시도하지 않음"""
+    if isinstance(error, GatewayError):
+        return False
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status is None or status >= 500 or status == 429
+
+
+class FetchGateway:
+    """원격 호출 창구 (프로세스 전체가 하나를 공유)"""
+
+    def __init__(self, rate=10.0, burst=20, max_in_flight=8, max_retries=2,
+                 backoff=0.2, max_backoff=5.0, acquire_timeout=10.0,
+                 retry_budget=None, breaker=None):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.acquire_timeout = acquire_timeout
+        self.retry_budget = retry_budget or RetryBudget()
+        self.breaker = breaker or CircuitBreaker()
+        self.counters = Counter()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            rate=float(os.environ.get("STOCK_GATEWAY_RPS", "10")),
+            burst=int(os.environ.get("STOCK_GATEWAY_BURST", "20")),
+            max_in_flight=int(os.environ.get("STOCK_GATEWAY_MAX_IN_FLIGHT", "8")),
+            max_retries=int(os.environ.get("STOCK_GATEWAY_RETRIES", "2"))
+        )
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def call(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs)를 한도/재시도/회로 차단기 규칙에 따라 실행"""
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self._count("rejected_open")
+                raise CircuitOpenError("원격 조회 회로 차단기가 열려 있습니다")
+            try:
+                result = self._attempt(fn, args, kwargs)
+            except GatewayBusyError:
+                self.breaker.release_trial()
+                self._count("rejected_busy")
+                raise
+            except Exception as e:
+                self._count("failures")
+                if not _retryable(e):
+                    # 원격 서버는 정상 응답한 것이므로 회로 차단기 실패로 세지 않음
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt >= self.max_retries or not self.retry_budget.withdraw():
+                    raise
+                attempt += 1
+                self._count("retries")
+                # full jitter: 0 ~ backoff * 2^attempt 사이에서 무작위로 대기
+                time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+                continue
+            self.breaker.record_success()
+            self._count("success")
+            return result
+
+    def _attempt(self, fn, args, kwargs):
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise GatewayBusyError(f"동시 요청 {self.max_in_flight}개 한도 초과")
+        try:
+            if not self.bucket.acquire(timeout=self.acquire_timeout):
+                raise GatewayBusyError(f"초당 요청 {self.bucket.rate}개 한도 초과")
+            self._count("calls")
+            return fn(*args, **kwargs)
+        finally:
+            self._slots.release()
+
+
+class GatewayProvider(MarketDataProvider):
+    """다른 Provider의 호출을 게이트웨이를 통해 실행"""
+
+    def __init__(self, inner, gateway):
+        self.inner = inner
+        self.gateway = gateway
+        self.name = inner.name  # 저장소 폴더는 원래 Provider 기준
+
+    def listing(self, market):
+        return self.gateway.call(self.inner.listing, market)
+
+    def ohlcv(self, code, start, end):
+        return self.gateway.call(self.inner.ohlcv, code, start, end)
+
+
+_default_gateway = None
+_default_lock = threading.Lock()
+
+
+def default_gateway():
+    """프로세스 공용 게이트웨이 (환경 변수 설정 사용)"""
+    global _default_gateway
+    with _default_lock:
+        if _default_gateway is None:
+            _default_gateway = FetchGateway.from_env()
+        return _default_gateway
@@ -0,0 +1,393 @@
+"""
+📐 기술적 지표 계산 엔진
+- 지표 레지스트리: 각 지표는 필요한 입력 컬럼과 lookback(과거 봉 수)을 선언
+- 화면에 필요한 지표만 계산하고, 이동평균/EMA 같은 중간 결과는 지표끼리 공유
+- 이동평균/볼린저 밴드는 구간 합(Σx)과 제곱합(Σx²)을 NumPy 누적합으로 한 번만 계산
+- (종목, 시작일)별로 결과를 기억해 두고, 뒤에 새 봉이 붙거나 마지막 봉이 바뀐 경우
+  바뀐 위치부터 lookback만큼만 다시 계산 (EMA 계열은 이전 값에서 이어서 계산)
+- 다시 계산한 값은 이전 결과 앞부분과 이어 붙인 새 배열로 저장하므로 복사 비용은 전체 길이에 비례
+  (이전 결과를 돌려받은 쪽이 있어 제자리에서 고치지 않음)
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import metrics
+
+MA_WINDOWS = (5, 20, 60)
+BB_WINDOW = 20
+BB_K = 2
+RSI_PERIOD = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+STOCH_K, STOCH_D = 14, 3
+ATR_PERIOD = 14
+
+
+# ==================== 지표 레지스트리 ====================
+
+@dataclass(frozen=True)
+class Indicator:
+    name: str
+    columns: tuple      # 결과 컬럼
+    inputs: tuple       # 필요한 원본 컬럼
+    lookback: int       # 새 봉 계산에 필요한 과거 봉 수 (EMA 계열은 이전 값에서 이어서 계산하므로 작음)
+    func: Callable      # func(ctx) -> {컬럼: 배열}
+
+
+INDICATORS = {}
+
+
+def register(name, columns, inputs=("Close",), lookback=0):
+    """지표 등록 데코레이터"""
+    def decorator(func):
+        INDICATORS[name] = Indicator(name, tuple(columns), tuple(inputs), lookback, func)
+        return func
+    return decorator
+
+
+@register("MA", [f"MA{w}" for w in MA_WINDOWS], lookback=max(MA_WINDOWS))
+def _moving_averages(ctx):
+    return {f"MA{w}": ctx.sma("Close", w) for w in MA_WINDOWS}
+
+
+@register("Daily_Return", ["Daily_Return"], lookback=1)
+def _daily_return(ctx):
+    close = ctx.col("Close")
+    return {"Daily_Return": (close / ctx.shifted("Close") - 1) * 100}
+
+
+@register("BB", ["BB_Middle", "BB_Upper", "BB_Lower"], lookback=BB_WINDOW)
+def _bollinger(ctx):
+    # 중심선은 MA20과 같은 이동평균을 공유
+    middle = ctx.sma("Close", BB_WINDOW)
+    std = ctx.std("Close", BB_WINDOW)
+    return {
+        "BB_Middle": middle,
+        "BB_Upper": middle + std * BB_K,
+        "BB_Lower": middle - std * BB_K
+    }
+
+
+@register("RSI", ["RSI"], lookback=1)
+def _rsi(ctx):
+    delta = ctx.diff("Close")
+    alpha = 1 / RSI_PERIOD  # Wilder 평활
+    gain = ctx.ema("rsi_gain", np.where(delta > 0, delta, 0.0), alpha, mask=np.isnan(delta))
+    loss = ctx.ema("rsi_loss", np.where(delta < 0, -delta, 0.0), alpha, mask=np.isnan(delta))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + gain / loss)
+    rsi = np.where(loss == 0, 100.0, rsi)
+    rsi[np.isnan(gain)] = np.nan
+    return {"RSI": rsi}
+
+
+@register("MACD", ["MACD", "MACD_Signal", "MACD_Hist"], lookback=0)
+def _macd(ctx):
+    macd = ctx.ema_span("Close", MACD_FAST) - ctx.ema_span("Close", MACD_SLOW)
+    signal = ctx.ema("macd_signal", macd, 2 / (MACD_SIGNAL + 1))
+    return {"MACD": macd, "MACD_Signal": signal, "MACD_Hist": macd - signal}
+
+
+@register("Stochastic", ["Stoch_K", "Stoch_D"], inputs=("High", "Low", "Close"),
+          lookback=STOCH_K + STOCH_D - 1)
+def _stochastic(ctx):
+    high = ctx.rolling_max("High", STOCH_K)
+    low = ctx.rolling_min("Low", STOCH_K)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = (ctx.col("Close") - low) / (high - low) * 100
+    return {"Stoch_K": k, "Stoch_D": _window_mean(k, STOCH_D)}
+
+
+@register("ATR", ["ATR"], inputs=("High", "Low", "Close"), lookback=1)
+def _atr(ctx):
+    high, low, prev_close = ctx.col("High"), ctx.col("Low"), ctx.shifted("Close")
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return {"ATR": ctx.ema("atr_tr", true_range, 1 / ATR_PERIOD)}
+
+
+# ==================== 계산 도우미 ====================
+
+def prefix_sums(x):
+    """누적합(Σx)과 누적 제곱합(Σx²), 모든 구간 길이가 이 두 배열을 공유
+
+    누적합 오차를 줄이기 위해 첫 값을 빼고 계산합니다.
+    """
+    shift = x[0] if len(x) else 0.0
+    d = x - shift
+    c1 = np.concatenate(([0.0], np.cumsum(d)))
+    c2 = np.concatenate(([0.0], np.cumsum(d * d)))
+    return c1, c2, shift
+
+
+def window_sums(c1, c2, window):
+    """누적합에서 길이 window 구간 합/제곱합 추출, 구간이 다 차지 않은 앞부분은 NaN"""
+    n = len(c1) - 1
+    s1 = np.full(n, np.nan)
+    s2 = np.full(n, np.nan)
+    if n >= window:
+        s1[window - 1:] = c1[window:] - c1[:-window]
+        s2[window - 1:] = c2[window:] - c2[:-window]
+    return s1, s2
+
+
+def _window_reduce(x, window, reduce):
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = reduce(sliding_window_view(x, window), axis=1)
+    return out
+
+
+def _window_mean(x, window):
+    return _window_reduce(x, window, np.mean)
+
+
+class _Context:
+    """지표 계산 중 공유하는 입력/중간 결과
+
+    증분 계산 시에는 전체 데이터 중 `begin` 위치부터의 구간만 받고,
+    `prev`(begin 직전 행의 입력값)와 `seed`(이전 계산의 EMA 값)로 이어서 계산합니다.
+    """
+
+    def __init__(self, data, begin=0, prev=None, seed=None):
+        self.data = data
+        self.begin = begin
+        self.prev = prev or {}
+        self.seed = seed or {}
+        self.series = {}   # 행 단위로 정렬된 중간 결과 (메모에 저장되어 다음 계산에서 재사용)
+        self._local = {}   # 구간 기준 값이라 저장하지 않는 중간 결과 (누적합 등)
+
+    def col(self, name):
+        return self.data[name]
+
+    def _cached(self, key, fn, store=None):
+        store = self.series if store is None else store
+        if key not in store:
+            store[key] = fn()
+        return store[key]
+
+    def shifted(self, name):
+        """한 칸 이전 값 (구간 첫 행은 직전 행 값 사용)"""
+        def fn():
+            x = self.col(name)
+            return np.concatenate(([self.prev.get(name, np.nan)], x[:-1]))
+        return self._cached(("shift", name), fn, self._local)
+
+    def diff(self, name):
+        return self._cached(("diff", name), lambda: self.col(name) - self.shifted(name), self._local)
+
+    def _sums(self, name):
+        return self._cached(("sums", name), lambda: prefix_sums(self.col(name)), self._local)
+
+    def sma(self, name, window):
+        def fn():
+            c1, c2, shift = self._sums(name)
+            s1, _ = window_sums(c1, c2, window)
+            return s1 / window + shift
+        return self._cached(("sma", name, window), fn)
+
+    def std(self, name, window):
+        """표본표준편차 (ddof=1)"""
+        def fn():
+            c1, c2, _ = self._sums(name)
+            s1, s2 = window_sums(c1, c2, window)
+            var = (s2 - s1 * s1 / window) / (window - 1)
+            return np.sqrt(np.maximum(var, 0.0))
+        return self._cached(("std", name, window), fn)
+
+    def rolling_max(self, name, window):
+        return self._cached(("max", name, window), lambda: _window_reduce(self.col(name), window, np.max))
+
+    def rolling_min(self, name, window):
+        return self._cached(("min", name, window), lambda: _window_reduce(self.col(name), window, np.min))
+
+    def ema(self, key, values, alpha, mask=None):
+        """지수이동평균 (adjust=False), 증분 계산 시 직전 EMA 값에서 이어서 계산
+
+        mask가 True인 위치(앞부분 NaN 등)는 계산에서 제외합니다.
+        """
+        def fn():
+            x = np.where(mask, np.nan, values) if mask is not None else values
+            seed = self.seed.get(("ema", key))
+            if seed is not None and self.begin > 0 and not np.isnan(seed[self.begin - 1]):
+                series = pd.Series(np.concatenate(([seed[self.begin - 1]], x)))
+                return series.ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+            return pd.Series(x).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+        return self._cached(("ema", key), fn)
+
+    def ema_span(self, name, span):
+        return self.ema(f"{name}_{span}", self.col(name), 2 / (span + 1))
+
+
+def resolve(names):
+    """지표 이름 목록 검증 후 Indicator 목록 반환"""
+    unknown = [n for n in names if n not in INDICATORS]
+    if unknown:
+        raise KeyError(f"알 수 없는 지표: {unknown}")
+    return [INDICATORS[n] for n in dict.fromkeys(names)]
+
+
+def compute_arrays(data, names):
+    """메모 없이 {입력 컬럼: 배열}에 대해 지정한 지표만 계산 → {결과 컬럼: 배열}"""
+    indicators = resolve(names)
+    inputs = {c for ind in indicators for c in ind.inputs}
+    ctx = _Context({c: np.asarray(data[c], dtype=float) for c in inputs})
+    out = {}
+    for ind in indicators:
+        out.update(ind.func(ctx))
+    return out
+
+
+def compute_indicators(df, names):
+    """메모 없이 df 전체에 대해 지정한 지표만 계산"""
+    inputs = {c for ind in resolve(names) for c in ind.inputs}
+    return pd.DataFrame(compute_arrays({c: df[c].to_numpy() for c in inputs}, names), index=df.index)
+
+
+# ==================== 엔진 ====================
+
+@dataclass
+class _Memo:
+    index: pd.Index
+    inputs: dict        # 입력 컬럼 -> 배열
+    names: set          # 계산된 지표 이름
+    values: dict        # 결과 컬럼/중간 결과 -> 배열
+
+
+class IndicatorEngine:
+    """지표 계산 결과를 (종목, 시작일) 단위로 기억하는 엔진"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._memo = OrderedDict()  # (key, 시작일) -> _Memo
+        self._lock = threading.Lock()
+
+    def compute(self, key, df, names=("MA", "Daily_Return", "BB")):
+        """df와 같은 인덱스를 갖는, 요청한 지표 컬럼만 담은 DataFrame 반환"""
+        indicators = resolve(names)
+        index = df.index
+        memo_key = (key, index[0] if len(index) else None)
+
+        with self._lock:
+            memo = self._memo.get(memo_key)
+
+        inputs = set(memo.inputs) if memo is not None else set()
+        inputs |= {c for ind in indicators for c in ind.inputs}
+        data = {c: df[c].to_numpy(dtype=float) for c in inputs}
+
+        previous, memo = memo, self._update(memo, index, data, indicators)
+        columns = [c for ind in indicators for c in ind.columns]
+        if previous is None:
+            metrics.cache_event("indicators", "miss")
+        elif all(memo.values[c] is previous.values.get(c) for c in columns):
+            metrics.cache_event("indicators", "hit")
+        else:
+            metrics.cache_event("indicators", "partial")
+
+        with self._lock:
+            self._memo[memo_key] = memo
+            self._memo.move_to_end(memo_key)
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+
+        return pd.DataFrame({c: memo.values[c] for c in columns}, index=index)
+
+    def _update(self, memo, index, data, indicators):
+        """이전 결과와 비교해 필요한 부분만 계산한 새 _Memo 반환
+
+        지표 계산은 바뀐 위치 근처만 하지만, 결과 배열은 이전 값과 이어 붙여 새로 만듭니다.
+        """
+        requested = {ind.name for ind in indicators}
+
+        first = self._first_changed(memo, index, data)
+        if first is None:
+            # 처음이거나 과거 데이터가 바뀜 → 요청 지표 전체 계산
+            return self._full(index, data, indicators)
+
+        n = len(index)
+        kept = memo.names if n == len(memo.index) and first == n else set()
+        values = {k: v for k, v in memo.values.items()} if kept else {}
+
+        # 이전에 계산된 지표는 이번에 요청되지 않았어도 바뀐 위치부터만 이어서 계산
+        # (차트/통계처럼 호출마다 지표 목록이 달라도 다른 쪽 결과를 버리고 전체 재계산하지 않도록)
+        updated = memo.names - kept
+        if updated:
+            inds = [INDICATORS[name] for name in updated]
+            begin = max(0, first - max(ind.lookback for ind in inds))
+            ctx = _Context(
+                {c: v[begin:] for c, v in data.items()},
+                begin=begin,
+                prev={c: v[begin - 1] for c, v in data.items()} if begin > 0 else None,
+                seed=memo.values
+            )
+            out = {}
+            for ind in inds:
+                out.update(ind.func(ctx))
+            out.update(ctx.series)
+            offset = first - begin
+            for k, v in out.items():
+                # 이전 값이 없는 중간 결과는 구간 기준이라 이어 붙일 수 없으므로 저장하지 않음
+                if k in memo.values:
+                    values[k] = np.concatenate((memo.values[k][:first], v[offset:]))
+            kept = kept | updated
+
+        # 처음 요청된 지표는 (공유 중간 결과를 재사용하며) 전체 계산
+        missing = requested - kept
+        if missing:
+            ctx = _Context(data)
+            ctx.series.update(values)
+            for ind in resolve(sorted(missing)):
+                values.update(ind.func(ctx))
+            values.update(ctx.series)
+            kept = kept | missing
+
+        return _Memo(index, data, kept, values)
+
+    @staticmethod
+    def _first_changed(memo, index, data):
+        """이전 데이터와 처음 달라진 위치 (증분 계산이 불가능하면 None)"""
+        if memo is None:
+            return None
+        n_old, n = len(memo.index), len(index)
+        common = min(n_old, n)
+        # 정렬된 거래일 인덱스이므로 겹치는 구간의 끝만 비교
+        if common == 0 or index[common - 1] != memo.index[common - 1]:
+            return None
+
+        # 겹치는 구간의 마지막 봉들만 비교 (장중 갱신되는 마지막 봉 감지)
+        lookback = max([ind.lookback for ind in INDICATORS.values()] + [1])
+        check = max(0, common - lookback)
+        first = common
+        for c, old in memo.inputs.items():
+            if c not in data:
+                return None
+            changed = np.flatnonzero(old[check:common] != data[c][check:common])
+            if len(changed):
+                first = min(first, check + changed[0])
+        if first < common - 1:
+            # 마지막 봉 외의 과거 값이 바뀌었으면(수정주가 등) 전체 재계산
+            return None
+        return first
+
+    @staticmethod
+    def _full(index, data, indicators):
+        ctx = _Context(data)
+        values = {}
+        for ind in indicators:
+            values.update(ind.func(ctx))
+        values.update(ctx.series)
+        return _Memo(index, data, {ind.name for ind in indicators}, values)
+
+    def clear(self, key=None):
+        with self._lock:
+            if key is None:
+                self._memo.clear()
+            else:
+                for memo_key in [k for k in self._memo if k[0] == key]:
+                    del self._memo[memo_key]
+
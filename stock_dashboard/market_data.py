@@ -0,0 +1,276 @@
+"""
+📡 대시보드 공용 데이터 계층
+- 메모리 구간 캐시(RangeCache) → 로컬 저장소(OHLCVStore) → Provider(fdr/재생) 순으로 조회
+- 모든 대시보드가 이 모듈을 통해 주가 데이터를 불러옴
+- 캐시된 DataFrame은 복사하지 않고 세션 간에 공유 (pandas Copy-on-Write로 원본 보호)
+- 만료된 구간은 그대로 제공하면서 백그라운드에서 갱신 (stale-while-revalidate)
+- 같은 종목/구간의 동시 캐시 미스는 한 번만 조회 (single-flight)
+- 원격 조회는 게이트웨이를 거치며, 회로 차단기가 열려 있으면 저장소에 있는 데이터로 응답
+- 라이브 모드: 종목마다 정해진 간격에 한 번, 가진 마지막 봉 이후만 받아 구간 캐시에 이어 붙임
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+import pandas as pd
+
+import metrics
+from gateway import CircuitOpenError
+from ohlcv_store import DEFAULT_STORE_DIR, OHLCVStore, to_timestamp
+from providers import get_provider
+from range_cache import RangeCache
+from singleflight import SingleFlight
+
+# pandas 3부터는 항상 Copy-on-Write, 2.x에서는 직접 켜야 슬라이스를 복사 없이 안전하게 공유할 수 있음
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+logger = logging.getLogger(__name__)
+
+LIVE_MIN_INTERVAL = float(os.environ.get("STOCK_LIVE_MIN_INTERVAL", 5))  # 종목당 라이브 조회 최소 간격(초)
+
+
+class MarketData:
+    """주가 데이터 조회 창구
+
+    캐시 미스가 나면 요청 구간보다 넓은 `min_span` 구간을 한 번에 읽어 두어,
+    이후 더 짧은 기간 프리셋으로 바꿔도 슬라이싱만으로 응답합니다.
+    여러 종목 조회는 프로세스 전체가 공유하는 `fetch_workers`개짜리 스레드 풀에서 동시에 처리합니다.
+    만료(또는 무효화)된 구간은 기다리지 않고 기존 데이터를 돌려준 뒤 같은 풀에서 갱신하며,
+    무효화/갱신 횟수는 `counters`에 집계합니다.
+    여러 세션이 동시에 같은 (Provider, 종목, 구간)을 요청하면 첫 요청만 조회하고 나머지는 그 결과를 받습니다.
+    """
+
+    def __init__(self, provider=None, store=None, cache=None, min_span=timedelta(days=365),
+                 fetch_workers=8, live_min_interval=LIVE_MIN_INTERVAL):
+        self.provider = provider or get_provider()
+        # 재생 데이터가 실제 데이터 저장소에 섞이지 않도록 Provider별 폴더 사용
+        self.store = store or OHLCVStore(os.path.join(DEFAULT_STORE_DIR, self.provider.name))
+        self.cache = cache or RangeCache()
+        # 수정주가 등으로 저장소가 전체를 다시 받으면 이전 기준 가격이 섞이지 않도록 구간 캐시도 비움
+        self.store.on_revised = self._on_revised
+        self.min_span = min_span
+        self._executor = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="ohlcv-fetch")
+        self.counters = Counter()
+        self._refreshing = {}  # (code, start, end) -> 진행 중인 갱신 Future
+        self.flight = SingleFlight()
+        self.live_min_interval = live_min_interval
+        self._polled_at = {}      # code -> 마지막 라이브 조회 시각
+        self._live_versions = Counter()  # code -> 라이브 조회로 데이터가 바뀐 횟수
+        self._lock = threading.Lock()
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def metrics(self):
+        """무효화/갱신/합쳐진 요청 수 등 집계값"""
+        with self._lock:
+            metrics = dict(self.counters)
+        metrics.update({f"flight_{name}": n for name, n in self.flight.counters.items()})
+        return metrics
+
+    def listing(self, market):
+        """시장 종목 목록"""
+        return self.provider.listing(market)
+
+    def ohlcv(self, code, start, end):
+        """[start, end] 구간 OHLCV 반환"""
+        df, stale = self.cache.lookup(code, start, end)
+        if df is not None:
+            if stale:
+                # 만료된 데이터를 먼저 돌려주고 백그라운드에서 갱신
+                self._count("stale_served")
+                self._refresh_async(code, *stale)
+            metrics.cache_event("ohlcv", "stale" if stale else "hit")
+            return df
+
+        metrics.cache_event("ohlcv", "miss")
+
+        start, end = to_timestamp(start), to_timestamp(end)
+        fetch_start = min(start, end - self.min_span)
+        key = (self.provider.name, code, fetch_start, end)
+        full = self.flight.do(key, lambda: self._load(code, fetch_start, end))
+        return full.loc[start:end] if not full.empty else full
+
+    def _load(self, code, start, end):
+        """저장소(+Provider)에서 읽어 구간 캐시에 저장"""
+        try:
+            full = self.store.get(code, start, end, self.provider.ohlcv)
+        except CircuitOpenError:
+            # 원격 조회가 막혀 있으면 저장소에 있는 만큼만 응답 (캐시에는 넣지 않아 복구 후 다시 조회)
+            df, _ = self.store.read(code)
+            if df is None:
+                raise
+            self._count("breaker_fallback")
+            return df.loc[start:end]
+        self.cache.put(code, start, end, full)
+        return full
+
+    # ---------- 무효화 / 갱신 ----------
+
+    def invalidate(self, code, start=None, end=None):
+        """해당 종목(과 구간)만 만료 처리, 다른 종목/사용자의 캐시는 그대로"""
+        count = self.cache.invalidate(code, start, end)
+        self._count("invalidations")
+        logger.info("invalidate %s [%s ~ %s]: %d개 구간", code, start, end, count)
+        return count
+
+    def _on_revised(self, code):
+        self.cache.clear(code)
+        self._count("revisions")
+        logger.info("revised %s: 과거 가격이 바뀌어 전체 구간을 다시 받음", code)
+
+    def refresh(self, code, start, end):
+        """해당 종목/구간을 만료 처리하고 백그라운드 갱신 시작 → Future 반환"""
+        self.invalidate(code, start, end)
+        return self._refresh_async(code, to_timestamp(start), to_timestamp(end))
+
+    def revalidate(self, code, start, end):
+        """만료 처리 없이 백그라운드 갱신만 시작 (미리 불러오기용) → Future 반환"""
+        return self._refresh_async(code, to_timestamp(start), to_timestamp(end))
+
+    def _refresh_async(self, code, start, end):
+        """같은 종목/구간의 갱신이 이미 진행 중이면 그 Future를 재사용 (다른 구간은 따로 갱신)"""
+        key = (code, start, end)
+        with self._lock:
+            future = self._refreshing.get(key)
+            if future is None:
+                future = self._executor.submit(self._refresh, code, start, end)
+                self._refreshing[key] = future
+        return future
+
+    def _refresh(self, code, start, end):
+        try:
+            # 저장소는 오늘 봉을 확정 구간으로 보지 않으므로 마지막 저장일 이후만 새로 받음
+            full = self.store.get(code, start, end, self.provider.ohlcv)
+            self.cache.put(code, start, end, full)
+            self._count("refreshes")
+            return full
+        except Exception:
+            self._count("refresh_errors")
+            logger.exception("refresh 실패: %s", code)
+            raise
+        finally:
+            with self._lock:
+                self._refreshing.pop((code, start, end), None)
+
+    # ---------- 라이브 모드 ----------
+
+    def live_version(self, code, interval):
+        """라이브 조회 시각이 됐으면 새 봉을 받아 붙이고, 종목 데이터 버전 반환
+
+        같은 종목은 모든 세션을 통틀어 `interval`(최소 `live_min_interval`)초에 한 번만 조회하며,
+        그 사이 다른 세션은 기다리지 않고 현재 버전을 받습니다. 버전이 바뀌었으면 화면을 다시 그리면 됩니다.
+        """
+        interval = max(interval, self.live_min_interval)
+        now = time.time()
+        with self._lock:
+            due = now - self._polled_at.get(code, 0.0) >= interval
+            if due:
+                self._polled_at[code] = now
+        if due:
+            try:
+                self._poll(code)
+            except Exception:
+                self._count("live_poll_errors")
+                logger.exception("라이브 조회 실패: %s", code)
+        with self._lock:
+            return self._live_versions[code]
+
+    def last_polled(self, code):
+        """마지막 라이브 조회 시각 (epoch 초, 없으면 None)"""
+        with self._lock:
+            return self._polled_at.get(code)
+
+    def _poll(self, code):
+        """마지막 봉 날짜 ~ 오늘만 조회해 구간 캐시에 병합 (마지막 봉은 장중 값으로 교체)"""
+        last = self.cache.last_bar(code)
+        if last is None:
+            return  # 아직 불러온 적 없는 종목은 일반 조회가 채움
+        last, today = to_timestamp(last), to_timestamp("today")
+        new = self.provider.ohlcv(code, last.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d"))
+        self._count("live_polls")
+        if new is None or new.empty:
+            return
+
+        held, _ = self.cache.lookup(code, last, last)
+        # 구간 끝을 오늘로 넓혀 다시 넣으면 병합되면서 만료 시각도 새로 잡힘
+        self.cache.put(code, last, today, new)
+        if held is None or not _same_bars(held, new):
+            self._count("live_updates")
+            with self._lock:
+                self._live_versions[code] += 1
+
+    def ensure_stored(self, codes, start, end, timeout=30.0):
+        """저장소 coverage가 [start, 어제]를 덮지 않는 종목만 받아서 저장소를 채움 → 실패 dict
+
+        저장소 파일을 직접 읽는 작업(스크리너/백테스트/일괄 내보내기) 전에 사용합니다.
+        시장 전체를 훑는 작업이므로 받은 데이터는 저장소에만 쓰고 구간 캐시에는 올리지 않습니다.
+        """
+        start, end = to_timestamp(start), to_timestamp(end)
+        need_end = min(end, to_timestamp("today") - timedelta(days=1))
+        missing = []
+        for code in codes:
+            coverage = self.store.coverage(code)
+            if coverage is None or coverage[0] > start or coverage[1] < need_end:
+                missing.append(code)
+        if not missing:
+            return {}
+        _, errors = self._run_many(lambda code: self._store(code, start, end), missing, timeout)
+        return errors
+
+    def _store(self, code, start, end):
+        """저장소만 채움 (구간 캐시에는 넣지 않음)"""
+        self.store.get(code, start, end, self.provider.ohlcv)
+
+    def ohlcv_many(self, codes, start, end, timeout=10.0):
+        """여러 종목을 동시에 조회하여 (결과 dict, 실패 dict) 반환
+
+        - 종목마다 실행을 시작한 시점부터 `timeout`초가 지나면 실패로 처리하고 기다리지 않음
+          (이미 실행 중인 조회는 끝까지 진행되어 캐시는 채워짐)
+        - 일부 종목이 실패해도 성공한 종목 결과는 그대로 반환
+        """
+        return self._run_many(lambda code: self.ohlcv(code, start, end), codes, timeout)
+
+    def _run_many(self, load, codes, timeout):
+        """load(code)를 종목마다 공용 스레드 풀에서 실행 → (결과 dict, 실패 dict)"""
+        results, errors = {}, {}
+        started = {}
+
+        def task(code):
+            started[code] = time.monotonic()
+            return load(code)
+
+        pending = {self._executor.submit(task, code): code for code in dict.fromkeys(codes)}
+        while pending:
+            done, _ = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            for future in done:
+                code = pending.pop(future)
+                try:
+                    results[code] = future.result()
+                except Exception as e:
+                    errors[code] = e
+
+            now = time.monotonic()
+            for future, code in list(pending.items()):
+                if code in started and now - started[code] > timeout:
+                    pending.pop(future)
+                    errors[code] = TimeoutError(f"{code}: {timeout}초 내에 응답 없음")
+
+        return results, errors
+
+
+def _same_bars(held, new):
+    """새로 받은 봉이 이미 가진 봉과 같은지 (날짜와 OHLCV 값 비교)"""
+    # 저장 경로에 따라 datetime 단위(ns/us)가 다를 수 있어 ns로 맞춰 비교
+    if len(held) != len(new) or not (
+            pd.DatetimeIndex(held.index).as_unit("ns") == pd.DatetimeIndex(new.index).as_unit("ns")).all():
+        return False
+    columns = [c for c in ('Open', 'High', 'Low', 'Close', 'Volume') if c in held.columns and c in new.columns]
+    return (held[columns].to_numpy(dtype=float) == new[columns].to_numpy(dtype=float)).all()
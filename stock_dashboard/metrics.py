@@ -0,0 +1,267 @@
+"""
+⏱️ 재실행(rerun) 단위 성능 계측
+- 단계별 소요 시간(span), 캐시 적중/실패 횟수, 전송 데이터 크기를 재실행 하나마다 기록
+- 캐시 클래스(MarketData/IndicatorEngine/FigureCache 등)는 cache_event()만 호출하면 되며,
+  재실행 중이 아니면(워밍업 스레드 등) 아무것도 하지 않음
+- 재실행이 끝나면 JSON 한 줄(reruns.jsonl)로 남기고, 단계별 p50/p99를 Prometheus 텍스트 파일로 저장
+  (STOCK_METRICS_DIR을 지정한 경우, node_exporter textfile collector 등으로 수집)
+- 최근 재실행 기록은 메모리에도 남겨 대시보드의 성능 패널에서 볼 수 있음
+- 화면 조각(st.fragment)만 다시 실행된 경우는 조각 이름으로 따로 기록
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+
+DEFAULT_METRICS_DIR = os.environ.get("STOCK_METRICS_DIR")  # 없으면 파일로 남기지 않음
+PROM_FLUSH_INTERVAL = 10.0  # Prometheus 파일을 다시 쓰는 최소 간격(초)
+QUANTILES = (0.5, 0.9, 0.99)
+
+_local = threading.local()
+
+
+class Rerun:
+    """재실행 한 번의 기록 (같은 단계가 여러 번 나오면 시간/크기를 합산)"""
+
+    def __init__(self, page):
+        self.page = page
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+        self.spans = defaultdict(float)
+        self.cache = Counter()      # (캐시 이름, 결과) -> 횟수
+        self.payloads = Counter()   # 이름 -> 바이트
+
+    def to_dict(self):
+        return {
+            "ts": round(self.started_at, 3),
+            "page": self.page,
+            "duration_s": self.duration,
+            "spans": {k: round(v, 6) for k, v in self.spans.items()},
+            "cache": {f"{name}.{result}": n for (name, result), n in self.cache.items()},
+            "payload_bytes": dict(self.payloads)
+        }
+
+
+def current():
+    """이 스레드에서 진행 중인 재실행 기록 (없으면 None)"""
+    return getattr(_local, "rerun", None)
+
+
+@contextmanager
+def span(name):
+    """with span("load_stock_data"): ... — 블록 실행 시간을 현재 재실행에 기록"""
+    rerun = current()
+    if rerun is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        rerun.spans[name] += time.perf_counter() - start
+
+
+def timed(name):
+    """함수 전체를 span으로 감싸는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def cache_event(cache, result):
+    """캐시 조회 결과 기록 (result: "hit"/"miss"/"stale"/"partial" 등)"""
+    rerun = current()
+    if rerun is not None:
+        rerun.cache[(cache, result)] += 1
+
+
+def payload(name, size):
+    """화면으로 보내거나 내려받게 한 데이터 크기(바이트) 기록"""
+    rerun = current()
+    if rerun is not None and size:
+        rerun.payloads[name] += int(size)
+
+
+def quantile(sorted_values, q):
+    """정렬된 값 목록의 분위수 (선형 보간)"""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """재실행 기록 수집기 (서버 프로세스 전체에서 하나를 공유)
+
+    분위수는 단계별 최근 `window`개 재실행으로 계산하고, 횟수/합계는 서버 시작 후 누적값입니다.
+    """
+
+    def __init__(self, out_dir=DEFAULT_METRICS_DIR, window=2048, history=50):
+        self.out_dir = out_dir
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=window))  # (page, 단계) -> 최근 소요 시간
+        self._stage_totals = defaultdict(lambda: [0, 0.0])         # (page, 단계) -> [횟수, 합계]
+        self._cache_totals = Counter()
+        self._payload_totals = Counter()
+        self._reruns = Counter()
+        self.recent = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._prom_written_at = 0.0
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+
+    @property
+    def jsonl_path(self):
+        return os.path.join(self.out_dir, "reruns.jsonl") if self.out_dir else None
+
+    @property
+    def prom_path(self):
+        return os.path.join(self.out_dir, "stock_dashboard.prom") if self.out_dir else None
+
+    def start(self, page):
+        """재실행 기록 시작 (이전 재실행이 st.rerun()/st.stop()으로 끝났으면 그 기록은 버림)"""
+        rerun = Rerun(page)
+        _local.rerun = rerun
+        return rerun
+
+    @contextmanager
+    def fragment(self, page):
+        """화면 조각(st.fragment) 실행 기록
+
+        앱 전체 재실행 중이면 그 기록에 합산하고, 조각만 다시 실행되면 page 이름으로 따로 기록합니다.
+        """
+        if current() is not None:
+            yield
+            return
+        rerun = self.start(page)
+        try:
+            yield
+        finally:
+            self.finish(rerun)
+
+    def finish(self, rerun=None):
+        """재실행 기록을 마치고 집계/파일에 반영"""
+        rerun = rerun or current()
+        if rerun is None:
+            return None
+        if current() is rerun:
+            _local.rerun = None
+        rerun.duration = round(time.perf_counter() - rerun._start, 6)
+
+        with self._lock:
+            self._reruns[rerun.page] += 1
+            for stage, seconds in list(rerun.spans.items()) + [("rerun", rerun.duration)]:
+                self._samples[(rerun.page, stage)].append(seconds)
+                totals = self._stage_totals[(rerun.page, stage)]
+                totals[0] += 1
+                totals[1] += seconds
+            self._cache_totals.update(rerun.cache)
+            self._payload_totals.update(rerun.payloads)
+            self.recent.append(rerun)
+            write_prom = self.out_dir and time.time() - self._prom_written_at >= PROM_FLUSH_INTERVAL
+            if write_prom:
+                self._prom_written_at = time.time()
+
+        if self.out_dir:
+            self._append_jsonl(rerun)
+            if write_prom:
+                self.write_prometheus()
+        return rerun
+
+    def _append_jsonl(self, rerun):
+        line = json.dumps(rerun.to_dict(), ensure_ascii=False)
+        with self._lock:
+            with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    # ---------- 집계 ----------
+
+    def stage_summary(self):
+        """[{page, stage, count, p50_ms, p90_ms, p99_ms, mean_ms}, ...]"""
+        with self._lock:
+            samples = {k: sorted(v) for k, v in self._samples.items()}
+            totals = {k: list(v) for k, v in self._stage_totals.items()}
+        rows = []
+        for (page, stage), values in sorted(samples.items()):
+            count, total = totals[(page, stage)]
+            row = {"page": page, "stage": stage, "count": count}
+            for q in QUANTILES:
+                row[f"p{int(q * 100)}_ms"] = quantile(values, q) * 1000
+            row["mean_ms"] = total / count * 1000
+            rows.append(row)
+        return rows
+
+    def totals(self):
+        """(캐시 결과별 누적 횟수, 전송 크기별 누적 바이트)"""
+        with self._lock:
+            return dict(self._cache_totals), dict(self._payload_totals)
+
+    def prometheus_text(self):
+        """Prometheus 텍스트 형식 (단계별 summary + 캐시/전송 크기 counter)"""
+        with self._lock:
+            samples = {k: sorted(v) for k, v in self._samples.items()}
+            totals = {k: list(v) for k, v in self._stage_totals.items()}
+            cache = dict(self._cache_totals)
+            payloads = dict(self._payload_totals)
+            reruns = dict(self._reruns)
+
+        lines = [
+            "# HELP stock_dashboard_stage_seconds Time spent per rerun stage.",
+            "# TYPE stock_dashboard_stage_seconds summary"
+        ]
+        for (page, stage), values in sorted(samples.items()):
+            labels = f'page="{_label(page)}",stage="{_label(stage)}"'
+            for q in QUANTILES:
+                lines.append(f'stock_dashboard_stage_seconds{{{labels},quantile="{q}"}} {quantile(values, q):.6f}')
+            count, total = totals[(page, stage)]
+            lines.append(f"stock_dashboard_stage_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"stock_dashboard_stage_seconds_count{{{labels}}} {count}")
+
+        lines += [
+            "# HELP stock_dashboard_reruns_total Completed script reruns.",
+            "# TYPE stock_dashboard_reruns_total counter"
+        ]
+        lines += [f'stock_dashboard_reruns_total{{page="{_label(p)}"}} {n}' for p, n in sorted(reruns.items())]
+
+        lines += [
+            "# HELP stock_dashboard_cache_events_total Cache lookups by cache and result.",
+            "# TYPE stock_dashboard_cache_events_total counter"
+        ]
+        lines += [
+            f'stock_dashboard_cache_events_total{{cache="{_label(c)}",result="{_label(r)}"}} {n}'
+            for (c, r), n in sorted(cache.items())
+        ]
+
+        lines += [
+            "# HELP stock_dashboard_payload_bytes_total Bytes sent to the browser or offered for download.",
+            "# TYPE stock_dashboard_payload_bytes_total counter"
+        ]
+        lines += [
+            f'stock_dashboard_payload_bytes_total{{payload="{_label(name)}"}} {n}'
+            for name, n in sorted(payloads.items())
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self):
+        """Prometheus 파일 저장 (수집기가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체)"""
+        if not self.out_dir:
+            return
+        tmp = f"{self.prom_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, self.prom_path)
@@ -0,0 +1,87 @@
+"""
+🖼️ mplfinance 차트 렌더링 + 이미지 캐시
+- 차트를 PNG/SVG 바이트로 그린 뒤 Figure는 바로 닫아서 서버 메모리에 쌓이지 않게 함
+- 렌더링 결과는 (종목, 기간, 스타일, 거래량, 이동평균, 데이터) 단위로 캐시
+- 캐시는 전체 바이트 크기 기준으로 오래된 것부터 제거 (메모리 상한 고정)
+"""
+
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+import mplfinance as mpf
+
+import metrics
+from charts import frame_signature
+
+# pyplot은 스레드 안전하지 않으므로 렌더링은 한 번에 하나씩
+_render_lock = threading.Lock()
+
+
+def render_chart(df, chart_style="default", volume=True, mav=(5, 20, 60),
+                 mavcolors=("green", "blue", "orange"), fmt="png"):
+    """mplfinance 캔들 차트를 이미지 바이트로 렌더링"""
+    marketcolors = mpf.make_marketcolors(up="red", down="blue")
+    mpf_style = mpf.make_mpf_style(base_mpf_style=chart_style, marketcolors=marketcolors)
+
+    with _render_lock:
+        fig, _ = mpf.plot(
+            data=df,
+            type="candle",
+            style=mpf_style,
+            figsize=(12, 7),
+            fontscale=1.0,
+            mav=mav,
+            mavcolors=mavcolors,
+            returnfig=True,
+            volume=volume
+        )
+        try:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt, bbox_inches="tight")
+        finally:
+            plt.close(fig)  # 닫지 않으면 pyplot이 Figure를 계속 들고 있음
+
+    return buffer.getvalue()
+
+
+class ImageCache:
+    """렌더링된 이미지 바이트 LRU 캐시 (전체 크기가 max_bytes를 넘으면 오래된 것부터 제거)"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, render):
+        """key에 해당하는 이미지 반환, 없으면 render()로 생성 후 저장"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                metrics.cache_event("image", "hit")
+                return data
+
+        metrics.cache_event("image", "miss")
+        data = render()
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = data
+                self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self.total_bytes -= len(old)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+def chart_key(code, df, chart_style, volume, mav, fmt="png"):
+    """이미지 캐시 키"""
+    return (code, frame_signature(df), chart_style, bool(volume), tuple(mav), fmt)
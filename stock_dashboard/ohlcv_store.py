@@ -0,0 +1,225 @@
+"""
+💾 종목별 OHLCV 로컬 저장소
+- 종목마다 Parquet 파일 하나에 과거 데이터를 한 번만 저장
+- 요청 구간 중 저장되지 않은 앞/뒤 구간만 원격에서 가져와 이어 붙임
+- 프로세스 재시작/배포 후에도 디스크에서 바로 읽어 빠르게 시작
+"""
+
+import json
+import os
+import threading
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (Parquet 엔진)
+    _FILE_EXT = ".parquet"
+except ImportError:  # pyarrow가 없으면 pickle로 대신 저장
+    _FILE_EXT = ".pkl"
+
+DEFAULT_STORE_DIR = os.environ.get(
+    "STOCK_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ohlcv_store")
+)
+
+
+def to_timestamp(value):
+    """date / datetime / 문자열을 자정 기준 Timestamp로 변환"""
+    return pd.Timestamp(value).normalize()
+
+
+class OHLCVStore:
+    """종목별 OHLCV 파일 저장소
+
+    파일 옆에 `{code}.json` 메타 파일을 두어 실제로 조회한 구간(coverage)을 기록합니다.
+    상장일 이전처럼 데이터가 없는 구간도 다시 요청하지 않기 위해서입니다.
+    데이터가 한 행도 없는 종목(상장폐지 등)은 데이터 파일 없이 메타 파일(rows=0)만 남깁니다.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR, on_revised=None):
+        self.root = root
+        self.on_revised = on_revised  # on_revised(code): 과거 가격이 바뀌어 전체를 다시 받았을 때 호출 (선택)
+        os.makedirs(self.root, exist_ok=True)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    # ---------- 파일 입출력 ----------
+
+    def _data_path(self, code):
+        return os.path.join(self.root, f"{code}{_FILE_EXT}")
+
+    def _meta_path(self, code):
+        return os.path.join(self.root, f"{code}.json")
+
+    def _lock(self, code):
+        with self._locks_guard:
+            return self._locks.setdefault(code, threading.Lock())
+
+    def read(self, code):
+        """저장된 전체 데이터와 coverage 반환 (없으면 (None, None))"""
+        data_path, meta_path = self._data_path(code), self._meta_path(code)
+        if not os.path.exists(meta_path):
+            return None, None
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if not os.path.exists(data_path):
+                if meta.get("rows") != 0:
+                    return None, None
+                df = pd.DataFrame()
+            elif _FILE_EXT == ".parquet":
+                df = pd.read_parquet(data_path)
+            else:
+                df = pd.read_pickle(data_path)
+        except (OSError, ValueError):
+            # 파일이 깨졌으면 저장되지 않은 것으로 취급하고 다시 받음
+            return None, None
+        return df, (to_timestamp(meta["start"]), to_timestamp(meta["end"]))
+
+    def read_columns(self, code, columns):
+        """DataFrame을 만들지 않고 (날짜 배열, {컬럼: 배열})만 읽음 (없으면 None)
+
+        여러 종목을 한꺼번에 훑는 스크리너/백테스트용으로, Parquet이면 필요한 컬럼만 읽습니다.
+        """
+        if _FILE_EXT != ".parquet":
+            df, _ = self.read(code)
+            if df is None or df.empty:
+                return None
+            return df.index.to_numpy(), {c: df[c].to_numpy() for c in columns}
+
+        import pyarrow.parquet as pq
+        try:
+            parquet = pq.ParquetFile(self._data_path(code))
+            index_name = parquet.schema_arrow.pandas_metadata["index_columns"][0]
+            table = parquet.read(columns=[index_name, *columns])
+        except (OSError, ValueError, KeyError, IndexError):
+            return None
+        return table.column(index_name).to_numpy(), {c: table.column(c).to_numpy() for c in columns}
+
+    def coverage(self, code):
+        """데이터 파일은 읽지 않고 메타 파일에서 coverage만 반환 (없으면 None)"""
+        try:
+            with open(self._meta_path(code), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return to_timestamp(meta["start"]), to_timestamp(meta["end"])
+
+    def write(self, code, df, coverage):
+        """임시 파일에 쓴 뒤 교체하여 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 함 (빈 데이터는 메타 파일만)"""
+        data_path, meta_path = self._data_path(code), self._meta_path(code)
+        tmp_data, tmp_meta = data_path + ".tmp", meta_path + ".tmp"
+
+        if df.empty:
+            tmp_data = None
+        elif _FILE_EXT == ".parquet":
+            df.to_parquet(tmp_data)
+        else:
+            df.to_pickle(tmp_data)
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({
+                "start": coverage[0].strftime("%Y-%m-%d"),
+                "end": coverage[1].strftime("%Y-%m-%d"),
+                "rows": len(df)
+            }, f)
+
+        if tmp_data is None:
+            if os.path.exists(data_path):
+                os.remove(data_path)
+        else:
+            os.replace(tmp_data, data_path)
+        os.replace(tmp_meta, meta_path)
+
+    # ---------- 조회 ----------
+
+    def get(self, code, start, end, fetch):
+        """[start, end] 구간 데이터 반환, 저장소에 없는 구간만 fetch(code, start, end)로 보충
+
+        오늘 봉은 장중에 계속 바뀌므로 coverage에 넣지 않고, 다음 요청 때 마지막 저장일부터 다시 받습니다.
+        다시 받은 마지막 저장일(확정된 봉)의 종가가 저장된 값과 다르면 액면분할/수정주가 등으로
+        과거 가격 기준이 바뀐 것이므로, 저장된 데이터를 버리고 전체 구간을 새로 받습니다.
+        """
+        start, end = to_timestamp(start), to_timestamp(end)
+        today = to_timestamp("today")
+
+        with self._lock(code):
+            df, coverage = self.read(code)
+            parts = []
+            rewrite = df is None
+
+            if df is None:
+                parts.append(_fetch(fetch, code, start, end))
+                new_start, new_end = start, end
+            else:
+                parts.append(df)
+                new_start, new_end = coverage
+
+                # 앞쪽에 빠진 구간
+                if start < coverage[0]:
+                    parts.append(_fetch(fetch, code, start, coverage[0] - timedelta(days=1)))
+                    new_start = start
+
+                # 뒤쪽에 빠진 구간 (마지막 저장일 포함 → 미완성 봉 갱신)
+                if end > coverage[1]:
+                    tail = _fetch(fetch, code, coverage[1], end)
+                    new_end = end
+                    if _revised(df, tail, coverage[1]):
+                        parts = [_fetch(fetch, code, new_start, new_end)]
+                        rewrite = True
+                        if self.on_revised is not None:
+                            self.on_revised(code)
+                    else:
+                        parts.append(tail)
+
+            if len(parts) > 1 or rewrite:
+                merged = _merge(parts)
+                # 오늘(및 미래)은 아직 확정되지 않았으므로 coverage에서 제외
+                new_end = min(new_end, today - timedelta(days=1))
+                if new_end < new_start:
+                    new_end = new_start
+                self.write(code, merged, (new_start, new_end))
+                df = merged
+
+        if df.empty:
+            return df
+        return df.loc[start:end]
+
+    def clear(self, code=None):
+        """저장된 파일 삭제 (code가 없으면 전체)"""
+        codes = [code] if code else [
+            name[:-len(".json")] for name in os.listdir(self.root) if name.endswith(".json")
+        ]
+        for c in codes:
+            with self._lock(c):
+                for path in (self._data_path(c), self._meta_path(c)):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+
+def _fetch(fetch, code, start, end):
+    df = fetch(code, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+    return df if df is not None else pd.DataFrame()
+
+
+def _revised(stored, fetched, last_final):
+    """last_final(확정된 마지막 저장일) 이전에 겹치는 봉의 종가가 달라졌는지"""
+    if stored.empty or fetched.empty or 'Close' not in stored.columns or 'Close' not in fetched.columns:
+        return False
+    common = stored.index[stored.index <= last_final].intersection(fetched.index)
+    if common.empty:
+        return False
+    old = stored.loc[common, 'Close'].to_numpy(dtype=float)
+    new = fetched.loc[common, 'Close'].to_numpy(dtype=float)
+    return not np.allclose(old, new, rtol=1e-9, atol=0.0, equal_nan=True)
+
+
+def _merge(parts):
+    """여러 조각을 날짜순으로 합치고 중복 날짜는 나중에 받은 값으로 덮어씀"""
+    parts = [p for p in parts if p is not None and not p.empty]
+    if not parts:
+        return pd.DataFrame()
+    merged = pd.concat(parts)
+    merged = merged[~merged.index.duplicated(keep="last")]
+    return merged.sort_index()
@@ -0,0 +1,33 @@
+"""
+⚙️ 공용 작업 프로세스 풀
+- 스크리너/백테스트처럼 종목 수백~수천 개를 CPU 코어에 나눠 계산하는 작업이 함께 사용
+- Streamlit 서버는 여러 스레드가 돌고 있어 fork 대신 spawn으로 작업 프로세스를 만듦
+- 프로세스를 띄우는 비용이 크므로 서버 프로세스 전체에서 하나만 만들어 재사용
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_WORKERS = int(os.environ.get("STOCK_PROCESS_WORKERS", "0")) or os.cpu_count() or 1
+
+_pool = None
+_lock = threading.Lock()
+
+
+def get_process_pool():
+    """공용 ProcessPoolExecutor (처음 호출될 때 생성)"""
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=DEFAULT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def chunked(items, size):
+    """items를 size개씩 나눈 목록"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
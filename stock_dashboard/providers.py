@@ -0,0 +1,219 @@
+"""
+🔌 시장 데이터 제공자 (Provider)
+- 대시보드는 fdr를 직접 부르지 않고 Provider 인터페이스를 통해 데이터를 받음
+- FDRProvider: FinanceDataReader로 실제 원격 조회
+- ReplayProvider: 미리 녹화한 파일을 지연 시간을 흉내 내며 재생 (네트워크 없이 부하/성능 측정용)
+- RecordingProvider: 다른 Provider의 응답을 재생용 파일로 녹화
+- HttpProvider: 재생 파일과 같은 구조로 CSV를 내려주는 HTTP 서버에서 조회 (연결 재사용)
+- get_provider()가 돌려주는 Provider는 모두 공용 게이트웨이(gateway.py)를 거쳐 호출됨
+
+환경 변수
+- STOCK_DATA_PROVIDER: "fdr"(기본), "replay" 또는 "http"
+- STOCK_REPLAY_DIR: 재생 파일 폴더
+- STOCK_REPLAY_LATENCY_MS: 재생 시 요청당 지연 시간(ms), "50" 또는 "20-80" 형태
+- STOCK_HTTP_BASE_URL: HttpProvider 서버 주소 (예: http://127.0.0.1:8000)
+"""
+
+import io
+import os
+import random
+import time
+
+import pandas as pd
+
+from ohlcv_store import to_timestamp
+
+DEFAULT_REPLAY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replay_data")
+
+
+class MarketDataProvider:
+    """Provider 인터페이스"""
+
+    name = "base"
+
+    def listing(self, market):
+        """시장(KOSPI/KOSDAQ/KONEX) 종목 목록"""
+        raise NotImplementedError
+
+    def ohlcv(self, code, start, end):
+        """[start, end] 구간 일봉 OHLCV (DatetimeIndex)"""
+        raise NotImplementedError
+
+
+class FDRProvider(MarketDataProvider):
+    """FinanceDataReader 원격 조회"""
+
+    name = "fdr"
+
+    def listing(self, market):
+        import FinanceDataReader as fdr
+        return fdr.StockListing(market)
+
+    def ohlcv(self, code, start, end):
+        import FinanceDataReader as fdr
+        return fdr.DataReader(code, start, end)
+
+
+class ReplayProvider(MarketDataProvider):
+    """녹화된 CSV 파일 재생
+
+    파일 구조
+    - {root}/listing/{market}.csv
+    - {root}/ohlcv/{code}.csv
+    """
+
+    name = "replay"
+
+    def __init__(self, root=DEFAULT_REPLAY_DIR, latency=(0.0, 0.0)):
+        self.root = root
+        self.latency = latency  # (최소, 최대) 초
+        self._listings = {}
+        self._frames = {}
+
+    def _sleep(self):
+        low, high = self.latency
+        if high > 0:
+            time.sleep(random.uniform(low, high))
+
+    def listing(self, market):
+        self._sleep()
+        if market not in self._listings:
+            path = os.path.join(self.root, "listing", f"{market}.csv")
+            self._listings[market] = pd.read_csv(path, dtype={"Code": str})
+        return self._listings[market].copy()
+
+    def ohlcv(self, code, start, end):
+        self._sleep()
+        if code not in self._frames:
+            path = os.path.join(self.root, "ohlcv", f"{code}.csv")
+            if not os.path.exists(path):
+                self._frames[code] = pd.DataFrame()
+            else:
+                self._frames[code] = pd.read_csv(path, index_col="Date", parse_dates=["Date"])
+        df = self._frames[code]
+        if df.empty:
+            return df.copy()
+        return df.loc[to_timestamp(start):to_timestamp(end)].copy()
+
+
+class RecordingProvider(MarketDataProvider):
+    """다른 Provider 응답을 ReplayProvider 형식으로 저장하며 그대로 전달"""
+
+    def __init__(self, inner, root=DEFAULT_REPLAY_DIR):
+        self.inner = inner
+        self.root = root
+        self.name = inner.name
+        os.makedirs(os.path.join(root, "listing"), exist_ok=True)
+        os.makedirs(os.path.join(root, "ohlcv"), exist_ok=True)
+
+    def listing(self, market):
+        df = self.inner.listing(market)
+        df.to_csv(os.path.join(self.root, "listing", f"{market}.csv"), index=False)
+        return df
+
+    def ohlcv(self, code, start, end):
+        df = self.inner.ohlcv(code, start, end)
+        path = os.path.join(self.root, "ohlcv", f"{code}.csv")
+        # 이미 녹화된 구간이 있으면 합쳐서 저장
+        if os.path.exists(path):
+            old = pd.read_csv(path, index_col="Date", parse_dates=["Date"])
+            merged = pd.concat([old, df])
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        else:
+            merged = df
+        merged.to_csv(path, index_label="Date")
+        return df
+
+
+class HttpProvider(MarketDataProvider):
+    """HTTP 서버에서 ReplayProvider와 같은 경로의 CSV를 받아 옴
+
+    - {base_url}/listing/{market}.csv
+    - {base_url}/ohlcv/{code}.csv
+
+    `python -m http.server -d replay_data` 같은 로컬 서버로 게이트웨이/부하 테스트를 할 수 있습니다.
+    하나의 requests.Session을 공유하므로 같은 서버로의 연결(keep-alive)을 재사용합니다.
+    """
+
+    name = "http"
+
+    def __init__(self, base_url, pool_size=8, timeout=(3.05, 10.0)):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout  # (연결, 읽기) 초
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _get_csv(self, path, **kwargs):
+        response = self.session.get(f"{self.base_url}/{path}", timeout=self.timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return pd.read_csv(io.StringIO(response.text), **kwargs)
+
+    def listing(self, market):
+        df = self._get_csv(f"listing/{market}.csv", dtype={"Code": str})
+        if df is None:
+            raise ValueError(f"종목 목록 없음: {market}")
+        return df
+
+    def ohlcv(self, code, start, end):
+        df = self._get_csv(f"ohlcv/{code}.csv", index_col="Date", parse_dates=["Date"])
+        if df is None:
+            return pd.DataFrame()
+        return df.loc[to_timestamp(start):to_timestamp(end)]
+
+
+def _parse_latency(text):
+    """"50" → (0.05, 0.05), "20-80" → (0.02, 0.08)"""
+    if not text:
+        return (0.0, 0.0)
+    low, _, high = text.partition("-")
+    low = float(low) / 1000
+    return (low, float(high) / 1000 if high else low)
+
+
+def _create_provider(kind):
+    if kind == "replay":
+        return ReplayProvider(
+            os.environ.get("STOCK_REPLAY_DIR", DEFAULT_REPLAY_DIR),
+            latency=_parse_latency(os.environ.get("STOCK_REPLAY_LATENCY_MS"))
+        )
+    if kind == "http":
+        return HttpProvider(os.environ["STOCK_HTTP_BASE_URL"])
+    if kind == "fdr":
+        return FDRProvider()
+    raise ValueError(f"알 수 없는 STOCK_DATA_PROVIDER: {kind}")
+
+
+def get_provider():
+    """환경 변수에 따라 Provider 생성 (공용 게이트웨이를 거쳐 호출)"""
+    from gateway import GatewayProvider, default_gateway  # gateway가 이 모듈을 import하므로 여기서
+
+    kind = os.environ.get("STOCK_DATA_PROVIDER", "fdr").lower()
+    return GatewayProvider(_create_provider(kind), default_gateway())
+
+
+if __name__ == "__main__":
+    # 재생용 데이터 녹화
+    # 예) python providers.py KOSPI --top 50 --start 2020-01-01
+    import argparse
+
+    parser = argparse.ArgumentParser(description="재생용 시장 데이터 녹화")
+    parser.add_argument("markets", nargs="+", help="KOSPI / KOSDAQ / KONEX")
+    parser.add_argument("--top", type=int, default=20, help="시장별 시총 상위 N개 종목의 OHLCV 녹화")
+    parser.add_argument("--start", default="2020-01-01")
+    parser.add_argument("--end", default=pd.Timestamp("today").strftime("%Y-%m-%d"))
+    parser.add_argument("--out", default=DEFAULT_REPLAY_DIR)
+    args = parser.parse_args()
+
+    recorder = RecordingProvider(FDRProvider(), args.out)
+    for market in args.markets:
+        listing = recorder.listing(market).sort_values("Marcap", ascending=False)
+        for code in listing["Code"].head(args.top):
+            recorder.ohlcv(code, args.start, args.end)
+            print(f"{market} {code} 녹화 완료")
@@ -0,0 +1,160 @@
+"""
+🗂️ 구간 인식 메모리 캐시
+- 종목별로 보유 중인 날짜 구간을 기억하고, 겹치거나 붙어 있는 구간은 하나로 병합
+- 요청 구간이 보유 구간 안에 있으면 DatetimeIndex 슬라이싱만으로 응답 (원격 호출 없음)
+- 기간 프리셋(6개월 → 3개월 → 1년)이나 날짜를 하루 바꾸는 정도는 모두 캐시 적중
+- 전체 크기 상한이 있어 넘으면 가장 오래 쓰지 않은 종목부터 제거 (종목 단위 LRU)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+
+import pandas as pd
+
+from ohlcv_store import to_timestamp
+
+_ONE_DAY = timedelta(days=1)
+
+
+@dataclass
+class _Interval:
+    start: pd.Timestamp
+    end: pd.Timestamp
+    df: pd.DataFrame
+    expires_at: float  # 오늘 봉을 포함한 구간만 만료 시각이 있음 (나머지는 inf)
+
+
+class RangeCache:
+    """종목별 [start, end] 구간 캐시
+
+    오늘을 포함하는 구간은 장중 가격이 바뀌므로 `live_ttl`초 후 만료되고,
+    과거로 확정된 구간은 만료되지 않습니다.
+    보유 데이터 전체 크기가 `max_bytes`를 넘으면 가장 오래 조회/저장되지 않은 종목의 구간을 모두 제거합니다.
+    """
+
+    def __init__(self, live_ttl=300, max_bytes=256 * 1024 * 1024):
+        self.live_ttl = live_ttl
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._intervals = {}         # code -> 시작일 순으로 정렬된 _Interval 리스트
+        self._sizes = OrderedDict()  # code -> 보유 구간 크기(바이트), 오래 쓰지 않은 종목이 앞
+        self._lock = threading.Lock()
+
+    def lookup(self, code, start, end):
+        """보유 구간에서 [start, end]를 잘라 (df, stale) 반환 (없으면 (None, None))
+
+        만료된 구간도 데이터는 그대로 돌려주고, stale에 해당 구간의 (start, end)를 담아 알려줍니다.
+        """
+        start, end = to_timestamp(start), to_timestamp(end)
+        now = time.time()
+        with self._lock:
+            for interval in self._intervals.get(code, ()):
+                if interval.start <= start and end <= interval.end:
+                    self._sizes.move_to_end(code)
+                    stale = (interval.start, interval.end) if interval.expires_at <= now else None
+                    # 복사하지 않은 슬라이스 (Copy-on-Write라 받는 쪽이 수정해도 캐시는 그대로)
+                    return interval.df.loc[start:end], stale
+        return None, None
+
+    def get(self, code, start, end):
+        """만료되지 않은 보유 구간에서 [start, end]를 잘라 반환 (없으면 None)"""
+        df, stale = self.lookup(code, start, end)
+        return None if stale else df
+
+    def invalidate(self, code, start=None, end=None):
+        """[start, end]와 겹치는 구간을 만료 처리 (데이터는 갱신될 때까지 계속 제공), 만료된 구간 수 반환"""
+        start = to_timestamp(start) if start is not None else None
+        end = to_timestamp(end) if end is not None else None
+        count = 0
+        with self._lock:
+            for interval in self._intervals.get(code, ()):
+                if (end is None or interval.start <= end) and (start is None or start <= interval.end):
+                    interval.expires_at = 0.0
+                    count += 1
+        return count
+
+    def put(self, code, start, end, df):
+        """[start, end] 구간 데이터 저장, 겹치거나 이어지는 기존 구간과 병합"""
+        start, end = to_timestamp(start), to_timestamp(end)
+        new = _Interval(start, end, df, self._expires_at(end))
+
+        with self._lock:
+            kept, merging = [], [new]
+            for interval in self._intervals.get(code, ()):
+                if interval.start <= end + _ONE_DAY and start - _ONE_DAY <= interval.end:
+                    merging.append(interval)
+                else:
+                    kept.append(interval)
+
+            if len(merging) > 1:
+                # 새로 받은 데이터(merging[0])가 중복 날짜에서 우선
+                frames = [i.df for i in reversed(merging) if not i.df.empty]
+                merged_df = pd.concat(frames) if frames else df
+                merged_df = merged_df[~merged_df.index.duplicated(keep="last")].sort_index()
+                merged_end = max(i.end for i in merging)
+                # 새 데이터가 끝부분까지 덮으면 오래된 오늘 봉도 교체된 것이므로 새 만료 시각을 사용
+                expires_at = new.expires_at if end >= merged_end else min(i.expires_at for i in merging)
+                new = _Interval(
+                    min(i.start for i in merging),
+                    merged_end,
+                    merged_df,
+                    expires_at
+                )
+
+            kept.append(new)
+            kept.sort(key=lambda i: i.start)
+            self._intervals[code] = kept
+            self._resize(code, sum(_frame_bytes(i.df) for i in kept))
+            self._evict(keep=code)
+
+    def last_bar(self, code):
+        """보유 중인 가장 최근 봉 날짜 (없으면 None)"""
+        with self._lock:
+            frames = [i.df for i in self._intervals.get(code, ()) if not i.df.empty]
+        return frames[-1].index[-1] if frames else None
+
+    def intervals(self, code):
+        """보유 중인 (start, end) 구간 목록"""
+        with self._lock:
+            return [(i.start, i.end) for i in self._intervals.get(code, ())]
+
+    def clear(self, code=None):
+        with self._lock:
+            if code is None:
+                self._intervals.clear()
+                self._sizes.clear()
+                self.total_bytes = 0
+            else:
+                self._intervals.pop(code, None)
+                self.total_bytes -= self._sizes.pop(code, 0)
+
+    def _resize(self, code, size):
+        """종목 크기 갱신 후 가장 최근 사용으로 표시 (잠금을 잡은 상태에서 호출)"""
+        self.total_bytes += size - self._sizes.get(code, 0)
+        self._sizes[code] = size
+        self._sizes.move_to_end(code)
+
+    def _evict(self, keep):
+        """전체 크기가 max_bytes 이하가 될 때까지 오래 쓰지 않은 종목 제거 (방금 넣은 종목은 제외)"""
+        while self.total_bytes > self.max_bytes and len(self._sizes) > 1:
+            code = next(iter(self._sizes))
+            if code == keep:
+                break
+            self.total_bytes -= self._sizes.pop(code)
+            self._intervals.pop(code, None)
+
+    def _expires_at(self, end):
+        if end >= to_timestamp("today"):
+            return time.time() + self.live_ttl
+        return float("inf")
+
+
+def _frame_bytes(df):
+    """컬럼 + 인덱스 배열 크기 (문자열 내용은 세지 않는 얕은 크기)
+
+    memory_usage(index=True)는 조회 후 만들어지는 인덱스 해시 테이블까지 더해 값이 바뀌므로 쓰지 않습니다.
+    """
+    return int(df.memory_usage(index=False).sum()) + df.index.nbytes
@@ -0,0 +1,143 @@
+"""
+🔎 시장 전체 종목 스크리너
+- 시장(KOSPI/KOSDAQ 등) 전 종목에 대해 기간 수익률/변동성/고저가/거래량 통계와 MA/RSI를 계산
+- 종목 목록을 묶음(chunk)으로 나눠 프로세스 풀에서 병렬 처리
+- 작업 프로세스는 로컬 저장소(OHLCVStore) 파일을 직접 읽으므로 데이터를 프로세스 간에 복사하지 않음
+- 저장소에 없는 종목만 먼저 MarketData로 받아 저장소를 채움 (MarketData.ensure_stored)
+- 결과 표는 (종목 목록, 기간)별로 잠시 보관해 정렬/필터 변경 시 다시 계산하지 않음
+"""
+
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from indicators import compute_arrays
+from ohlcv_store import OHLCVStore, to_timestamp
+from process_pool import chunked, get_process_pool
+
+INDICATOR_HISTORY = timedelta(days=120)  # MA60 계산용으로 조회 시작일 이전에 더 읽는 기간
+STAT_INPUTS = ('High', 'Low', 'Close', 'Volume')
+
+COLUMN_LABELS = {
+    'code': '코드',
+    'name': '종목명',
+    'current_price': '현재가',
+    'change_pct': '등락률(%)',
+    'period_return': '기간 수익률(%)',
+    'volatility': '변동성(%)',
+    'high': '최고가',
+    'low': '최저가',
+    'volume_current': '거래량',
+    'volume_avg': '평균 거래량',
+    'volume_ratio': '거래량 배수',
+    'ma20': 'MA20',
+    'ma60': 'MA60',
+    'rsi': 'RSI'
+}
+
+
+def ticker_stats(dates, data, start):
+    """한 종목 통계 (stats.calculate_stats와 같은 정의 + MA/RSI/거래량 배수)
+
+    dates/data는 지표 계산용으로 start 이전 기록을 포함할 수 있으며, 통계는 start 이후 구간으로 계산합니다.
+    """
+    begin = np.searchsorted(dates, np.datetime64(start))
+    if len(dates) - begin < 2:
+        return None
+    indicators = compute_arrays(data, ['MA', 'Daily_Return', 'RSI'])
+
+    close = data['Close'][begin:].astype(float)
+    volume = data['Volume'][begin:].astype(float)
+    daily_return = indicators['Daily_Return'][begin:]
+    volume_avg = volume.mean()
+    return {
+        'current_price': close[-1],
+        'change_pct': daily_return[-1],
+        'period_return': (close[-1] - close[0]) / close[0] * 100,
+        'volatility': np.nanstd(daily_return, ddof=1),
+        'high': data['High'][begin:].max(),
+        'low': data['Low'][begin:].min(),
+        'volume_current': volume[-1],
+        'volume_avg': volume_avg,
+        'volume_ratio': volume[-1] / volume_avg if volume_avg > 0 else np.nan,
+        'ma20': indicators['MA20'][-1],
+        'ma60': indicators['MA60'][-1],
+        'rsi': indicators['RSI'][-1]
+    }
+
+
+def _screen_chunk(store_root, codes, start, end):
+    """작업 프로세스: 저장소에서 종목들을 읽어 통계 목록 반환"""
+    store = OHLCVStore(store_root)
+    first, last = np.datetime64(start - INDICATOR_HISTORY), np.datetime64(end)
+    rows = []
+    for code in codes:
+        loaded = store.read_columns(code, STAT_INPUTS)
+        if loaded is None:
+            continue
+        dates, data = loaded
+        lo, hi = np.searchsorted(dates, first), np.searchsorted(dates, last, side='right')
+        stats = ticker_stats(dates[lo:hi], {c: v[lo:hi] for c, v in data.items()}, start)
+        if stats is not None:
+            stats['code'] = code
+            rows.append(stats)
+    return rows
+
+
+class Screener:
+    """프로세스 풀 기반 스크리너 (서버 프로세스 전체에서 하나를 공유)"""
+
+    def __init__(self, market_data, chunk_size=100, ttl=300, pool=None):
+        self.market_data = market_data
+        self.chunk_size = chunk_size
+        self.ttl = ttl
+        self.pool = pool  # 없으면 공용 프로세스 풀
+        self._results = {}  # (codes, start, end) -> (계산 시각, DataFrame)
+        self._lock = threading.Lock()
+
+    def run(self, codes, start, end):
+        """종목 목록 전체 통계 DataFrame (index: 종목코드)"""
+        start, end = to_timestamp(start), to_timestamp(end)
+        key = (tuple(codes), start, end)
+        with self._lock:
+            cached = self._results.get(key)
+        if cached is not None and time.time() - cached[0] < self.ttl:
+            return cached[1]
+
+        self.market_data.ensure_stored(codes, start - INDICATOR_HISTORY, end)
+        chunks = chunked(list(codes), self.chunk_size)
+        rows = []
+        root = self.market_data.store.root
+        pool = self.pool or get_process_pool()
+        for part in pool.map(_screen_chunk, [root] * len(chunks), chunks,
+                                     [start] * len(chunks), [end] * len(chunks)):
+            rows.extend(part)
+
+        table = pd.DataFrame(rows, columns=['code'] + [c for c in COLUMN_LABELS if c not in ('code', 'name')])
+        table = table.set_index('code')
+        with self._lock:
+            self._results = {k: v for k, v in self._results.items() if time.time() - v[0] < self.ttl}
+            self._results[key] = (time.time(), table)
+        return table
+
+
+def apply_filters(table, above_ma20=False, above_ma60=False, volume_multiple=None,
+                  rsi_range=None, min_return=None):
+    """조건에 맞는 종목만 남김 (불리언 마스크 한 번으로 계산)"""
+    mask = np.ones(len(table), dtype=bool)
+    price = table['current_price']
+    if above_ma20:
+        mask &= (price > table['ma20']).to_numpy()
+    if above_ma60:
+        mask &= (price > table['ma60']).to_numpy()
+    if volume_multiple:
+        mask &= (table['volume_ratio'] >= volume_multiple).to_numpy()
+    if rsi_range is not None:
+        low, high = rsi_range
+        mask &= table['rsi'].between(low, high).to_numpy()
+    if min_return is not None:
+        mask &= (table['period_return'] >= min_return).to_numpy()
+    return table[mask]
@@ -0,0 +1,121 @@
+"""
+🔍 종목 검색 인덱스
+- 종목명/코드/초성 문자열의 1~2글자(n-gram) 색인을 미리 만들어 두고 후보만 확인
+- 초성 검색 지원: "ㅅㅅㅈㅈ" → 삼성전자, 한글과 섞어 써도 됨: "삼성ㅈㅈ" → 삼성전자
+- 결과는 시가총액 순 (접두어가 일치하는 종목 우선), 표시용 라벨은 SecurityMaster(MarketListing.labels)가 담당
+- 시장별로 한 번만 만들어 모든 세션이 공유
+"""
+
+CHOSEONG = [
+    'ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ',
+    'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ'
+]
+_HANGUL_BASE, _HANGUL_LAST = 0xAC00, 0xD7A3
+_JUNG_JONG = 21 * 28  # 중성 × 종성 조합 수
+
+
+def to_choseong(text):
+    """한글 음절을 초성으로 변환 (한글이 아닌 글자는 그대로)"""
+    chars = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            chars.append(CHOSEONG[(code - _HANGUL_BASE) // _JUNG_JONG])
+        else:
+            chars.append(ch)
+    return ''.join(chars)
+
+
+def _is_choseong(ch):
+    return 'ㄱ' <= ch <= 'ㅎ'
+
+
+def _is_syllable(ch):
+    return _HANGUL_BASE <= ord(ch) <= _HANGUL_LAST
+
+
+def _grams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class SearchIndex:
+    """시가총액 순으로 정렬된 종목 목록의 검색 인덱스
+
+    행 번호가 곧 시가총액 순위이므로, 후보 행 번호를 정렬하기만 하면 순위 정렬이 됩니다.
+    """
+
+    def __init__(self, stocks_df):
+        self.codes = stocks_df['Code'].astype(str).tolist()
+        self.names = stocks_df['Name'].astype(str).tolist()
+
+        # 행마다 검색 대상 문자열: 종목명(소문자), 코드, 종목명 초성
+        self._texts = [
+            (name.lower(), code, to_choseong(name.lower()))
+            for code, name in zip(self.codes, self.names)
+        ]
+
+        # 1글자/2글자 n-gram → 행 번호 목록 (행 번호 오름차순)
+        self._postings = {}
+        for row, texts in enumerate(self._texts):
+            grams = set()
+            for text in texts:
+                grams |= _grams(text, 1) | _grams(text, 2)
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(row)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def search(self, query, limit=None):
+        """검색어와 일치하는 행 번호 목록 (접두어 일치 우선, 그 다음 시가총액 순)"""
+        query = query.strip().lower()
+        if not query:
+            return list(range(min(limit or len(self), len(self))))
+
+        # 완성된 글자와 초성이 섞인 검색어는 초성 문자열로 후보를 찾은 뒤 글자 단위로 확인
+        mixed = any(map(_is_choseong, query)) and any(map(_is_syllable, query))
+        key = to_choseong(query) if mixed else query
+
+        grams = _grams(key, 2) if len(key) >= 2 else {key}
+        postings = [self._postings.get(gram) for gram in grams]
+        if not all(postings):
+            return []
+
+        # 가장 짧은 목록부터 교집합 → 후보만 실제 문자열로 확인
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+
+        prefix, contains = [], []
+        for row in sorted(candidates):
+            if mixed:
+                position = self._find_mixed(row, query, key)
+                if position == 0:
+                    prefix.append(row)
+                elif position > 0:
+                    contains.append(row)
+                continue
+            texts = self._texts[row]
+            if any(text.startswith(query) for text in texts):
+                prefix.append(row)
+            elif any(query in text for text in texts):
+                contains.append(row)
+
+        results = prefix + contains
+        return results[:limit] if limit else results
+
+    def _find_mixed(self, row, query, key):
+        """초성이 섞인 검색어가 종목명에서 처음 일치하는 위치 (없으면 -1)
+
+        검색어의 초성은 그 자리 글자의 초성과, 나머지 글자는 종목명 글자와 같아야 합니다.
+        """
+        name, _, choseong = self._texts[row]
+        position = choseong.find(key)
+        while position >= 0:
+            if all(q in (n, c) for q, n, c in zip(query, name[position:], choseong[position:])):
+                return position
+            position = choseong.find(key, position + 1)
+        return -1
@@ -0,0 +1,185 @@
+"""
+🏷️ 종목 마스터 (Security Master)
+- KOSPI/KOSDAQ/KONEX 종목 목록을 시장별로 한 번만 불러와 시가총액 순으로 보관
+- 코드 → 행, 종목명 → 코드 해시맵과 표시용 라벨을 미리 만들어 O(1) 조회
+- 네 개 대시보드가 모두 이 모듈로 종목 목록/라벨/검색 인덱스를 사용
+"""
+
+import logging
+import threading
+import time
+
+import metrics
+from search_index import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+MARKETS = ('KOSPI', 'KOSDAQ', 'KONEX')
+
+
+class MarketListing:
+    """한 시장의 종목 목록과 조회용 맵"""
+
+    def __init__(self, market, df):
+        self.market = market
+        self.df = df
+        self.codes = df['Code'].astype(str).tolist()
+        self.names = df['Name'].astype(str).tolist()
+        self.row_by_code = {code: row for row, code in enumerate(self.codes)}
+        self.code_by_name = {}
+        for code, name in zip(self.codes, self.names):
+            self.code_by_name.setdefault(name, code)  # 같은 이름이면 시총이 큰 종목
+        self._labels = {}
+        self._search_index = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.codes)
+
+    def labels(self, sep=" - "):
+        """"코드{sep}종목명" 라벨 목록 (구분자별로 한 번만 생성)"""
+        with self._lock:
+            if sep not in self._labels:
+                self._labels[sep] = [f"{code}{sep}{name}" for code, name in zip(self.codes, self.names)]
+            return self._labels[sep]
+
+    @property
+    def search_index(self):
+        with self._lock:
+            if self._search_index is None:
+                self._search_index = SearchIndex(self.df)
+            return self._search_index
+
+
+class SecurityMaster:
+    """시장별 MarketListing 보관소 (시장마다 처음 요청될 때 한 번만 불러옴)
+
+    ttl(초)이 지난 목록은 다음 요청 때 다시 불러오고,
+    reload()는 새 목록을 다 만든 뒤에 교체하므로 그동안에는 기존 목록이 그대로 제공됩니다.
+    목록 조회(원격 호출)는 잠금 밖에서 하므로 한 시장을 불러오는 동안에도 다른 조회는 막히지 않고,
+    다시 불러오기가 실패하면(회로 차단기 열림, 네트워크 오류 등) 기존 목록을 계속 제공하며
+    `retry_backoff`초 뒤에 다시 시도합니다.
+    """
+
+    def __init__(self, load_listing, ttl=None, retry_backoff=30.0):
+        self._load_listing = load_listing  # market -> 시총 순으로 정렬된 DataFrame
+        self.ttl = ttl
+        self.retry_backoff = retry_backoff
+        self._markets = {}
+        self._loaded_at = {}
+        self._retry_at = {}   # market -> 실패 후 다시 불러오기를 시도할 시각
+        self._loading = {}    # market -> 불러오는 중에 잡는 Lock (시장별)
+        self._lock = threading.Lock()
+
+    def age(self, market):
+        """불러온 지 몇 초 지났는지 (아직 안 불러왔으면 None)"""
+        loaded_at = self._loaded_at.get(market)
+        return None if loaded_at is None else time.time() - loaded_at
+
+    def _expired(self, market):
+        age = self.age(market)
+        if age is None:
+            return True
+        if self.ttl is None or age < self.ttl:
+            return False
+        return time.time() >= self._retry_at.get(market, 0.0)
+
+    def market(self, market="KOSPI"):
+        listing = self._markets.get(market)
+        if listing is not None and not self._expired(market):
+            metrics.cache_event("listing", "hit")
+            return listing
+
+        loading = self._loading_lock(market)
+        if listing is None:
+            loading.acquire()  # 처음 불러오는 시장은 목록이 없으므로 기다림
+        elif not loading.acquire(blocking=False):
+            # 다른 세션이 다시 불러오는 중이면 기다리지 않고 기존 목록 제공
+            metrics.cache_event("listing", "stale")
+            return listing
+
+        try:
+            current = self._markets.get(market)
+            if current is not None and not self._expired(market):
+                metrics.cache_event("listing", "hit")
+                return current
+            metrics.cache_event("listing", "miss")
+            return self._reload_or_keep(market, current)
+        finally:
+            loading.release()
+
+    def refresh_ahead(self, market, fraction=0.5):
+        """ttl의 fraction이 지난 목록을 만료 전에 미리 다시 불러옴 (워밍업용)
+
+        market()과 같은 시장별 잠금/재시도 대기를 쓰며, 실패하면 기존 목록을 그대로 돌려줍니다.
+        """
+        age = self.age(market)
+        if (self.ttl is None or age is None or age < self.ttl * fraction
+                or time.time() < self._retry_at.get(market, 0.0)):
+            return self.market(market)
+        loading = self._loading_lock(market)
+        if not loading.acquire(blocking=False):
+            return self.market(market)  # 다른 쪽에서 이미 불러오는 중
+        try:
+            return self._reload_or_keep(market, self._markets.get(market))
+        finally:
+            loading.release()
+
+    def _loading_lock(self, market):
+        with self._lock:
+            return self._loading.setdefault(market, threading.Lock())
+
+    def _reload_or_keep(self, market, current):
+        """다시 불러오기, 실패하면 기존 목록을 유지하고 retry_backoff초 동안 다시 시도하지 않음"""
+        try:
+            return self.reload(market)
+        except Exception:
+            if current is None:
+                raise
+            logger.exception("%s 종목 목록 갱신 실패, 기존 목록 유지", market)
+            with self._lock:
+                self._retry_at[market] = time.time() + self.retry_backoff
+            return current
+
+    def reload(self, market):
+        """목록을 새로 불러와 교체 (조회는 잠금 밖에서, 실패하면 예외를 그대로 전달)"""
+        listing = MarketListing(market, self._load_listing(market))
+        with self._lock:
+            self._markets[market] = listing
+            self._loaded_at[market] = time.time()
+            self._retry_at.pop(market, None)
+        return listing
+
+    def load_all(self):
+        """세 시장을 모두 미리 불러옴"""
+        for market in MARKETS:
+            self.market(market)
+
+    def find(self, code):
+        """코드로 (시장, 행 번호) 찾기 (불러온 시장 중에서)"""
+        for market, listing in self._markets.items():
+            row = listing.row_by_code.get(code)
+            if row is not None:
+                return market, row
+        return None
+
+    def name_of(self, code):
+        found = self.find(code)
+        if found is None:
+            return None
+        market, row = found
+        return self._markets[market].names[row]
+
+    def code_of(self, name, market="KOSPI"):
+        return self.market(market).code_by_name.get(name)
+
+
+def sort_listing(df, sort="Marcap"):
+    """시가총액 순 정렬 + 필요한 컬럼만 선택 (Market/Sector는 있을 때만)"""
+    df = df.sort_values(sort, ascending=False)
+    columns = ["Code", "Name", "Marcap"]
+    if "Market" in df.columns:
+        columns.insert(2, "Market")
+    if "Sector" in df.columns:
+        columns.insert(3, "Sector")
+    return df[columns].reset_index(drop=True)
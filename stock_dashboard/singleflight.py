@@ -0,0 +1,57 @@
+"""
+🛫 Single-flight (동시 요청 합치기)
+- 같은 키로 동시에 들어온 호출은 첫 호출만 실제로 실행하고 나머지는 그 결과를 기다림
+- 예외도 기다리던 호출 모두에게 그대로 전달
+- 실행 횟수 / 합쳐진 횟수를 집계
+"""
+
+import threading
+from collections import Counter
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """키별로 진행 중인 호출을 하나만 유지"""
+
+    def __init__(self):
+        self.counters = Counter()  # executed: 실제 실행, shared: 다른 호출 결과를 받아 간 횟수
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """key로 진행 중인 호출이 있으면 그 결과를, 없으면 fn()을 실행한 결과를 반환"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.counters["executed"] += 1
+            else:
+                self.counters["shared"] += 1
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self):
+        """현재 진행 중인 키 수"""
+        with self._lock:
+            return len(self._calls)
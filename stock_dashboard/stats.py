@@ -0,0 +1,24 @@
+"""
+📋 종목 통계 카드 계산
+- stock_4의 통계 카드/상세 통계에 쓰는 값 (Streamlit 없이 import 가능해 벤치마크에서도 사용)
+"""
+
+
+def calculate_stats(df, indicators):
+    """통계 정보 계산 (df: 원본 OHLCV, indicators: 지표)"""
+    if df is None or df.empty:
+        return {}
+
+    period_return = ((df['Close'].iloc[-1] - df['Close'].iloc[0]) / df['Close'].iloc[0] * 100)
+
+    return {
+        'current_price': df['Close'].iloc[-1],
+        'change': df['Close'].iloc[-1] - df['Close'].iloc[-2] if len(df) > 1 else 0,
+        'change_pct': indicators['Daily_Return'].iloc[-1] if 'Daily_Return' in indicators.columns else 0,
+        'high': df['High'].max(),
+        'low': df['Low'].min(),
+        'volume_avg': df['Volume'].mean(),
+        'volume_current': df['Volume'].iloc[-1],
+        'period_return': period_return,
+        'volatility': indicators['Daily_Return'].std() if 'Daily_Return' in indicators.columns else 0
+    }
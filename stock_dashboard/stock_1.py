@@ -4,32 +4,41 @@
 """
 
 import streamlit as st
-import FinanceDataReader as fdr
 from datetime import datetime, timedelta
 
+from charts import frame_signature
+from providers import get_provider
+from security_master import SecurityMaster, sort_listing
+from table_view import SORT_COLUMNS, TableViews, page_count, table_page
+
 # 제목
 st.title("📈 주가 보기")
 
 # ========== 사이드바 ==========
 st.sidebar.header("⚙️ 설정하기")
 
-# 1. 종목 선택 - 간단하게 유명한 종목만
-stock_list = {
-    "삼성전자": "005930",
-    "SK하이닉스": "000660",
-    "네이버": "035420",
-    "카카오": "035720",
-    "현대차": "005380",
-    "LG에너지솔루션": "373220",
-    "삼성바이오로직스": "207940",
-    "셀트리온": "068270",
-    "POSCO홀딩스": "005490",
-    "KB금융": "105560"
-}
-
-# 종목 고르기
-choice = st.sidebar.selectbox("종목을 선택하세요", list(stock_list.keys()))
-code = stock_list[choice]  # 선택한 종목의 코드 가져오기
+# 종목 마스터 - 종목 목록을 한 번만 불러와서 모든 사용자가 같이 씀
+@st.cache_resource(ttl=3600)
+def get_security_master():
+    return SecurityMaster(lambda market: sort_listing(get_provider().listing(market)))
+
+# 표 정렬 순서 - 한 번 정렬한 순서를 기억해 두고 모든 사용자가 같이 씀
+@st.cache_resource
+def get_table_views():
+    return TableViews()
+
+# 1. 종목 선택 - 간단하게 시가총액 상위 10개 종목만
+try:
+    kospi = get_security_master().market("KOSPI")
+except Exception as e:
+    st.error(f"❌ 종목 목록을 불러오지 못했습니다: {e}")
+    st.stop()
+stock_names = kospi.names[:10]
+
+# 종목 고르기 - 몇 번째 종목인지(행 번호)를 고르면 이름이 같은 종목도 헷갈리지 않음
+row = st.sidebar.selectbox("종목을 선택하세요", range(len(stock_names)), format_func=stock_names.__getitem__)
+choice = stock_names[row]
+code = kospi.codes[row]  # 선택한 종목의 코드 가져오기
 
 # 2. 기간 선택 - 간단하게
 period = st.sidebar.radio(
@@ -66,8 +75,8 @@ st.write(f"기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m
 
 # 데이터 가져오기
 try:
-    # 주가 데이터 불러오기
-    df = fdr.DataReader(code, start_date, end_date)
+    # 주가 데이터 불러오기 (환경 변수로 fdr 대신 재생 데이터도 사용 가능)
+    df = get_provider().ohlcv(code, start_date, end_date)
     
     # 데이터가 있는지 확인
     if len(df) == 0:
@@ -108,14 +117,17 @@ try:
         
         # 3. 표로 보기 (펼치기/접기 가능)
         with st.expander("📊 데이터 표로 보기"):
-            # 최근 것부터 보이게 뒤집기
-            df_show = df[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
-            df_show.columns = ['시가', '고가', '저가', '종가', '거래량']
+            # 정렬 기준 고르기 (기본: 날짜 최신순)
+            col_a, col_b = st.columns(2)
+            sort_column = col_a.selectbox("정렬 기준", SORT_COLUMNS)
+            ascending = col_b.checkbox("작은 값(오래된 날짜)부터", value=False)
             
-            # 날짜 최신순으로 정렬
-            df_show = df_show.sort_index(ascending=False)
+            # 정렬은 서버에서 한 번만 하고, 화면에는 고른 페이지(20행)만 보내기
+            positions = get_table_views().order((code, frame_signature(df)), df, sort_column, ascending)
+            pages = page_count(len(positions), 20)
+            page_no = st.number_input(f"페이지 (전체 {pages})", min_value=1, max_value=pages, value=1)
             
-            st.dataframe(df_show)
+            st.dataframe(table_page(df, positions, page_no - 1, 20).rows)
 
 except Exception as e:
     # 에러가 나면 메시지 보여주기
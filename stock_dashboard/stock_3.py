@@ -1,16 +1,23 @@
 # claude 통해 jake님 코드 수정 버전 
 import streamlit as st
-import FinanceDataReader as fdr 
-import mplfinance as mpf 
-import matplotlib.pyplot as plt 
 from datetime import datetime, date, timedelta 
 
+from aggregation import TIMEFRAMES, TIMEFRAME_UNITS, auto_timeframe, resample_ohlcv
+from market_data import MarketData
+from mpl_charts import ImageCache, chart_key, render_chart
+from security_master import SecurityMaster, sort_listing
+
 st.title("📈 주가 데이터 시각화")
 
 # ----------------------------------------- 함수 정의 ----------------------------------------- 
 
+# 구간 캐시 + 로컬 저장소 (한 번 받은 구간은 메모리/디스크에 두고, 하위 구간은 슬라이싱으로 응답)
+@st.cache_resource
+def get_market_data():
+    return MarketData()
+
 # 일정 기간에 따른 특정 종목 주가 데이터를 df로 반환하는 함수 
-@st.cache_data # 외부 대규모 데이터에서 값을 가져오기 때문에 캐시를 적용하여 효율을 높임 
+# (날짜가 조금만 바뀌어도 캐시 미스가 나는 st.cache_data 대신 구간 캐시 사용)
 def get_stock_data(code:str="005930", start=None, end=None):
     # 기본값 처리
     if start is None:
@@ -30,15 +37,17 @@ def get_stock_data(code:str="005930", start=None, end=None):
     else:
         end_formatted = datetime.strptime(end, "%Y-%m-%d").strftime("%Y-%m-%d")
     
-    # df 반환 
-    return fdr.DataReader(code, start_formatted, end_formatted)
+    # df 반환 (보유 구간에 없을 때만 저장소/fdr 조회)
+    return get_market_data().ohlcv(code, start_formatted, end_formatted)
+
+# 종목 마스터 (시장별 목록, 코드/종목명 맵, 표시용 라벨을 한 번만 만들어 모든 세션이 공유)
+@st.cache_resource(ttl=3600)
+def get_security_master():
+    return SecurityMaster(lambda market: sort_listing(get_market_data().listing(market)))
 
-# 회사명과 시가 총액을 기준으로 정렬된 종목 코드를 df로 반환하는 함수
-@st.cache_data
-def get_stock_code(market="KOSPI", sort="Marcap"):
-    df = fdr.StockListing(market)
-    df.sort_values(by=sort, ascending=False, inplace=True) # sort를 기준으로 정렬 (내림차순)
-    return df[["Code", "Name", "Marcap"]] # 종목 코드, 회사명, 시총 반환 
+# 시가 총액 순으로 정렬된 종목 목록을 반환하는 함수 (codes / names / labels() 제공)
+def get_stock_code(market="KOSPI"):
+    return get_security_master().market(market)
 
 # ----------------------------------------- 세션 정의 ----------------------------------------- 
 
@@ -60,6 +69,10 @@ if "date_end" not in st.session_state:
 if "chart_style" not in st.session_state:
     st.session_state["chart_style"] = "default"
 
+# 봉 단위 (자동이면 기간이 길 때 주봉/월봉으로 묶음)
+if "timeframe" not in st.session_state:
+    st.session_state["timeframe"] = "자동"
+
 # ----------------------------------------- 사이드바 설정 ----------------------------------------- 
 
 # 사이드바에서 여러 요소들을 입력받아 메인의 차트로 출력할 수 있도록 폼으로 구성 
@@ -68,15 +81,13 @@ with st.sidebar.form(key="side_form"):
 
     #  ------------------ 1. 종목 코드 선택 ------------------
     
-    # selectbox의 options 매개변수에 전달할 리스트 생성 
-    codes_df = get_stock_code()
-    choices_tuple = zip(codes_df["Code"], codes_df["Name"]) # 종목 코드와 종목명을 1:1로 매칭
-    choices_list = [" : ".join(i) for i in choices_tuple] # selectbox에서 options 매개변수에 전달할 리스트 생성 
+    # 종목 마스터에 미리 만들어 둔 "코드 : 종목명" 라벨 사용 (rerun마다 리스트를 새로 만들지 않음)
+    stocks = get_stock_code()
+    choices_list = stocks.labels(" : ")
 
-    # selectbox에서 선택된 항목의 index를 활용하여 code_index(session_state 업뎃용)와 code(df 생성 시 전달할 인수) 추출
-    choice = st.selectbox("🟢 종목", options=choices_list, index=st.session_state["code_index"]) # index 인자로 초기값 설정 
-    code_index = choices_list.index(choice) # session_state에 업데이트할 code의 index 추출
-    code = choice.split(" : ")[0] # choice에서 index에 해당하는 종목 code 추출 -> df 생성에 전달할 인수 
+    # options를 행 번호로 주면 선택값이 곧 code_index(session_state 업뎃용) → 코드는 바로 조회
+    code_index = st.selectbox("🟢 종목", options=range(len(stocks)), index=st.session_state["code_index"], format_func=choices_list.__getitem__) # index 인자로 초기값 설정 
+    code = stocks.codes[code_index] # df 생성에 전달할 종목 code 
 
     "---"
     # ------------------ 2. chart style 선택 ------------------
@@ -84,6 +95,10 @@ with st.sidebar.form(key="side_form"):
                         'default', 'ibd', 'kenan', 'mike', 'nightclouds', 'sas', 'starsandstripes', 'tradingview', 'yahoo']
     
     chart_style = st.selectbox("🟢 차트 스타일", chart_style_list, index=chart_style_list.index(st.session_state["chart_style"])) # index 인자로 초기값 설정
+
+    # ------------------ 2-1. 봉 단위 선택 ------------------
+    timeframe_list = ["자동"] + list(TIMEFRAMES.values())
+    timeframe = st.selectbox("🟢 봉 단위", timeframe_list, index=timeframe_list.index(st.session_state["timeframe"]))
     
     "---"
     # ------------------ 3. 거래량 설정 ------------------
@@ -96,30 +111,34 @@ with st.sidebar.form(key="side_form"):
         # 버튼 눌릴 때 session_state 업데이트 
         st.session_state["code_index"] = code_index 
         st.session_state["chart_style"] = chart_style 
+        st.session_state["timeframe"] = timeframe 
         st.session_state["volume"] = volume 
         st.rerun()
 
 # ----------------------------------------- 메인화면 설정 ----------------------------------------- 
 
-# 차트 생성 함수 정의 (항상 입력값이 달라지기 때문에 캐시 적용 X)
-def plot_chart(df):
+# 봉 단위 결정 함수 ('자동'이면 기간 길이에 따라 일봉/주봉/월봉 선택)
+def get_timeframe(df):
+    if st.session_state["timeframe"] == "자동":
+        return auto_timeframe(len(df))
+    return {label: tf for tf, label in TIMEFRAMES.items()}[st.session_state["timeframe"]]
+
+# 렌더링된 차트 이미지 캐시 (세션 간 공유, 전체 크기 64MB 상한)
+@st.cache_resource
+def get_image_cache():
+    return ImageCache()
+
+# 차트 생성 함수 정의 (입력값이 같으면 이미 그려 둔 이미지를 재사용, Figure는 그린 직후 닫음)
+def plot_chart(df, code):
+    df = resample_ohlcv(df, get_timeframe(df)) # 긴 기간은 주봉/월봉으로 묶어서 캔들 수를 줄임
     chart_style = st.session_state["chart_style"]
-    marketcolors = mpf.make_marketcolors(up="red", down="blue")
-    mpf_style = mpf.make_mpf_style(base_mpf_style=chart_style, marketcolors=marketcolors)
-
-    fig, _ = mpf.plot(
-        data=df,
-        type="candle",
-        style=mpf_style,
-        figsize=(12, 7),
-        fontscale=1.0,
-        mav=(5, 20, 60),
-        mavcolors=("green", "blue", "orange"),
-        returnfig=True,
-        volume=st.session_state["volume"]
-    )   
-
-    return st.pyplot(fig)
+    volume = st.session_state["volume"]
+    mav = (5, 20, 60)
+
+    key = chart_key(code, df, chart_style, volume, mav)
+    image = get_image_cache().get(key, lambda: render_chart(df, chart_style=chart_style, volume=volume, mav=mav))
+
+    return st.image(image, use_container_width=True)
 
 # 날짜 지정 
 st.subheader("📅 기간 설정")
@@ -164,19 +183,15 @@ st.info(f"📌 현재 조회 기간: **{st.session_state['date_start']}** ~ **{s
 "---"
 
 # 선택된 종목 정보 표시
-codes_df = get_stock_code()
-choices_tuple = zip(codes_df["Code"], codes_df["Name"])
-choices_list = [" : ".join(i) for i in choices_tuple]
-chart_title = choices_list[st.session_state["code_index"]].split(":")[-1].strip()
+chart_title = stocks.names[st.session_state["code_index"]]
 
 st.write(f"📌 현재 차트: **{chart_title}**")
-st.write("📌 이동평균선(mav): :green[5일], :blue[20일], :orange[60일]")
 
 "---"
 
 # 주가 데이터 생성 및 차트 출력
 try:
-    code = choices_list[st.session_state["code_index"]].split(" : ")[0]
+    code = stocks.codes[st.session_state["code_index"]]
     df = get_stock_data(
         code, 
         st.session_state["date_start"], 
@@ -186,8 +201,12 @@ try:
     if df.empty:
         st.warning("⚠️ 선택한 기간에 데이터가 없습니다. 다른 기간을 선택해주세요.")
     else:
-        # 차트 생성 
-        plot_chart(df)
+        # 차트 생성 (봉 단위에 따라 이동평균선 단위도 주/월로 바뀜)
+        timeframe = get_timeframe(df)
+        unit = TIMEFRAME_UNITS[timeframe]
+        st.write(f"📌 이동평균선(mav): :green[5{unit}], :blue[20{unit}], :orange[60{unit}]")
+        st.caption(f"🕯️ {TIMEFRAMES[timeframe]} 기준 차트")
+        plot_chart(df, code)
         
         # 간단한 통계 정보 표시
         st.subheader("📊 주요 지표")
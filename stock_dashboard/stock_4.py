@@ -7,13 +7,30 @@
 """
 
 import streamlit as st
-import FinanceDataReader as fdr
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from contextlib import contextmanager
 from datetime import datetime, date, timedelta
 import numpy as np
 
+from aggregation import TIMEFRAMES, TIMEFRAME_UNITS, auto_timeframe, resample_ohlcv
+from comparison import DEFAULT_CORR_WINDOW, align_closes, correlation_matrix, normalized, returns, rolling_correlation, summary
+from backtest import (
+    METRIC_LABELS, SIGNAL_HISTORY, Backtester, band_touch_positions, crossover_positions,
+    performance, simulate, summarize_sweep, sweep_ma_crossover
+)
+from charts import FigureCache, create_candlestick_chart, frame_signature
+from export import FORMATS, BulkExports, ExportCache, export_frame
+from indicators import IndicatorEngine
+from market_data import MarketData
+from metrics import MetricsRegistry, payload, span, timed
+from screener import COLUMN_LABELS, Screener, apply_filters
+from security_master import SecurityMaster, sort_listing
+from stats import calculate_stats
+from table_view import PAGE_SIZES, SORT_COLUMNS, TableViews, filter_dates, page_count, table_page
+from warmup import CacheWarmer
+
 # ==================== 페이지 설정 ====================
 st.set_page_config(
     page_title="주가 대시보드",
@@ -24,28 +41,90 @@ st.set_page_config(
 
 # ==================== 유틸리티 함수 ====================
 
-@st.cache_data(ttl=3600)  # 1시간 캐시
+@st.cache_resource
+def get_market_data():
+    """구간 캐시 + 로컬 저장소 (서버 프로세스 전체에서 공유)"""
+    return MarketData()
+
+@st.cache_resource
+def get_indicator_engine():
+    """지표 계산 엔진 (세션 간 공유)"""
+    return IndicatorEngine()
+
+@st.cache_resource
+def get_figure_cache():
+    """차트 Figure 캐시 (세션 간 공유)"""
+    return FigureCache()
+
+@st.cache_resource
+def get_export_cache():
+    """내려받기 파일 캐시 (세션 간 공유)"""
+    return ExportCache()
+
+@st.cache_resource
+def get_bulk_exports():
+    """여러 종목 일괄 내보내기 백그라운드 작업 (세션 간 공유, 같은 요청이면 같은 작업)"""
+    registry = get_metrics()
+    
+    @contextmanager
+    def record(job):
+        with registry.fragment("stock_4:bulk_export"), span(f"bulk_export_{job.key[3]}"):
+            yield
+    return BulkExports(get_market_data(), run_wrapper=record)
+
+@st.cache_resource
+def get_table_views():
+    """원본 데이터 표 정렬 순서 캐시 (세션 간 공유)"""
+    return TableViews()
+
+@st.cache_resource
+def get_metrics():
+    """재실행 단위 성능 기록 (STOCK_METRICS_DIR이 있으면 JSON lines + Prometheus 파일로 저장)"""
+    return MetricsRegistry()
+
+@st.cache_resource
+def get_screener():
+    """시장 전체 스크리너 (작업 프로세스 풀을 세션 간 공유)"""
+    return Screener(get_market_data())
+
+@st.cache_resource
+def get_backtester():
+    """여러 종목 파라미터 스윕 (공용 프로세스 풀 사용)"""
+    return Backtester(get_market_data())
+
+@st.cache_resource
+def get_security_master():
+    """종목 마스터 (시장별 목록/코드 맵/라벨/검색 인덱스, 모든 세션이 공유)
+
+    1시간이 지난 목록은 새로 불러오며, 워밍업 작업이 그 전에 미리 교체해 둠
+    """
+    market_data = get_market_data()
+    return SecurityMaster(lambda market: sort_listing(market_data.listing(market)), ttl=3600)
+
+@st.cache_resource
+def get_cache_warmer():
+    """서버 시작 시 + 주기적으로 종목 목록과 시총 상위 종목(기본 6개월)을 미리 불러오는 작업"""
+    engine = get_indicator_engine()
+    return CacheWarmer(
+        get_market_data(),
+        get_security_master(),
+        on_loaded=lambda code, df: engine.compute(code, df, ['Daily_Return', 'MA'])
+    ).start()
+
+@timed("load_stock_list")
 def load_stock_list(market="KOSPI"):
-    """주식 목록 로드 (시총 순)"""
+    """주식 목록 로드 (시총 순, 실패하면 None)"""
     try:
-        df = fdr.StockListing(market)
-        df = df.sort_values("Marcap", ascending=False)
-        # 사용 가능한 컬럼만 선택
-        available_cols = ["Code", "Name", "Marcap"]
-        if "Market" in df.columns:
-            available_cols.insert(2, "Market")
-        if "Sector" in df.columns:
-            available_cols.insert(3, "Sector")
-        return df[available_cols]
+        return get_security_master().market(market)
     except Exception as e:
         st.error(f"주식 목록 로드 실패: {e}")
-        return pd.DataFrame()
+        return None
 
-@st.cache_data(ttl=300)  # 5분 캐시
+@timed("load_stock_data")
 def load_stock_data(code, start_date, end_date):
-    """주가 데이터 로드"""
+    """주가 데이터 로드 (보유 구간 안이면 슬라이싱만, 오늘 봉은 5분 후 만료)"""
     try:
-        df = fdr.DataReader(code, start_date, end_date)
+        df = get_market_data().ohlcv(code, start_date, end_date)
         if df.empty:
             return None
         return df
@@ -53,304 +132,558 @@ def load_stock_data(code, start_date, end_date):
         st.error(f"데이터 로드 실패: {e}")
         return None
 
-def calculate_indicators(df):
-    """기술적 지표 계산"""
+def load_stock_data_many(codes, start_date, end_date, timeout=10.0):
+    """여러 종목 주가 데이터 동시 로드 (단일 종목과 같은 캐시 사용, 실패한 종목은 제외)"""
+    results, errors = get_market_data().ohlcv_many(codes, start_date, end_date, timeout=timeout)
+    if errors:
+        st.warning(f"{len(errors)}개 종목 로드 실패: {', '.join(list(errors)[:5])}")
+    return {code: df for code, df in results.items() if not df.empty}
+
+@timed("calculate_indicators")
+def calculate_indicators(df, code, names):
+    """화면에 필요한 기술적 지표만 계산 (종목별로 결과를 기억해 두고 새로 붙은 봉 근처만 다시 계산)
+
+    공유 중인 원본 OHLCV에 컬럼을 추가하지 않도록 지표는 같은 인덱스의 별도 DataFrame으로 반환
+    """
     if df is None or df.empty:
-        return df
+        return pd.DataFrame(index=df.index if df is not None else None)
     
-    # 이동평균선
-    df['MA5'] = df['Close'].rolling(window=5).mean()
-    df['MA20'] = df['Close'].rolling(window=20).mean()
-    df['MA60'] = df['Close'].rolling(window=60).mean()
+    return get_indicator_engine().compute(code, df, names)
+
+def deferred_export(key, df, fmt):
+    """내려받기 버튼을 눌렀을 때만 실행되는 파일 생성 함수 (같은 종목/기간/형식/데이터면 만들어 둔 파일 재사용)"""
+    registry, cache = get_metrics(), get_export_cache()
     
-    # 일간 변동률
-    df['Daily_Return'] = df['Close'].pct_change() * 100
+    def build():
+        with registry.fragment("stock_4:export"), span(f"export_{fmt}"):
+            data = cache.get(key, lambda: export_frame(df, fmt))
+            payload("export", len(data))
+        return data
+    return build
+
+def watch_bulk_export(job):
+    """일괄 내보내기 진행률 (이 조각만 1초마다 다시 실행, 끝나면 앱 전체를 다시 그려 내려받기 버튼 표시)"""
+    if job.finished:
+        st.rerun(scope="app")
+    st.progress(job.progress, text=f"📦 파일 만드는 중... {job.done:,} / {job.total:,}개 종목")
+
+def chart_indicators():
+    """현재 차트 옵션에 필요한 지표 목록"""
+    names = []
+    if st.session_state.show_ma:
+        names.append('MA')
+    if st.session_state.show_bb:
+        names.append('BB')
+    names.extend(st.session_state.sub_indicators)
+    return names
+
+def required_indicators():
+    """통계 카드(전일 대비, 변동성)와 상세 통계(이동평균)에 필요한 일봉 지표 목록 (차트 옵션과 무관)"""
+    return ['Daily_Return', 'MA']
+
+def resolve_timeframe(n_rows):
+    """봉 단위 선택값 → 'D'/'W'/'M' ('자동'이면 기간 길이로 결정)"""
+    if st.session_state.timeframe == '자동':
+        return auto_timeframe(n_rows)
+    return {label: tf for tf, label in TIMEFRAMES.items()}[st.session_state.timeframe]
+
+# 이번 재실행 계측 시작 (스크립트 끝에서 finish)
+get_metrics().start("stock_4")
+
+# 첫 세션이 스크립트를 실행할 때 한 번만 시작 (이후 세션은 이미 채워진 캐시를 사용)
+get_cache_warmer()
+
+# ==================== 종목 비교 ====================
+
+VIEW_MODES = ['📈 종목 차트', '📊 종목 비교', '🔎 스크리너', '🧪 백테스트']
+COMPARE_MAX_LINES = 30  # 선 그래프에 그리는 최대 종목 수 (표/상관계수 행렬은 전체)
+
+def render_comparison(listing):
+    """여러 종목 정규화 수익률 / 이동 상관계수 / 상관계수 행렬 (단일 종목 화면과 같은 캐시 데이터 사용)"""
+    st.markdown("## 📊 종목 비교")
     
-    # 볼린저 밴드
-    df['BB_Middle'] = df['Close'].rolling(window=20).mean()
-    bb_std = df['Close'].rolling(window=20).std()
-    df['BB_Upper'] = df['BB_Middle'] + (bb_std * 2)
-    df['BB_Lower'] = df['BB_Middle'] - (bb_std * 2)
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        pick_mode = st.radio("종목 선택 방식", ['시총 상위', '직접 선택'], horizontal=True)
+    with col2:
+        if pick_mode == '시총 상위':
+            st.session_state.compare_top_n = st.slider(
+                "시총 상위 종목 수", min_value=2, max_value=min(300, len(listing)),
+                value=min(st.session_state.compare_top_n, len(listing))
+            )
+            rows = list(range(st.session_state.compare_top_n))
+        else:
+            rows = st.multiselect(
+                "비교 종목",
+                options=range(len(listing)),
+                default=[row for row in st.session_state.compare_rows if row < len(listing)] or list(range(min(5, len(listing)))),
+                format_func=listing.labels().__getitem__
+            )
+            st.session_state.compare_rows = rows
     
-    return df
-
-def create_candlestick_chart(df, stock_name, show_volume=True, show_ma=True, show_bb=False):
-    """Plotly를 사용한 캔들스틱 차트 생성"""
-    if df is None or df.empty:
-        return None
+    if len(rows) < 2:
+        st.info("비교할 종목을 2개 이상 선택해주세요.")
+        return
     
-    # 서브플롯 설정
-    rows = 2 if show_volume else 1
-    row_heights = [0.7, 0.3] if show_volume else [1]
+    codes = [listing.codes[row] for row in rows]
+    names = {listing.codes[row]: listing.names[row] for row in rows}
+    with st.spinner(f'{len(codes)}개 종목 데이터 로딩 중...'):
+        frames = load_stock_data_many(codes, st.session_state.start_date, st.session_state.end_date)
     
-    fig = make_subplots(
-        rows=rows, cols=1,
-        shared_xaxes=True,  # 수정: shared_xaxis -> shared_xaxes
-        vertical_spacing=0.03,
-        row_heights=row_heights,
-        subplot_titles=(f'{stock_name} 주가 차트', '거래량') if show_volume else (f'{stock_name} 주가 차트',)
-    )
+    aligned = align_closes({code: frames[code] for code in codes if code in frames})
+    if len(aligned.codes) < 2:
+        st.warning("⚠️ 선택한 기간에 데이터가 있는 종목이 2개 미만입니다.")
+        return
+    labels = [names[code] for code in aligned.codes]
+    rets = returns(aligned.closes)
     
-    # 캔들스틱
-    fig.add_trace(
-        go.Candlestick(
-            x=df.index,
-            open=df['Open'],
-            high=df['High'],
-            low=df['Low'],
-            close=df['Close'],
-            name='OHLC',
-            increasing_line_color='#FF4B4B',
-            decreasing_line_color='#4B8BFF'
-        ),
-        row=1, col=1
-    )
+    # 정규화 수익률
+    st.markdown("### 📈 기준일 대비 수익률 (시작일 = 100)")
+    norm = normalized(aligned.closes)
+    fig = go.Figure()
+    for j in range(min(COMPARE_MAX_LINES, len(aligned.codes))):
+        fig.add_trace(go.Scattergl(x=aligned.index, y=norm[:, j], mode='lines', name=labels[j]))
+    fig.update_layout(height=450, hovermode='x unified', template='plotly_white', yaxis_title='지수')
+    st.plotly_chart(fig, use_container_width=True)
+    if len(aligned.codes) > COMPARE_MAX_LINES:
+        st.caption(f"📌 그래프에는 시총 상위 {COMPARE_MAX_LINES}개 종목만 표시합니다. 전체 종목은 아래 표를 참고하세요.")
     
-    # 이동평균선
-    if show_ma:
-        ma_configs = [
-            ('MA5', '#00CC96', '5일'),
-            ('MA20', '#AB63FA', '20일'),
-            ('MA60', '#FFA15A', '60일')
-        ]
-        for ma_col, color, name in ma_configs:
-            if ma_col in df.columns:
-                fig.add_trace(
-                    go.Scatter(
-                        x=df.index,
-                        y=df[ma_col],
-                        name=name,
-                        line=dict(color=color, width=1.5),
-                        opacity=0.7
-                    ),
-                    row=1, col=1
-                )
+    # 기준 종목과의 이동 상관계수
+    st.markdown("### 🔗 기준 종목과의 이동 상관계수")
+    col1, col2 = st.columns(2)
+    with col1:
+        benchmark = st.selectbox("기준 종목", options=range(len(aligned.codes)), format_func=labels.__getitem__)
+    with col2:
+        window = st.select_slider("상관계수 기간(거래일)", options=[20, 60, 120], value=DEFAULT_CORR_WINDOW)
+    rolling = rolling_correlation(rets, rets[:, benchmark], window)
+    fig = go.Figure()
+    others = [j for j in range(len(aligned.codes)) if j != benchmark][:COMPARE_MAX_LINES]
+    for j in others:
+        fig.add_trace(go.Scattergl(x=aligned.index, y=rolling[:, j], mode='lines', name=labels[j]))
+    fig.update_layout(height=400, hovermode='x unified', template='plotly_white', yaxis_range=[-1, 1])
+    st.plotly_chart(fig, use_container_width=True)
     
-    # 볼린저 밴드
-    if show_bb and 'BB_Upper' in df.columns:
-        fig.add_trace(
-            go.Scatter(
-                x=df.index,
-                y=df['BB_Upper'],
-                name='BB Upper',
-                line=dict(color='gray', width=1, dash='dash'),
-                opacity=0.3
-            ),
-            row=1, col=1
-        )
-        fig.add_trace(
-            go.Scatter(
-                x=df.index,
-                y=df['BB_Lower'],
-                name='BB Lower',
-                line=dict(color='gray', width=1, dash='dash'),
-                fill='tonexty',
-                opacity=0.1
-            ),
-            row=1, col=1
+    # 상관계수 행렬
+    st.markdown("### 🧮 일간 수익률 상관계수 행렬")
+    corr = correlation_matrix(rets)
+    fig = go.Figure(go.Heatmap(
+        z=corr, x=labels, y=labels, zmin=-1, zmax=1, colorscale='RdBu_r'
+    ))
+    size = min(1200, max(400, 18 * len(labels)))
+    fig.update_layout(height=size, template='plotly_white', yaxis_autorange='reversed')
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # 종목별 요약
+    table = summary(aligned, rets)
+    table.insert(0, '종목명', labels)
+    table[f'{labels[benchmark]}와 상관계수'] = corr[:, benchmark]
+    st.dataframe(table.round(2), use_container_width=True)
+    
+    # 일괄 내려받기 (버튼을 누를 때만 생성)
+    st.markdown("### 📥 일괄 내려받기")
+    col1, col2 = st.columns(2)
+    with col1:
+        scope = st.radio(
+            "대상",
+            options=['compare', 'market'],
+            format_func={'compare': f"비교 종목 ({len(codes)}개)", 'market': f"{listing.market} 전체 ({len(listing):,}개)"}.get,
+            horizontal=True
         )
+    with col2:
+        fmt = st.radio("형식", options=list(FORMATS), format_func=lambda f: FORMATS[f].label,
+                       horizontal=True, key='bulk_export_format')
+    bulk_codes = codes if scope == 'compare' else listing.codes
+    start_date, end_date = st.session_state.start_date, st.session_state.end_date
     
-    # 거래량
-    if show_volume:
-        colors = ['#FF4B4B' if close >= open else '#4B8BFF' 
-                  for close, open in zip(df['Close'], df['Open'])]
-        fig.add_trace(
-            go.Bar(
-                x=df.index,
-                y=df['Volume'],
-                name='거래량',
-                marker_color=colors,
-                opacity=0.7
-            ),
-            row=2, col=1
+    # 파일은 백그라운드 작업이 디스크에 만들고, 화면은 진행률만 확인 (다 만들어지면 내려받기 버튼)
+    exports = get_bulk_exports()
+    job = exports.get(exports.key(bulk_codes, start_date, end_date, fmt))
+    if job is not None and job.error is not None:
+        st.error(f"❌ 파일을 만들지 못했습니다: {job.error}")
+    if job is None or job.error is not None:
+        if st.button(f"📦 {len(bulk_codes):,}개 종목 {FORMATS[fmt].label} 파일 만들기"):
+            job = exports.start(bulk_codes, start_date, end_date, fmt)
+    if job is not None and job.running:
+        st.fragment(watch_bulk_export, run_every=1)(job)
+    elif job is not None and job.error is None:
+        st.download_button(
+            label=f"📥 {len(bulk_codes):,}개 종목 {FORMATS[fmt].label} 내려받기 ({job.size / 2 ** 20:,.1f}MB)",
+            data=job.open,  # 누를 때 디스크 파일을 열어 전달
+            file_name=f"{listing.market}_{len(bulk_codes)}종목_{start_date}_{end_date}.{FORMATS[fmt].extension}",
+            mime=FORMATS[fmt].mime,
+            on_click="ignore"
         )
+    st.caption("종목코드 컬럼이 붙은 한 파일을 백그라운드에서 만든 뒤 내려받습니다. 만드는 동안 다른 화면을 봐도 됩니다.")
+
+# ==================== 스크리너 ====================
+
+def render_screener(listing):
+    """선택한 시장 전 종목 통계 + 조건 필터 (계산은 프로세스 풀, 결과는 5분간 재사용)"""
+    st.markdown(f"## 🔎 {listing.market} 스크리너")
     
-    # 레이아웃
-    fig.update_layout(
-        height=700,
-        showlegend=True,
-        xaxis_rangeslider_visible=False,
-        hovermode='x unified',
-        template='plotly_white',
-        margin=dict(l=50, r=50, t=50, b=50)
-    )
+    screen_key = (listing.market, st.session_state.start_date, st.session_state.end_date)
+    if st.button(f"🔎 {listing.market} {len(listing):,}개 종목 스크리닝", type='primary'):
+        st.session_state.screen_key = screen_key
+    if st.session_state.get('screen_key') != screen_key:
+        st.info("시장/기간을 정한 뒤 스크리닝을 실행하세요. 저장소에 없는 종목은 처음 한 번 원격에서 받아옵니다.")
+        return
     
-    fig.update_xaxes(showgrid=True, gridwidth=0.5, gridcolor='lightgray')
-    fig.update_yaxes(showgrid=True, gridwidth=0.5, gridcolor='lightgray')
+    with st.spinner(f'{len(listing):,}개 종목 계산 중...'):
+        table = get_screener().run(listing.codes, st.session_state.start_date, st.session_state.end_date)
     
-    return fig
-
-def calculate_stats(df):
-    """통계 정보 계산"""
-    if df is None or df.empty:
-        return {}
+    # 필터
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        above_ma20 = st.checkbox("종가 > MA20")
+        above_ma60 = st.checkbox("종가 > MA60")
+    with col2:
+        volume_multiple = st.number_input("거래량 ≥ 평균의 N배", min_value=0.0, value=0.0, step=0.5)
+    with col3:
+        rsi_range = st.slider("RSI 범위", 0, 100, (0, 100))
+    with col4:
+        min_return = st.number_input("기간 수익률 ≥ (%)", value=-100.0, step=5.0)
     
-    period_return = ((df['Close'].iloc[-1] - df['Close'].iloc[0]) / df['Close'].iloc[0] * 100)
+    filtered = apply_filters(
+        table,
+        above_ma20=above_ma20,
+        above_ma60=above_ma60,
+        volume_multiple=volume_multiple or None,
+        rsi_range=None if rsi_range == (0, 100) else rsi_range,
+        min_return=None if min_return <= -100 else min_return
+    )
     
-    return {
-        'current_price': df['Close'].iloc[-1],
-        'change': df['Close'].iloc[-1] - df['Close'].iloc[-2] if len(df) > 1 else 0,
-        'change_pct': df['Daily_Return'].iloc[-1] if 'Daily_Return' in df.columns else 0,
-        'high': df['High'].max(),
-        'low': df['Low'].min(),
-        'volume_avg': df['Volume'].mean(),
-        'volume_current': df['Volume'].iloc[-1],
-        'period_return': period_return,
-        'volatility': df['Daily_Return'].std() if 'Daily_Return' in df.columns else 0
-    }
-
-# ==================== 세션 상태 초기화 ====================
-
-def init_session_state():
-    """세션 상태 초기화"""
-    defaults = {
-        'selected_market': 'KOSPI',
-        'selected_stock_idx': 0,
-        'start_date': date.today() - timedelta(days=180),
-        'end_date': date.today(),
-        'show_volume': True,
-        'show_ma': True,
-        'show_bb': False,
-        'period_preset': '6개월'
-    }
+    # 정렬 (표 머리글 클릭으로도 정렬 가능)
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        sort_labels = {label: column for column, label in COLUMN_LABELS.items() if column in table.columns}
+        sort_by = st.selectbox("정렬 기준", options=list(sort_labels), index=list(sort_labels).index('기간 수익률(%)'))
+    with col2:
+        ascending = st.toggle("오름차순", value=False)
+    filtered = filtered.sort_values(sort_labels[sort_by], ascending=ascending)
     
-    for key, value in defaults.items():
-        if key not in st.session_state:
-            st.session_state[key] = value
+    st.caption(f"{len(filtered):,} / {len(table):,}개 종목")
+    display = filtered.round(2)
+    display.insert(0, 'name', [listing.names[listing.row_by_code[code]] for code in display.index])
+    display.index.name = 'code'
+    st.dataframe(display.rename(columns=COLUMN_LABELS).rename_axis(COLUMN_LABELS['code']), use_container_width=True, height=500)
 
-init_session_state()
+# ==================== 백테스트 ====================
 
-# ==================== 사이드바 ====================
+def sweep_heatmap(table, value='total_return'):
+    """(단기, 장기) 이동평균 조합별 값 히트맵"""
+    grid = table.pivot(index='slow', columns='fast', values=value)
+    fig = go.Figure(go.Heatmap(
+        z=grid.to_numpy(), x=grid.columns, y=grid.index, colorscale='RdYlGn',
+        zmid=0, colorbar=dict(title=METRIC_LABELS[value])
+    ))
+    fig.update_layout(height=500, template='plotly_white', xaxis_title='단기 이동평균', yaxis_title='장기 이동평균')
+    return fig
 
-with st.sidebar:
-    st.header("⚙️ 설정")
-    
-    # 시장 선택
-    market = st.selectbox(
-        "시장",
-        options=['KOSPI', 'KOSDAQ', 'KONEX'],
-        index=['KOSPI', 'KOSDAQ', 'KONEX'].index(st.session_state.selected_market),
-        key='market_select'
-    )
+def render_backtest(listing, code, name):
+    """차트의 이동평균 교차 / 볼린저 밴드 신호 백테스트 + 이동평균 조합 스윕"""
+    st.markdown(f"## 🧪 {name} ({code}) 백테스트")
     
-    if market != st.session_state.selected_market:
-        st.session_state.selected_market = market
-        st.session_state.selected_stock_idx = 0
-        st.rerun()
+    df = load_stock_data(code, st.session_state.start_date, st.session_state.end_date)
+    if df is None or len(df) < 2:
+        st.warning("⚠️ 선택한 기간에 데이터가 없습니다.")
+        return
     
-    # 주식 목록 로드
-    stocks_df = load_stock_list(st.session_state.selected_market)
+    # 차트와 같은 지표(종목별로 기억해 둔 결과)를 신호로 사용
+    indicators = calculate_indicators(df, code, ['MA', 'BB'])
+    close = df['Close'].to_numpy(dtype=float)
     
-    if not stocks_df.empty:
-        # 검색 기능
-        search_query = st.text_input("🔍 종목 검색", placeholder="종목명 또는 코드 입력")
-        
-        if search_query:
-            mask = (stocks_df['Name'].str.contains(search_query, case=False, na=False) | 
-                    stocks_df['Code'].str.contains(search_query, case=False, na=False))
-            filtered_stocks = stocks_df[mask]
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        strategy = st.radio("전략", ['이동평균 교차', '볼린저 밴드 터치'])
+    with col2:
+        if strategy == '이동평균 교차':
+            fast, slow = st.select_slider("단기 / 장기 이동평균", options=[5, 20, 60], value=(5, 20))
+            if fast == slow:
+                st.info("단기와 장기 이동평균을 다르게 선택해주세요.")
+                return
+            positions = crossover_positions(indicators[f'MA{fast}'].to_numpy(), indicators[f'MA{slow}'].to_numpy())
         else:
-            filtered_stocks = stocks_df.head(100)  # 상위 100개만 표시
-        
-        # 종목 선택
-        stock_options = [f"{row['Code']} - {row['Name']}" for _, row in filtered_stocks.iterrows()]
-        
-        if stock_options:
-            selected = st.selectbox(
-                "종목 선택",
-                options=stock_options,
-                index=min(st.session_state.selected_stock_idx, len(stock_options) - 1),
-                key='stock_select'
-            )
-            
-            selected_idx = stock_options.index(selected)
-            selected_code = filtered_stocks.iloc[selected_idx]['Code']
-            selected_name = filtered_stocks.iloc[selected_idx]['Name']
-        else:
-            st.warning("검색 결과가 없습니다.")
-            selected_code = None
-            selected_name = None
-    else:
-        st.error("종목 목록을 불러올 수 없습니다.")
-        selected_code = None
-        selected_name = None
+            st.caption("종가가 하단 밴드 이하이면 매수, 중심선(MA20) 이상으로 돌아오면 매도")
+            positions = band_touch_positions(close, indicators['BB_Lower'].to_numpy(), indicators['BB_Middle'].to_numpy())
     
-    st.divider()
+    metrics = {key: values[0] for key, values in performance(close, positions).items()}
+    cols = st.columns(len(METRIC_LABELS))
+    for col, (key, label) in zip(cols, METRIC_LABELS.items()):
+        with col:
+            st.metric(label, f"{metrics[key]:,.0f}" if key == 'trades' else f"{metrics[key]:,.2f}")
     
-    # 기간 설정
-    st.subheader("📅 조회 기간")
+    _, equity, drawdown, _ = simulate(close, positions)
+    buy_hold = close / close[0]
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.7, 0.3], vertical_spacing=0.05)
+    fig.add_trace(go.Scatter(x=df.index, y=equity, name='전략', line=dict(width=2)), row=1, col=1)
+    fig.add_trace(go.Scatter(x=df.index, y=buy_hold, name='보유(Buy & Hold)', line=dict(width=1, dash='dot')), row=1, col=1)
+    fig.add_trace(go.Scatter(x=df.index, y=drawdown * 100, name='낙폭(%)', fill='tozeroy', line=dict(color='#EF5350')), row=2, col=1)
+    fig.update_layout(height=550, hovermode='x unified', template='plotly_white')
+    st.plotly_chart(fig, use_container_width=True)
     
-    period_preset = st.selectbox(
-        "기간 프리셋",
-        options=['1개월', '3개월', '6개월', '1년', '3년', '5년', '직접 설정'],
-        index=['1개월', '3개월', '6개월', '1년', '3년', '5년', '직접 설정'].index(st.session_state.period_preset)
-    )
-    
-    if period_preset != '직접 설정':
-        period_map = {
-            '1개월': 30,
-            '3개월': 90,
-            '6개월': 180,
-            '1년': 365,
-            '3년': 1095,
-            '5년': 1825
-        }
-        st.session_state.start_date = date.today() - timedelta(days=period_map[period_preset])
-        st.session_state.end_date = date.today()
-        st.session_state.period_preset = period_preset
-    else:
-        col1, col2 = st.columns(2)
-        with col1:
-            start_date = st.date_input(
-                "시작일",
-                value=st.session_state.start_date,
-                max_value=date.today()
+    # 이동평균 조합 스윕 (5~120일)
+    st.markdown("### 🔁 이동평균 조합 스윕 (5~120일, 5일 간격)")
+    tab1, tab2 = st.tabs(["이 종목", "시총 상위 종목"])
+    with tab1:
+        history = load_stock_data(code, st.session_state.start_date - SIGNAL_HISTORY, st.session_state.end_date)
+        if history is not None:
+            trade_from = int(history.index.searchsorted(pd.Timestamp(st.session_state.start_date)))
+            table = sweep_ma_crossover(history['Close'].to_numpy(dtype=float), trade_from=trade_from)
+            st.plotly_chart(sweep_heatmap(table), use_container_width=True)
+            st.dataframe(
+                table.nlargest(10, 'total_return').rename(columns=METRIC_LABELS).round(2),
+                use_container_width=True, hide_index=True
             )
+    with tab2:
+        top_n = st.slider("종목 수", min_value=10, max_value=min(500, len(listing)), value=min(100, len(listing)))
+        sweep_key = (listing.market, top_n, st.session_state.start_date, st.session_state.end_date)
+        if st.button(f"🔁 시총 상위 {top_n}개 종목 스윕"):
+            st.session_state.sweep_key = sweep_key
+        if st.session_state.get('sweep_key') == sweep_key:
+            with st.spinner(f'{top_n}개 종목 × 이동평균 조합 계산 중...'):
+                table = get_backtester().sweep_many(
+                    listing.codes[:top_n], st.session_state.start_date, st.session_state.end_date
+                )
+            if table.empty:
+                st.warning("⚠️ 계산할 수 있는 종목이 없습니다.")
+            else:
+                summary = summarize_sweep(table)
+                n_codes = table['code'].nunique()
+                skipped = f" (데이터가 부족한 {top_n - n_codes}개 종목 제외)" if n_codes < top_n else ""
+                st.caption(f"{n_codes}개 종목 평균 총 수익률{skipped}")
+                st.plotly_chart(sweep_heatmap(summary), use_container_width=True)
+                st.dataframe(
+                    summary.nlargest(10, 'total_return').rename(columns={
+                        **METRIC_LABELS, 'median_return': '총 수익률 중앙값(%)', 'positive_ratio': '수익 종목 비율(%)'
+                    }).round(2),
+                    use_container_width=True, hide_index=True
+                )
+
+# ==================== 성능 패널 ====================
+
+def render_perf_panel(rerun):
+    """이번 재실행의 단계별 시간/캐시 적중/전송 크기 + 서버 누적 p50/p99"""
+    registry = get_metrics()
+    with st.expander(f"🛠️ 성능 패널 — 이번 재실행 {rerun.duration * 1000:,.1f} ms", expanded=True):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.markdown("**단계별 시간 (ms)**")
+            spans = pd.Series(rerun.spans, dtype=float).sort_values(ascending=False) * 1000
+            st.dataframe(spans.round(2).rename('ms'), use_container_width=True)
         with col2:
-            end_date = st.date_input(
-                "종료일",
-                value=st.session_state.end_date,
-                max_value=date.today()
-            )
+            st.markdown("**캐시 적중/실패**")
+            cache = pd.Series({f"{name} · {result}": n for (name, result), n in rerun.cache.items()}, dtype=int)
+            st.dataframe(cache.sort_index().rename('횟수'), use_container_width=True)
+        with col3:
+            st.markdown("**전송/내려받기 크기 (KB)**")
+            sizes = pd.Series(rerun.payloads, dtype=float) / 1024
+            st.dataframe(sizes.round(1).rename('KB'), use_container_width=True)
         
-        st.session_state.start_date = start_date
-        st.session_state.end_date = end_date
-        st.session_state.period_preset = '직접 설정'
-    
-    st.divider()
-    
-    # 차트 옵션
-    st.subheader("📊 차트 설정")
-    st.session_state.show_volume = st.checkbox("거래량 표시", value=st.session_state.show_volume)
-    st.session_state.show_ma = st.checkbox("이동평균선 표시", value=st.session_state.show_ma)
-    st.session_state.show_bb = st.checkbox("볼린저 밴드 표시", value=st.session_state.show_bb)
+        st.markdown("**누적 단계별 분위수 (서버 시작 이후, 최근 재실행 기준 · 조각 단독 재실행은 `stock_4:조각`)**")
+        summary_df = pd.DataFrame(registry.stage_summary())
+        if not summary_df.empty:
+            st.dataframe(summary_df.round(2), use_container_width=True, hide_index=True)
+        
+        st.markdown("**데이터 계층 카운터**")
+        st.json(get_market_data().metrics(), expanded=False)
+        if registry.out_dir:
+            st.caption(f"📁 기록 파일: {registry.jsonl_path}, {registry.prom_path}")
 
-# ==================== 메인 화면 ====================
+# ==================== 화면 조각 (fragment) ====================
+# 조각 안의 위젯을 바꾸면 그 조각만 다시 실행됨 (인자는 마지막 전체 실행 때 받은 값을 그대로 사용)
+# 종목/기간이 바뀌는 경우만 앱 전체를 다시 실행해 데이터 로드부터 새로 함
 
-st.title("📈 주가 대시보드")
+LIVE_INTERVALS = [5, 10, 30, 60, 300]  # 실시간 모드 확인 간격(초)
 
-if selected_code:
-    # 데이터 로드
-    with st.spinner('데이터 로딩 중...'):
-        df = load_stock_data(
+@st.fragment
+def sidebar_selection():
+    """화면/시장/종목/기간 선택 (검색어 입력은 이 조각만 다시 실행, 선택이 바뀌면 앱 전체 재실행)"""
+    with get_metrics().fragment("stock_4:sidebar"):
+        # 화면 선택
+        st.session_state.view_mode = st.radio(
+            "화면",
+            options=VIEW_MODES,
+            index=VIEW_MODES.index(st.session_state.view_mode),
+            horizontal=True
+        )
+        
+        # 시장 선택
+        market = st.selectbox(
+            "시장",
+            options=['KOSPI', 'KOSDAQ', 'KONEX'],
+            index=['KOSPI', 'KOSDAQ', 'KONEX'].index(st.session_state.selected_market),
+            key='market_select'
+        )
+        
+        if market != st.session_state.selected_market:
+            st.session_state.selected_market = market
+            st.session_state.selected_stock_idx = 0
+            st.rerun()
+        
+        # 주식 목록 로드
+        listing = load_stock_list(st.session_state.selected_market)
+        
+        if listing is not None and len(listing) > 0:
+            # 검색 기능
+            search_query = st.text_input("🔍 종목 검색", placeholder="종목명, 코드 또는 초성 입력")
+            
+            # 검색어가 없으면 시총 상위 100개만 표시 (초성 검색 지원: ㅅㅅㅈㅈ → 삼성전자)
+            with span("search"):
+                stock_options = listing.search_index.search(search_query, limit=None if search_query else 100)
+            
+            # 종목 선택 (옵션은 인덱스 행 번호, 라벨은 미리 만들어 둔 것을 사용)
+            if stock_options:
+                selected_row = st.selectbox(
+                    "종목 선택",
+                    options=stock_options,
+                    index=min(st.session_state.selected_stock_idx, len(stock_options) - 1),
+                    format_func=listing.labels().__getitem__,
+                    key='stock_select'
+                )
+                
+                selected_code = listing.codes[selected_row]
+                selected_name = listing.names[selected_row]
+            else:
+                st.warning("검색 결과가 없습니다.")
+                selected_code = None
+                selected_name = None
+        else:
+            st.error("종목 목록을 불러올 수 없습니다.")
+            selected_code = None
+            selected_name = None
+        
+        st.divider()
+        
+        # 기간 설정
+        st.subheader("📅 조회 기간")
+        
+        period_preset = st.selectbox(
+            "기간 프리셋",
+            options=['1개월', '3개월', '6개월', '1년', '3년', '5년', '직접 설정'],
+            index=['1개월', '3개월', '6개월', '1년', '3년', '5년', '직접 설정'].index(st.session_state.period_preset)
+        )
+        
+        if period_preset != '직접 설정':
+            period_map = {
+                '1개월': 30,
+                '3개월': 90,
+                '6개월': 180,
+                '1년': 365,
+                '3년': 1095,
+                '5년': 1825
+            }
+            st.session_state.start_date = date.today() - timedelta(days=period_map[period_preset])
+            st.session_state.end_date = date.today()
+            st.session_state.period_preset = period_preset
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                start_date = st.date_input(
+                    "시작일",
+                    value=st.session_state.start_date,
+                    max_value=date.today()
+                )
+            with col2:
+                end_date = st.date_input(
+                    "종료일",
+                    value=st.session_state.end_date,
+                    max_value=date.today()
+                )
+            
+            st.session_state.start_date = start_date
+            st.session_state.end_date = end_date
+            st.session_state.period_preset = '직접 설정'
+        
+        # 실시간 모드 (조회 기간이 오늘까지일 때만 동작)
+        st.session_state.live_mode = st.toggle(
+            "📡 실시간 모드",
+            value=st.session_state.live_mode,
+            help="정해진 간격마다 마지막 봉 이후만 받아 차트/지표/통계를 갱신합니다."
+        )
+        if st.session_state.live_mode:
+            st.session_state.live_interval = st.select_slider(
+                "확인 간격(초)",
+                options=LIVE_INTERVALS,
+                value=st.session_state.live_interval
+            )
+        
+        st.session_state.selected_code = selected_code
+        st.session_state.selected_name = selected_name
+        selection = (
+            st.session_state.view_mode,
+            st.session_state.selected_market,
             selected_code,
             st.session_state.start_date,
-            st.session_state.end_date
+            st.session_state.end_date,
+            st.session_state.live_mode,
+            st.session_state.live_interval
         )
-    
-    if df is not None and not df.empty:
-        # 지표 계산
-        df = calculate_indicators(df)
-        stats = calculate_stats(df)
-        
-        # 종목 정보 헤더
+        if selection != st.session_state.applied_selection:
+            first_run = st.session_state.applied_selection is None
+            st.session_state.applied_selection = selection
+            if not first_run:
+                st.rerun(scope="app")
+
+def render_chart_options():
+    """차트 옵션 (차트 조각 안에 있으므로 바꿔도 차트만 다시 그림)"""
+    timeframe_options = ['자동'] + list(TIMEFRAMES.values())
+    col1, col2, col3, col4, col5 = st.columns([1.2, 1, 1.2, 1.2, 2.4], vertical_alignment="bottom")
+    with col1:
+        st.session_state.timeframe = st.selectbox(
+            "봉 단위",
+            options=timeframe_options,
+            index=timeframe_options.index(st.session_state.timeframe),
+            help="자동: 조회 기간이 길면 주봉/월봉으로 묶어 차트 점 개수를 줄입니다."
+        )
+    with col2:
+        st.session_state.show_volume = st.checkbox("거래량 표시", value=st.session_state.show_volume)
+    with col3:
+        st.session_state.show_ma = st.checkbox("이동평균선 표시", value=st.session_state.show_ma)
+    with col4:
+        st.session_state.show_bb = st.checkbox("볼린저 밴드 표시", value=st.session_state.show_bb)
+    with col5:
+        st.session_state.sub_indicators = st.multiselect(
+            "보조 지표",
+            options=['RSI', 'MACD', 'Stochastic', 'ATR'],
+            default=st.session_state.sub_indicators
+        )
+
+def watch_live(code):
+    """실시간 모드: run_every 간격으로 이 조각만 실행해 새 봉을 확인하고, 바뀐 경우에만 앱 전체를 다시 그림
+
+    Streamlit은 그려 둔 차트에 점만 덧붙여 보낼 수 없으므로 화면은 다시 그리지만,
+    원격 조회는 종목당 간격마다 한 번(마지막 봉 이후만)이고 지표는 새로 붙은 봉 근처만 다시 계산됩니다
+    (이어 붙인 결과 배열과 차트는 전체 길이만큼 다시 만듦).
+    """
+    with get_metrics().fragment("stock_4:live"):
+        market_data = get_market_data()
+        version = market_data.live_version(code, st.session_state.live_interval)
+        if version != st.session_state.live_rendered:
+            st.rerun(scope="app")
+        polled_at = market_data.last_polled(code)
+        checked = f" · 마지막 확인 {datetime.fromtimestamp(polled_at):%H:%M:%S}" if polled_at else ""
+        st.caption(f"📡 실시간 모드 · {st.session_state.live_interval}초마다 새 봉 확인{checked}")
+
+@st.fragment
+def stock_header(code, name, stats):
+    """종목명 + 새로고침 버튼 + 주요 지표 카드"""
+    with get_metrics().fragment("stock_4:header"):
         col1, col2 = st.columns([3, 1])
         with col1:
-            st.markdown(f"## {selected_name} ({selected_code})")
+            st.markdown(f"## {name} ({code})")
         with col2:
             if st.button("🔄 새로고침", use_container_width=True):
-                st.cache_data.clear()
-                st.rerun()
+                # 현재 종목/기간만 갱신 (다른 종목·사용자의 캐시는 그대로, 갱신 중에는 기존 데이터 제공)
+                refresh = get_market_data().refresh(
+                    code,
+                    st.session_state.start_date,
+                    st.session_state.end_date
+                )
+                try:
+                    refresh.result(timeout=3)
+                except Exception:
+                    st.toast("백그라운드에서 데이터를 갱신하고 있습니다.")
+                st.rerun(scope="app")
         
         # 주요 지표 카드
         col1, col2, col3, col4, col5 = st.columns(5)
@@ -375,21 +708,61 @@ if selected_code:
         
         with col5:
             st.metric("변동성", f"{stats['volatility']:.2f}%")
+
+@st.fragment
+def chart_section(df, code, name):
+    """차트 옵션 + 차트 (옵션을 바꿔도 데이터 로드/통계 카드/원본 표는 다시 실행하지 않음)"""
+    with get_metrics().fragment("stock_4:chart"):
+        render_chart_options()
         
-        st.divider()
+        # 긴 기간은 주봉/월봉으로 묶어서 표시, 지표도 묶은 봉 기준으로 계산
+        timeframe = resolve_timeframe(len(df))
+        if timeframe == 'D':
+            chart_df = df
+            chart_indicators_df = calculate_indicators(df, code, chart_indicators())
+        else:
+            chart_df = resample_ohlcv(df, timeframe)
+            chart_indicators_df = calculate_indicators(
+                chart_df,
+                f"{code}:{timeframe}",
+                chart_indicators()
+            )
+            if st.session_state.timeframe == '자동':
+                st.caption(f"📌 조회 기간이 길어 {TIMEFRAMES[timeframe]}으로 표시합니다.")
         
-        # 차트
-        fig = create_candlestick_chart(
-            df,
-            selected_name,
-            show_volume=st.session_state.show_volume,
-            show_ma=st.session_state.show_ma,
-            show_bb=st.session_state.show_bb
+        # 같은 종목/기간/옵션/데이터면 캐시된 Figure를 그대로 사용
+        chart_key = (
+            code,
+            timeframe,
+            st.session_state.show_volume,
+            st.session_state.show_ma,
+            st.session_state.show_bb,
+            tuple(st.session_state.sub_indicators),
+            frame_signature(chart_df)
         )
+        with span("create_candlestick_chart"):
+            fig = get_figure_cache().get(chart_key, lambda: create_candlestick_chart(
+                chart_df,
+                name,
+                show_volume=st.session_state.show_volume,
+                show_ma=st.session_state.show_ma,
+                show_bb=st.session_state.show_bb,
+                sub_indicators=st.session_state.sub_indicators,
+                ma_unit=TIMEFRAME_UNITS[timeframe],
+                indicators=chart_indicators_df
+            ))
         
         if fig:
-            st.plotly_chart(fig, use_container_width=True)
-        
+            with span("send_chart"):
+                st.plotly_chart(fig, use_container_width=True)
+            if st.session_state.show_perf_panel:
+                # 전송 크기는 성능 패널을 볼 때만 계산 (Figure마다 한 번)
+                payload("chart_json", get_figure_cache().json_size(chart_key))
+
+@st.fragment
+def detail_section(df, indicators, stats, code, name):
+    """상세 통계 + 원본 데이터/내려받기 (형식을 바꿔도 이 조각만 다시 실행, 파일은 버튼을 누를 때만 생성)"""
+    with get_metrics().fragment("stock_4:detail"):
         # 상세 통계
         with st.expander("📊 상세 통계", expanded=False):
             col1, col2 = st.columns(2)
@@ -408,30 +781,165 @@ if selected_code:
                 st.markdown(f"- **평균 거래량**: {stats['volume_avg']:,.0f}")
                 st.markdown(f"- **변동성**: {stats['volatility']:.2f}%")
                 
-                if 'MA5' in df.columns:
+                if 'MA5' in indicators.columns:
                     st.markdown("### 이동평균")
-                    st.markdown(f"- **5일 평균**: {df['MA5'].iloc[-1]:,.0f}원")
-                    st.markdown(f"- **20일 평균**: {df['MA20'].iloc[-1]:,.0f}원")
-                    st.markdown(f"- **60일 평균**: {df['MA60'].iloc[-1]:,.0f}원")
+                    st.markdown(f"- **5일 평균**: {indicators['MA5'].iloc[-1]:,.0f}원")
+                    st.markdown(f"- **20일 평균**: {indicators['MA20'].iloc[-1]:,.0f}원")
+                    st.markdown(f"- **60일 평균**: {indicators['MA60'].iloc[-1]:,.0f}원")
         
-        # 원본 데이터 테이블
+        # 원본 데이터 테이블 (정렬/필터/페이지는 서버에서 처리하고 화면에는 현재 페이지만 전송)
+        data_key = (code, frame_signature(df))
         with st.expander("📋 원본 데이터", expanded=False):
-            display_df = df[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
-            display_df.columns = ['시가', '고가', '저가', '종가', '거래량']
-            st.dataframe(
-                display_df.sort_index(ascending=False),
-                use_container_width=True,
-                height=400
-            )
+            col1, col2, col3, col4, col5 = st.columns([1, 1.3, 2, 1, 1], vertical_alignment="bottom")
+            with col1:
+                sort_column = st.selectbox("정렬", options=SORT_COLUMNS, key='table_sort')
+            with col2:
+                ascending = st.radio("순서", ['내림차순', '오름차순'], horizontal=True, key='table_order') == '오름차순'
+            with col3:
+                first_day, last_day = df.index[0].date(), df.index[-1].date()
+                dates = st.date_input(
+                    "날짜 필터",
+                    value=(first_day, last_day),
+                    min_value=first_day,
+                    max_value=last_day
+                )
+            with col4:
+                page_size = st.selectbox("페이지 크기", options=PAGE_SIZES, index=1, key='table_page_size')
+            
+            positions = get_table_views().order(data_key, df, sort_column, ascending)
+            if len(dates) == 2:
+                positions = filter_dates(df, positions, *dates)
+            n_pages = page_count(len(positions), page_size)
+            with col5:
+                page_no = st.number_input(f"페이지 (전체 {n_pages:,})", min_value=1, max_value=n_pages, value=1)
+            
+            page = table_page(df, positions, page_no - 1, page_size)
+            with span("send_table"):
+                st.dataframe(page.rows, use_container_width=True, height=min(400, 35 * (len(page.rows) + 1) + 3))
+            payload("raw_table", page.rows.memory_usage(index=True).sum())
+            st.caption(f"{page.total:,}행 중 {page.first:,}~{page.last:,}행")
             
-            # CSV 다운로드
-            csv = display_df.to_csv(encoding='utf-8-sig')
+            # 내려받기 (버튼을 누를 때만 파일 생성, 형식을 바꿔도 이 조각만 다시 실행)
+            fmt = st.radio("형식", options=list(FORMATS), format_func=lambda f: FORMATS[f].label,
+                           horizontal=True, key='export_format')
+            start_date, end_date = st.session_state.start_date, st.session_state.end_date
+            export_key = (*data_key, start_date, end_date, fmt)
             st.download_button(
-                label="📥 CSV 다운로드",
-                data=csv,
-                file_name=f"{selected_name}_{selected_code}_{st.session_state.start_date}_{st.session_state.end_date}.csv",
-                mime="text/csv"
+                label=f"📥 {FORMATS[fmt].label} 다운로드",
+                data=deferred_export(export_key, df, fmt),
+                file_name=f"{name}_{code}_{start_date}_{end_date}.{FORMATS[fmt].extension}",
+                mime=FORMATS[fmt].mime,
+                on_click="ignore"
             )
+
+# ==================== 세션 상태 초기화 ====================
+
+def init_session_state():
+    """세션 상태 초기화"""
+    defaults = {
+        'selected_market': 'KOSPI',
+        'selected_stock_idx': 0,
+        'start_date': date.today() - timedelta(days=180),
+        'end_date': date.today(),
+        'show_volume': True,
+        'show_ma': True,
+        'show_bb': False,
+        'sub_indicators': [],
+        'timeframe': '자동',
+        'period_preset': '6개월',
+        'view_mode': VIEW_MODES[0],
+        'compare_top_n': 20,
+        'compare_rows': [],
+        'show_perf_panel': False,
+        'selected_code': None,
+        'selected_name': None,
+        'applied_selection': None,
+        'live_mode': False,
+        'live_interval': 30,
+        'live_rendered': None
+    }
+    
+    for key, value in defaults.items():
+        if key not in st.session_state:
+            st.session_state[key] = value
+
+init_session_state()
+
+# ==================== 사이드바 ====================
+
+with st.sidebar:
+    st.header("⚙️ 설정")
+    sidebar_selection()
+    
+    st.divider()
+    st.session_state.show_perf_panel = st.checkbox(
+        "🛠️ 성능 패널 표시",
+        value=st.session_state.show_perf_panel,
+        help="이번 재실행의 단계별 소요 시간, 캐시 적중, 전송 크기와 누적 p50/p99를 화면 아래에 표시합니다."
+    )
+
+selected_code = st.session_state.selected_code
+selected_name = st.session_state.selected_name
+
+# ==================== 메인 화면 ====================
+
+st.title("📈 주가 대시보드")
+
+if st.session_state.view_mode == '📊 종목 비교':
+    listing = load_stock_list(st.session_state.selected_market)
+    if listing is not None and len(listing) > 1:
+        with span("render_comparison"):
+            render_comparison(listing)
+    else:
+        st.error("종목 목록을 불러올 수 없습니다.")
+
+elif st.session_state.view_mode == '🔎 스크리너':
+    listing = load_stock_list(st.session_state.selected_market)
+    if listing is not None and len(listing) > 0:
+        with span("render_screener"):
+            render_screener(listing)
+    else:
+        st.error("종목 목록을 불러올 수 없습니다.")
+
+elif st.session_state.view_mode == '🧪 백테스트':
+    if selected_code:
+        listing = load_stock_list(st.session_state.selected_market)
+        if listing is not None:
+            with span("render_backtest"):
+                render_backtest(listing, selected_code, selected_name)
+        else:
+            st.error("종목 목록을 불러올 수 없습니다.")
+    else:
+        st.info("👈 왼쪽 사이드바에서 종목을 선택해주세요.")
+
+elif selected_code:
+    live = st.session_state.live_mode and st.session_state.end_date >= date.today()
+    if live:
+        # 새 봉을 먼저 받아 캐시에 붙여 두고, 이 버전으로 화면을 그렸다고 기록
+        st.session_state.live_rendered = get_market_data().live_version(
+            selected_code, st.session_state.live_interval
+        )
+    
+    # 데이터 로드
+    with st.spinner('데이터 로딩 중...'):
+        df = load_stock_data(
+            selected_code,
+            st.session_state.start_date,
+            st.session_state.end_date
+        )
+    
+    if df is not None and not df.empty:
+        # 통계 카드/상세 통계용 지표 (차트 지표는 차트 조각에서 옵션에 맞춰 계산)
+        indicators = calculate_indicators(df, selected_code, required_indicators())
+        with span("calculate_stats"):
+            stats = calculate_stats(df, indicators)
+        
+        if live:
+            st.fragment(watch_live, run_every=st.session_state.live_interval)(selected_code)
+        stock_header(selected_code, selected_name, stats)
+        st.divider()
+        chart_section(df, selected_code, selected_name)
+        detail_section(df, indicators, stats, selected_code, selected_name)
     
     else:
         st.warning("⚠️ 선택한 기간에 데이터가 없습니다.")
@@ -442,4 +950,9 @@ else:
 # ==================== 푸터 ====================
 
 st.divider()
-st.caption("💡 데이터 출처: FinanceDataReader | 실시간 데이터가 아닐 수 있습니다.")
\ No newline at end of file
+st.caption("💡 데이터 출처: FinanceDataReader | 실시간 데이터가 아닐 수 있습니다.")
+
+# 계측 종료 (성능 패널 자체를 그리는 시간은 제외)
+finished_rerun = get_metrics().finish()
+if st.session_state.show_perf_panel and finished_rerun is not None:
+    render_perf_panel(finished_rerun)
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+🧬 합성 시장 데이터 생성기
+- 시드만 같으면 항상 같은 OHLCV/종목 목록을 만들어 벤치마크/부하 테스트 결과를 비교할 수 있음
+- OHLCV: 1천 ~ 1백만 행 (기하 브라운 운동 종가 + 일중 변동), 영업일 인덱스
+- 종목 목록: 10 ~ 3,000개 종목 (한글 종목명, 시가총액 내림차순)
+- ReplayProvider 파일 구조로 저장하면 네트워크 없이 대시보드를 그대로 실행 가능
+
+    python synthetic_data.py --out replay_data --tickers 300 --rows 1500
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_END = "2025-12-30"  # 실행 날짜와 관계없이 같은 인덱스가 나오도록 고정
+
+# 종목명 조합용 음절 (초성 검색이 의미 있도록 실제 종목명처럼 한글로 구성)
+_NAME_HEADS = ['삼성', '현대', '엘지', '에스케이', '한화', '롯데', '포스코', '카카오', '네이버', '셀트',
+               '한국', '대한', '동양', '신한', '우리', '하나', '기아', '두산', '효성', '코오롱']
+_NAME_TAILS = ['전자', '화학', '바이오', '제약', '건설', '금융', '증권', '중공업', '에너지', '반도체',
+               '통신', '물산', '생명', '화재', '엔터', '게임즈', '모빌리티', '로직스', '테크', '소재']
+
+
+def business_days(rows, end=DEFAULT_END):
+    """end로 끝나는 영업일(월~금) rows개
+
+    1백만 행처럼 pandas 나노초 범위를 넘는 길이도 만들 수 있도록 초 단위로 생성합니다.
+    """
+    end = np.datetime64(pd.Timestamp(end).normalize().date(), "D")
+    n_weeks = rows // 5 + 2
+    days = end - np.arange(n_weeks * 7)[::-1]
+    weekday = (days.astype("int64") + 3) % 7  # 1970-01-01은 목요일 → 월요일=0
+    days = days[weekday < 5][-rows:]
+    return pd.DatetimeIndex(days.astype("datetime64[s]"), name="Date")
+
+
+def synthetic_ohlcv(rows, seed=0, end=DEFAULT_END, start_price=10_000.0):
+    """OHLCV DataFrame (FinanceDataReader와 같은 컬럼 구성)"""
+    rng = np.random.default_rng(seed)
+    log_returns = rng.normal(0.0003, 0.02, rows)
+    close = start_price * np.exp(np.cumsum(log_returns))
+    open_ = np.r_[start_price, close[:-1]] * (1 + rng.normal(0, 0.005, rows))
+    spread = np.abs(rng.normal(0, 0.01, rows))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.lognormal(12, 1, rows).astype(np.int64)
+    change = np.r_[np.nan, close[1:] / close[:-1] - 1]
+    return pd.DataFrame({
+        "Open": open_.round(), "High": high.round(), "Low": low.round(), "Close": close.round(),
+        "Volume": volume, "Change": change
+    }, index=business_days(rows, end))
+
+
+def synthetic_listing(n_tickers, market="KOSPI", seed=0):
+    """종목 목록 DataFrame (Code, Name, Market, Marcap), 시가총액 내림차순"""
+    rng = np.random.default_rng(seed)
+    base = {"KOSPI": 0, "KOSDAQ": 100_000, "KONEX": 200_000}.get(market, 300_000)
+    codes = [f"{base + i * 7 + 10:06d}" for i in range(n_tickers)]
+    heads = rng.integers(0, len(_NAME_HEADS), n_tickers)
+    tails = rng.integers(0, len(_NAME_TAILS), n_tickers)
+    names = [f"{_NAME_HEADS[h]}{_NAME_TAILS[t]}" for h, t in zip(heads, tails)]
+    # 같은 이름이 나오면 번호를 붙여 구분
+    seen = {}
+    for i, name in enumerate(names):
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            names[i] = f"{name}{seen[name]}"
+    marcap = np.sort(rng.lognormal(26, 1.5, n_tickers))[::-1].astype(np.int64)
+    return pd.DataFrame({"Code": codes, "Name": names, "Market": market, "Marcap": marcap})
+
+
+def write_replay(root, tickers=50, rows=1_500, markets=("KOSPI", "KOSDAQ", "KONEX"), seed=0):
+    """ReplayProvider 파일 구조로 저장 ({root}/listing/{market}.csv, {root}/ohlcv/{code}.csv)
+
+    대시보드 기본 기간(최근 N개월)에 데이터가 있도록 일봉은 오늘 날짜로 끝납니다.
+    """
+    os.makedirs(os.path.join(root, "listing"), exist_ok=True)
+    os.makedirs(os.path.join(root, "ohlcv"), exist_ok=True)
+    for m, market in enumerate(markets):
+        listing = synthetic_listing(tickers, market, seed + m)
+        listing.to_csv(os.path.join(root, "listing", f"{market}.csv"), index=False)
+        for i, code in enumerate(listing["Code"]):
+            df = synthetic_ohlcv(rows, seed=seed * 100_000 + m * 10_000 + i, end="today")
+            df.to_csv(os.path.join(root, "ohlcv", f"{code}.csv"))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="재생용 합성 시장 데이터 생성")
+    parser.add_argument("--out", required=True, help="저장 폴더 (STOCK_REPLAY_DIR로 사용)")
+    parser.add_argument("--tickers", type=int, default=50, help="시장별 종목 수")
+    parser.add_argument("--rows", type=int, default=1_500, help="종목별 일봉 수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_replay(args.out, args.tickers, args.rows, seed=args.seed)
+    print(f"{args.out}: 시장별 {args.tickers}개 종목 × {args.rows}행")
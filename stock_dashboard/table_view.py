@@ -0,0 +1,107 @@
+"""
+📋 원본 데이터 표 (서버 쪽 정렬 / 필터 / 페이지 나누기)
+- 정렬 결과는 DataFrame 복사본 대신 행 위치 배열만 (데이터, 정렬 컬럼, 방향)별로 한 번 만들어 보관
+- 날짜 필터는 정렬된 거래일 인덱스에서 이분 탐색으로 구간을 찾고 위치 배열에서 걸러냄
+- 화면에는 현재 페이지 행만 잘라 보내므로, 5년치나 여러 종목 표도 조작할 때마다 전체를 다시 보내지 않음
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from export import EXPORT_COLUMNS
+
+DATE_COLUMN = '날짜'
+SORT_COLUMNS = [DATE_COLUMN] + list(EXPORT_COLUMNS.values())
+PAGE_SIZES = [20, 50, 100, 200]
+_SOURCE_COLUMNS = {label: column for column, label in EXPORT_COLUMNS.items()}
+
+
+@dataclass
+class TablePage:
+    rows: pd.DataFrame  # 현재 페이지 행 (한글 컬럼명)
+    total: int          # 필터를 통과한 전체 행 수
+    page: int           # 0부터 시작
+    n_pages: int
+    first: int          # 현재 페이지 첫 행 번호 (1부터, 행이 없으면 0)
+    last: int
+
+
+class TableViews:
+    """정렬 순서(행 위치 배열) LRU 캐시 (세션 간 공유)
+
+    위치 배열은 행 수 × 8바이트라 5년치(약 1,250행)도 10KB 정도입니다.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._orders = OrderedDict()  # (데이터 키, 정렬 컬럼, 오름차순 여부) -> 위치 배열
+        self._lock = threading.Lock()
+
+    def order(self, key, df, column=DATE_COLUMN, ascending=False):
+        """정렬된 행 위치 배열 (key는 같은 데이터면 같은 값, 예: (종목코드, frame_signature(df)))"""
+        order_key = (key, column, ascending)
+        with self._lock:
+            positions = self._orders.get(order_key)
+            if positions is not None:
+                self._orders.move_to_end(order_key)
+                metrics.cache_event("table_order", "hit")
+                return positions
+
+        metrics.cache_event("table_order", "miss")
+        positions = sort_positions(df, column, ascending)
+
+        with self._lock:
+            self._orders[order_key] = positions
+            self._orders.move_to_end(order_key)
+            while len(self._orders) > self.max_entries:
+                self._orders.popitem(last=False)
+        return positions
+
+    def clear(self):
+        with self._lock:
+            self._orders.clear()
+
+
+def sort_positions(df, column=DATE_COLUMN, ascending=False):
+    """column 기준 정렬 순서 (날짜는 이미 정렬된 인덱스라 계산 없이 뒤집기만 함)"""
+    n = len(df)
+    if column == DATE_COLUMN:
+        positions = np.arange(n) if ascending else np.arange(n)[::-1]
+    else:
+        # 같은 값은 날짜순을 유지하고 NaN은 방향과 관계없이 맨 뒤
+        # (안정 정렬을 뒤집으면 둘 다 깨지므로 내림차순은 부호를 바꿔 정렬, -NaN도 NaN이라 맨 뒤)
+        values = df[_SOURCE_COLUMNS[column]].to_numpy(dtype=float)
+        positions = np.argsort(values if ascending else -values, kind='stable')
+    positions = np.ascontiguousarray(positions)
+    positions.flags.writeable = False  # 여러 세션이 공유하므로 읽기 전용
+    return positions
+
+
+def filter_dates(df, positions, start=None, end=None):
+    """[start, end] 날짜 구간에 있는 행만 남긴 위치 배열 (정렬 순서는 그대로)"""
+    lo = 0 if start is None else df.index.searchsorted(pd.Timestamp(start))
+    hi = len(df) if end is None else df.index.searchsorted(pd.Timestamp(end), side='right')
+    if lo == 0 and hi == len(df):
+        return positions
+    return positions[(positions >= lo) & (positions < hi)]
+
+
+def page_count(total, page_size):
+    return max(1, -(-total // page_size))
+
+
+def table_page(df, positions, page=0, page_size=50):
+    """위치 배열에서 page번째 페이지 행만 잘라 한글 컬럼명으로 (범위를 벗어난 page는 끝 페이지로)"""
+    total = len(positions)
+    n_pages = page_count(total, page_size)
+    page = min(max(page, 0), n_pages - 1)
+    chosen = positions[page * page_size:(page + 1) * page_size]
+    rows = df.iloc[chosen][list(EXPORT_COLUMNS)].rename(columns=EXPORT_COLUMNS)
+    rows.index.name = DATE_COLUMN
+    first = page * page_size + 1 if len(chosen) else 0
+    return TablePage(rows, total, page, n_pages, first, first + len(chosen) - 1 if len(chosen) else 0)
@@ -0,0 +1,64 @@
+"""
+🧪 테스트 공용 준비물
+- 대시보드 모듈은 stock_dashboard 폴더에서 바로 import하므로 상위 폴더를 경로에 추가
+- 네트워크 없이 합성 재생 데이터(synthetic_data)와 임시 저장소로 MarketData를 만듦
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from market_data import MarketData  # noqa: E402
+from ohlcv_store import OHLCVStore  # noqa: E402
+from providers import ReplayProvider  # noqa: E402
+from synthetic_data import synthetic_listing, synthetic_ohlcv, write_replay  # noqa: E402
+
+@pytest.fixture
+def codes():
+    return list(synthetic_listing(5)["Code"])
+
+
+@pytest.fixture
+def missing_code():
+    """재생 데이터에 없는 종목 (상장폐지/데이터 없음)"""
+    return "999999"
+
+
+@pytest.fixture
+def pool():
+    """스크리너/백테스트용 작업 풀 (1개 스레드라 결과 순서가 일정함)"""
+    with ThreadPoolExecutor(1) as executor:
+        yield executor
+
+
+@pytest.fixture
+def market_data(tmp_path):
+    write_replay(str(tmp_path / "replay"), tickers=5, rows=300, markets=("KOSPI",))
+    md = MarketData(
+        provider=ReplayProvider(str(tmp_path / "replay")),
+        store=OHLCVStore(str(tmp_path / "store"))
+    )
+    yield md
+    md._executor.shutdown(wait=True)
+
+
+class RecordingFetch:
+    """Provider.ohlcv 흉내: 요청한 (start, end)를 기록하고 frame에서 잘라 반환"""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.calls = []
+
+    def __call__(self, code, start, end):
+        self.calls.append((pd.Timestamp(start), pd.Timestamp(end)))
+        return self.frame.loc[start:end].copy()
+
+
+@pytest.fixture
+def recording_fetch():
+    return RecordingFetch(synthetic_ohlcv(400, end="today"))
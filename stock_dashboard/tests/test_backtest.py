@@ -0,0 +1,14 @@
+import pandas as pd
+
+from backtest import Backtester
+
+
+def test_sweep_many_skips_empty_ticker(market_data, codes, missing_code, pool):
+    end = pd.Timestamp("today").normalize()
+    chunk = [codes[0], missing_code] + codes[1:]
+    table = Backtester(market_data, chunk_size=len(chunk), pool=pool).sweep_many(
+        chunk, end - pd.Timedelta(days=180), end, windows=(5, 20, 60)
+    )
+
+    assert list(table['code'].unique()) == codes
+    assert len(table) == len(codes) * 3
@@ -0,0 +1,63 @@
+import io
+import os
+import time
+
+import pandas as pd
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from export import FORMATS, BulkExports
+
+
+@pytest.fixture
+def period():
+    end = pd.Timestamp("today").normalize()
+    return end - pd.Timedelta(days=90), end
+
+
+@pytest.fixture
+def exports(market_data, tmp_path):
+    return BulkExports(market_data, out_dir=str(tmp_path / "exports"), chunk_size=2, max_jobs=2)
+
+
+def wait(job, timeout=10):
+    deadline = time.time() + timeout
+    while job.running and time.time() < deadline:
+        time.sleep(0.01)
+    assert job.finished and job.error is None
+
+
+@pytest.mark.parametrize("fmt", list(FORMATS))
+def test_bulk_export_file_is_accepted_by_download_button(exports, codes, period, fmt):
+    job = exports.start(codes, *period, fmt)
+    wait(job)
+    assert job.done == job.total == len(codes)
+
+    with job.open() as f:
+        raw, _ = convert_data_to_bytes_and_infer_mime(f, TypeError("지원하지 않는 data"))
+
+    if fmt == 'parquet':
+        table = pd.read_parquet(io.BytesIO(raw))
+    else:
+        table = pd.read_csv(io.BytesIO(raw), encoding='utf-8-sig', dtype={'종목코드': str},
+                            compression='gzip' if fmt == 'csv.gz' else None)
+    assert list(table['종목코드'].unique()) == codes
+    assert list(table.columns[:2]) == ['종목코드', '날짜']
+
+
+def test_same_request_reuses_job_and_old_files_are_removed(exports, codes, period):
+    job = exports.start(codes, *period, 'csv')
+    wait(job)
+    assert exports.start(codes, *period, 'csv') is job
+
+    for n in (2, 3, 4):
+        wait(exports.start(codes[:n], *period, 'csv'))
+    exports.start(codes[:1], *period, 'csv')
+    assert exports.get(job.key) is None and not os.path.exists(job.path)
+
+
+def test_bulk_export_does_not_fill_range_cache(exports, market_data, codes, period):
+    wait(exports.start(codes, *period, 'csv'))
+
+    assert all(market_data.cache.intervals(code) == [] for code in codes)
+    assert all(market_data.store.coverage(code) is not None for code in codes)
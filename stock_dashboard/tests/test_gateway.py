@@ -0,0 +1,134 @@
+import functools
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+import requests
+
+from gateway import CircuitBreaker, CircuitOpenError, FetchGateway, GatewayProvider, RetryBudget
+from market_data import MarketData
+from ohlcv_store import OHLCVStore
+from providers import HttpProvider
+from synthetic_data import write_replay
+
+
+class StubServer:
+    """재생 데이터 폴더를 내려주는 로컬 HTTP 서버 (status를 정하면 모든 요청에 그 오류로 응답)"""
+
+    def __init__(self, root):
+        self.hits = 0
+        self.status = None
+        stub = self
+
+        class Handler(SimpleHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits += 1
+                if stub.status:
+                    self.send_error(stub.status)
+                else:
+                    super().do_GET()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=root))
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub(tmp_path):
+    write_replay(str(tmp_path / "replay"), tickers=3, rows=300, markets=("KOSPI",))
+    server = StubServer(str(tmp_path / "replay"))
+    yield server
+    server.close()
+
+
+def gateway_provider(stub, **kwargs):
+    kwargs.setdefault("backoff", 0.0)
+    return GatewayProvider(HttpProvider(stub.base_url), FetchGateway(**kwargs))
+
+
+def test_rate_limit_spaces_out_requests(stub):
+    provider = gateway_provider(stub, rate=20.0, burst=1)
+
+    started = time.monotonic()
+    for _ in range(6):
+        provider.listing("KOSPI")
+
+    # 첫 요청 뒤로는 1/20초마다 하나씩
+    assert time.monotonic() - started >= 5 / 20 * 0.9
+    assert stub.hits == 6
+
+
+def test_retry_budget_exhaustion_stops_retrying(stub):
+    provider = gateway_provider(
+        stub, max_retries=5, retry_budget=RetryBudget(ratio=0.0, max_tokens=2),
+        breaker=CircuitBreaker(failure_threshold=100)
+    )
+    stub.status = 503
+
+    with pytest.raises(requests.HTTPError):
+        provider.listing("KOSPI")
+    assert stub.hits == 3  # 첫 요청 + 예산 2개만큼 재시도
+
+    with pytest.raises(requests.HTTPError):
+        provider.listing("KOSPI")
+    assert stub.hits == 4  # 예산이 없으니 재시도 없음
+    assert provider.gateway.counters["retries"] == 2
+
+
+def test_breaker_opens_and_goes_half_open(stub):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    provider = gateway_provider(stub, max_retries=0, breaker=breaker)
+    stub.status = 503
+
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            provider.listing("KOSPI")
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        provider.listing("KOSPI")
+    assert stub.hits == 2  # 열려 있는 동안은 원격 호출 없음
+
+    # reset_timeout 뒤 시험 호출 하나 → 실패하면 다시 열림
+    time.sleep(0.25)
+    with pytest.raises(requests.HTTPError):
+        provider.listing("KOSPI")
+    assert breaker.state == CircuitBreaker.OPEN and stub.hits == 3
+
+    # 서버가 복구된 뒤의 시험 호출이 성공하면 닫힘
+    stub.status = None
+    time.sleep(0.25)
+    assert not provider.listing("KOSPI").empty
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_market_data_falls_back_to_store_when_breaker_is_open(stub, tmp_path):
+    provider = gateway_provider(stub, max_retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    md = MarketData(provider=provider, store=OHLCVStore(str(tmp_path / "store")), min_span=pd.Timedelta(days=30))
+    code = provider.listing("KOSPI")["Code"][0]
+    today = pd.Timestamp("today").normalize()
+
+    try:
+        stored = md.ohlcv(code, today - pd.Timedelta(days=30), today)
+        stub.status = 503
+        with pytest.raises(requests.HTTPError):
+            md.ohlcv(code, today - pd.Timedelta(days=90), today)  # 여기서 회로가 열림
+
+        hits = stub.hits
+        df = md.ohlcv(code, today - pd.Timedelta(days=60), today)
+        assert stub.hits == hits
+        assert df.equals(stored)  # 저장소에 있는 만큼만
+        assert md.metrics()["breaker_fallback"] == 1
+        assert md.cache.get(code, today - pd.Timedelta(days=60), today) is None  # 복구 뒤 다시 조회하도록 캐시에는 없음
+    finally:
+        md._executor.shutdown(wait=True)
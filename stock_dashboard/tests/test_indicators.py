@@ -0,0 +1,24 @@
+import numpy as np
+
+from indicators import IndicatorEngine, compute_indicators
+from synthetic_data import synthetic_ohlcv
+
+
+def test_append_extends_indicators_not_requested_by_caller():
+    df = synthetic_ohlcv(500)
+    engine = IndicatorEngine()
+    # 차트(BB/RSI/MACD)와 통계(Daily_Return/MA)가 서로 다른 목록으로 호출
+    engine.compute("A", df.iloc[:-1], ("BB", "RSI", "MACD"))
+    engine.compute("A", df, ("Daily_Return", "MA"))
+
+    memo = next(iter(engine._memo.values()))
+    assert {"BB", "RSI", "MACD", "Daily_Return", "MA"} <= memo.names
+    assert len(memo.values["BB_Upper"]) == len(df)
+
+    before = dict(memo.values)
+    result = engine.compute("A", df, ("BB", "RSI", "MACD"))
+    # 통계 쪽 호출에서 이미 이어 붙였으므로 다시 계산하지 않음
+    assert all(engine._memo[next(iter(engine._memo))].values[c] is before[c] for c in result.columns)
+
+    expected = compute_indicators(df, ("BB", "RSI", "MACD"))
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-9, equal_nan=True)
@@ -0,0 +1,69 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from market_data import MarketData
+from ohlcv_store import OHLCVStore
+from providers import ReplayProvider
+from synthetic_data import write_replay
+
+
+def test_refresh_of_other_range_is_not_merged_into_in_flight_one(tmp_path, codes):
+    write_replay(str(tmp_path / "replay"), tickers=5, rows=300, markets=("KOSPI",))
+    md = MarketData(
+        provider=ReplayProvider(str(tmp_path / "replay"), latency=(0.2, 0.2)),
+        store=OHLCVStore(str(tmp_path / "store"))
+    )
+    code, today = codes[0], pd.Timestamp("today").normalize()
+    range_a = (today - pd.Timedelta(days=400), today - pd.Timedelta(days=200))
+    range_b = (today - pd.Timedelta(days=100), today)
+
+    try:
+        a = md.revalidate(code, *range_a)
+        assert md.revalidate(code, *range_a) is a  # 같은 구간은 진행 중인 갱신을 재사용
+        b = md.revalidate(code, *range_b)
+        assert b is not a
+        a.result(), b.result()
+        assert md.cache.get(code, *range_b) is not None
+    finally:
+        md._executor.shutdown(wait=True)
+
+
+class CountingProvider(ReplayProvider):
+    """ohlcv 호출 수를 세는 느린 재생 Provider"""
+
+    def __init__(self, root):
+        super().__init__(root, latency=(0.3, 0.3))
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def ohlcv(self, code, start, end):
+        with self._lock:
+            self.calls += 1
+        return super().ohlcv(code, start, end)
+
+
+def test_concurrent_misses_share_one_fetch(tmp_path, codes):
+    write_replay(str(tmp_path / "replay"), tickers=5, rows=300, markets=("KOSPI",))
+    provider = CountingProvider(str(tmp_path / "replay"))
+    md = MarketData(provider=provider, store=OHLCVStore(str(tmp_path / "store")))
+    today = pd.Timestamp("today").normalize()
+    n = 8
+    barrier = threading.Barrier(n)
+
+    def request(_):
+        barrier.wait()
+        return md.ohlcv(codes[0], today - pd.Timedelta(days=90), today)
+
+    try:
+        with ThreadPoolExecutor(n) as pool:
+            frames = list(pool.map(request, range(n)))
+    finally:
+        md._executor.shutdown(wait=True)
+
+    assert provider.calls == 1
+    metrics = md.metrics()
+    assert metrics["flight_executed"] == 1
+    assert metrics["flight_shared"] == n - 1
+    assert all(df.equals(frames[0]) for df in frames)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from ohlcv_store import OHLCVStore
+
+TODAY = pd.Timestamp("today").normalize()
+
+
+def test_revised_history_is_refetched_in_full(tmp_path, recording_fetch):
+    revised = []
+    store = OHLCVStore(str(tmp_path), on_revised=revised.append)
+    start = TODAY - pd.Timedelta(days=200)
+    store.get("A", start, TODAY - pd.Timedelta(days=30), recording_fetch)
+
+    # 1:2 액면분할 → 과거 가격 전체가 절반으로 수정됨
+    split = recording_fetch.frame.copy()
+    split[['Open', 'High', 'Low', 'Close']] /= 2
+    recording_fetch.frame = split
+    recording_fetch.calls.clear()
+
+    df = store.get("A", start, TODAY, recording_fetch)
+
+    assert recording_fetch.calls[-1] == (start, TODAY)
+    assert revised == ["A"]
+    np.testing.assert_allclose(df['Close'].to_numpy(), split.loc[start:TODAY, 'Close'].to_numpy())
+    stored, _ = store.read("A")
+    np.testing.assert_allclose(stored['Close'].to_numpy(), split.loc[start:TODAY, 'Close'].to_numpy())
+
+
+def test_unchanged_history_only_fetches_tail(tmp_path, recording_fetch):
+    store = OHLCVStore(str(tmp_path), on_revised=lambda code: None)
+    start = TODAY - pd.Timedelta(days=200)
+    store.get("A", start, TODAY - pd.Timedelta(days=30), recording_fetch)
+    recording_fetch.calls.clear()
+
+    store.get("A", start, TODAY, recording_fetch)
+
+    assert recording_fetch.calls == [(TODAY - pd.Timedelta(days=30), TODAY)]  # 마지막 저장일부터
+
+
+def test_second_get_fetches_only_uncovered_head_and_tail(tmp_path, recording_fetch):
+    store = OHLCVStore(str(tmp_path))
+    store.get("A", TODAY - pd.Timedelta(days=200), TODAY - pd.Timedelta(days=30), recording_fetch)
+    assert recording_fetch.calls == [(TODAY - pd.Timedelta(days=200), TODAY - pd.Timedelta(days=30))]
+    recording_fetch.calls.clear()
+
+    df = store.get("A", TODAY - pd.Timedelta(days=300), TODAY, recording_fetch)
+
+    assert recording_fetch.calls == [
+        (TODAY - pd.Timedelta(days=300), TODAY - pd.Timedelta(days=201)),  # 앞쪽에 빠진 구간
+        (TODAY - pd.Timedelta(days=30), TODAY),                            # 마지막 저장일부터
+    ]
+    assert df.equals(recording_fetch.frame.loc[TODAY - pd.Timedelta(days=300):TODAY])
+
+    # 이미 받은 구간 안쪽은 다시 받지 않음
+    recording_fetch.calls.clear()
+    store.get("A", TODAY - pd.Timedelta(days=250), TODAY - pd.Timedelta(days=10), recording_fetch)
+    assert recording_fetch.calls == []
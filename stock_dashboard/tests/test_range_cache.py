@@ -0,0 +1,20 @@
+from range_cache import RangeCache, _frame_bytes
+from synthetic_data import synthetic_ohlcv
+
+
+def test_least_recently_used_ticker_is_evicted():
+    df = synthetic_ohlcv(250, end="2024-12-31")
+    start, end = df.index[0], df.index[-1]
+    cache = RangeCache(max_bytes=_frame_bytes(df) * 2)
+
+    cache.put("A", start, end, df)
+    cache.put("B", start, end, df)
+    assert cache.get("A", start, end) is not None  # A를 최근 사용으로
+    cache.put("C", start, end, df)
+
+    assert cache.intervals("B") == []
+    assert cache.get("A", start, end) is not None and cache.get("C", start, end) is not None
+    assert cache.total_bytes == _frame_bytes(df) * 2
+
+    cache.clear("A")
+    assert cache.total_bytes == _frame_bytes(df)
@@ -0,0 +1,21 @@
+import pandas as pd
+import pytest
+
+from screener import Screener
+
+
+@pytest.fixture
+def period():
+    end = pd.Timestamp("today").normalize()
+    return end - pd.Timedelta(days=180), end
+
+
+def test_empty_ticker_is_skipped(market_data, codes, missing_code, pool, period):
+    chunk = codes[:2] + [missing_code] + codes[2:]
+    table = Screener(market_data, chunk_size=len(chunk), pool=pool).run(chunk, *period)
+
+    assert list(table.index) == codes
+    # 데이터 없는 종목은 coverage만 남고 다시 조회하지 않음
+    df, coverage = market_data.store.read(missing_code)
+    assert df.empty and coverage is not None
+    assert market_data.store.read_columns(missing_code, ('Close',)) is None
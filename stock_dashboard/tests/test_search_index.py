@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from search_index import SearchIndex
+
+
+@pytest.fixture
+def index():
+    # 행 순서 = 시가총액 순위
+    stocks = pd.DataFrame([
+        ("005930", "삼성전자"),
+        ("000660", "SK하이닉스"),
+        ("066570", "LG전자"),
+        ("006400", "삼성SDI"),
+        ("004170", "신세계"),
+        ("004690", "삼천리"),
+        ("056000", "전자랜드"),
+        ("028260", "삼성물산"),
+    ], columns=["Code", "Name"])
+    return SearchIndex(stocks)
+
+
+def test_choseong_query(index):
+    assert index.search("ㅅㅅㅈㅈ") == [0]
+    assert index.search("ㅅㅅ") == [0, 3, 4, 7]
+    assert index.search("ㅅㅅ", limit=2) == [0, 3]
+
+
+def test_mixed_hangul_and_choseong_query(index):
+    assert index.search("삼성ㅈㅈ") == [0]
+    assert index.search("ㅅ성") == [0, 3, 7]  # 신세계(ㅅㅅㄱ)는 두 번째 글자가 달라 제외
+    assert index.search("삼ㅊ리") == [5]
+    assert index.search("ㅅ성ㄱ") == []
+
+
+def test_prefix_matches_come_first(index):
+    assert index.search("전자") == [6, 0, 2]
+    assert index.search("ㅈㅈ") == [6, 0, 2]
+    assert index.search("ㅈ자") == [6, 0, 2]
+    assert index.search("0665") == [2]
+    assert index.search("00") == [0, 1, 3, 4, 5, 6]  # 코드 접두어 다음 코드 중간 일치
@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from gateway import CircuitOpenError
+from security_master import SecurityMaster, sort_listing
+from synthetic_data import synthetic_listing
+
+
+def test_failed_reload_keeps_serving_old_listing():
+    calls = []
+
+    def load(market):
+        calls.append(market)
+        if len(calls) > 1:
+            raise CircuitOpenError("열림")
+        return sort_listing(synthetic_listing(5, market))
+
+    master = SecurityMaster(load, ttl=60, retry_backoff=30)
+    first = master.market("KOSPI")
+    master._loaded_at["KOSPI"] -= 120  # 만료
+
+    assert master.market("KOSPI") is first
+    assert master.market("KOSPI") is first  # 재시도 대기 중에는 다시 부르지 않음
+    assert len(calls) == 2
+
+    master._retry_at["KOSPI"] -= 60
+    with pytest.raises(CircuitOpenError):
+        master.reload("KOSPI")  # 직접 reload는 실패를 알림
+
+
+def test_slow_listing_does_not_block_other_markets():
+    started, release = threading.Event(), threading.Event()
+
+    def load(market):
+        if market == "KOSDAQ":
+            started.set()
+            release.wait(10)
+        return sort_listing(synthetic_listing(5, market))
+
+    master = SecurityMaster(load)
+    worker = threading.Thread(target=master.market, args=("KOSDAQ",))
+    worker.start()
+    assert started.wait(5)
+    lookup = threading.Thread(target=master.market, args=("KOSPI",))
+    lookup.start()
+    lookup.join(2)
+    blocked = lookup.is_alive()
+    release.set()
+    worker.join()
+    lookup.join()
+
+    assert not blocked
+    assert len(master.market("KOSPI")) == 5 and len(master.market("KOSDAQ")) == 5
+
+
+def test_refresh_ahead_failure_keeps_listing_and_backs_off():
+    calls = []
+
+    def load(market):
+        calls.append(market)
+        if len(calls) > 1:
+            raise ConnectionError("네트워크 오류")
+        return sort_listing(synthetic_listing(5, market))
+
+    master = SecurityMaster(load, ttl=60, retry_backoff=30)
+    first = master.market("KOSPI")
+    assert master.refresh_ahead("KOSPI") is first and len(calls) == 1  # 아직 ttl/2 전
+
+    master._loaded_at["KOSPI"] -= 40
+    assert master.refresh_ahead("KOSPI") is first
+    assert master.refresh_ahead("KOSPI") is first
+    assert len(calls) == 2  # 재시도 대기 중에는 다시 부르지 않음
+
+
+def test_warmup_keeps_prefetching_when_listing_refresh_fails(market_data, codes):
+    from warmup import CacheWarmer
+
+    fail = []
+
+    def load(market):
+        if fail:
+            raise ConnectionError("네트워크 오류")
+        return sort_listing(market_data.listing(market))
+
+    master = SecurityMaster(load, ttl=60)
+    master.market("KOSPI")
+    master._loaded_at["KOSPI"] -= 40
+    fail.append(True)
+
+    CacheWarmer(market_data, master, top_n=2, markets=("KOSPI",)).run_once()
+
+    assert all(market_data.cache.intervals(code) for code in master.market("KOSPI").codes[:2])
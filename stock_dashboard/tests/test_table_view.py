@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from table_view import TableViews, sort_positions, table_page
+
+
+@pytest.fixture
+def df():
+    index = pd.date_range("2024-01-01", periods=6, freq="D", name="Date")
+    close = [10.0, np.nan, 30.0, 10.0, 30.0, 20.0]
+    return pd.DataFrame({
+        "Open": close, "High": close, "Low": close, "Close": close, "Volume": [1, 2, 3, 4, 5, 6]
+    }, index=index)
+
+
+@pytest.mark.parametrize("ascending, expected", [
+    (True, [0, 3, 5, 2, 4, 1]),
+    (False, [2, 4, 5, 0, 3, 1]),
+])
+def test_ties_keep_date_order_and_nan_goes_last(df, ascending, expected):
+    assert list(sort_positions(df, '종가', ascending)) == expected
+
+
+def test_date_column_and_page(df):
+    assert list(sort_positions(df, '날짜', ascending=False)) == [5, 4, 3, 2, 1, 0]
+    positions = TableViews().order("k", df, '종가', ascending=False)
+    page = table_page(df, positions, page=1, page_size=4)
+    assert list(page.rows.index.day) == [4, 2]
+    assert (page.total, page.n_pages, page.first, page.last) == (6, 2, 5, 6)
@@ -0,0 +1,132 @@
+"""
+🔥 캐시 워밍업 / 주기적 선조회
+- 서버가 뜰 때와 이후 일정 주기마다 세 시장 종목 목록을 미리 불러옴
+- 시장별 시가총액 상위 N개 종목의 기본 프리셋(6개월) 구간을 미리 조회해 캐시를 채움
+- 첫 화면(KOSPI 시총 1위, 6개월)은 항상 캐시에서 바로 응답
+- 배포 전에 로컬 저장소를 채워 둘 때는 명령행으로 실행
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from security_master import MARKETS
+
+DEFAULT_TOP_N = int(os.environ.get("STOCK_WARMUP_TOP_N", "20"))
+# 오늘 봉 만료(5분)보다 짧게 돌아야 인기 종목이 식지 않음
+DEFAULT_INTERVAL = float(os.environ.get("STOCK_WARMUP_INTERVAL", "240"))
+DEFAULT_PRESET_DAYS = 180  # 기본 프리셋 '6개월'
+
+logger = logging.getLogger(__name__)
+
+
+class CacheWarmer:
+    """종목 목록 + 시총 상위 종목 OHLCV를 주기적으로 미리 불러오는 백그라운드 작업
+
+    market_data: MarketData, master: SecurityMaster
+    on_loaded(code, df): 종목 데이터를 불러온 뒤 호출 (지표 미리 계산 등, 선택)
+    """
+
+    def __init__(self, market_data, master, top_n=DEFAULT_TOP_N, interval=DEFAULT_INTERVAL,
+                 preset_days=DEFAULT_PRESET_DAYS, markets=MARKETS, on_loaded=None):
+        self.market_data = market_data
+        self.master = master
+        self.top_n = top_n
+        self.interval = interval
+        self.preset_days = preset_days
+        self.markets = markets
+        self.on_loaded = on_loaded
+        self.runs = 0
+        self.last_run = None  # (시작 시각, 소요 시간, 불러온 종목 수, 실패 종목 수)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _load_listing(self, market):
+        """종목 목록 + 라벨/검색 인덱스 준비
+
+        목록은 ttl의 절반이 지나면 미리 교체해서 사용자 요청이 다시 불러오는 일이 없게 함
+        (교체에 실패하면 기존 목록으로 계속 진행하고, 다음 시도는 SecurityMaster의 재시도 대기를 따름)
+        """
+        listing = self.master.refresh_ahead(market)
+        listing.labels()
+        _ = listing.search_index  # 검색 인덱스 미리 생성
+        return listing
+
+    def run_once(self):
+        """종목 목록 → 시총 상위 종목 기본 구간 순으로 한 번 워밍업 (KOSPI 1위가 맨 먼저)"""
+        started = time.time()
+        codes = []
+        for market in self.markets:
+            try:
+                listing = self._load_listing(market)
+            except Exception:
+                logger.exception("%s 종목 목록 워밍업 실패", market)
+                continue
+            codes.extend(listing.codes[:self.top_n])
+
+        end = pd.Timestamp(date.today())
+        start = end - timedelta(days=self.preset_days)
+        # 이미 캐시에 있는 종목은 만료되기 전에 마지막 봉만 다시 받아 두고, 없는 종목은 새로 조회
+        cached = {code for code in codes if self.market_data.cache.get(code, start, end) is not None}
+        missing = [code for code in codes if code not in cached]
+        refreshing = {code: self.market_data.revalidate(code, start, end) for code in cached}
+        results, errors = self.market_data.ohlcv_many(missing, start, end, timeout=60.0)
+        for code, future in refreshing.items():
+            try:
+                results[code] = future.result(timeout=60.0).loc[start:end]
+            except Exception as e:
+                errors[code] = e
+        if self.on_loaded is not None:
+            for code, df in results.items():
+                if not df.empty:
+                    self.on_loaded(code, df)
+
+        self.runs += 1
+        self.last_run = (started, time.time() - started, len(results), len(errors))
+        logger.info("워밍업 %d회차: %d개 종목, 실패 %d개, %.1f초",
+                    self.runs, len(results), len(errors), self.last_run[1])
+        return results, errors
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("워밍업 실패")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """백그라운드 스레드 시작 (이미 돌고 있으면 무시)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name="cache-warmer", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+if __name__ == "__main__":
+    # 배포 전 로컬 저장소 채우기
+    # 예) python warmup.py --top 50
+    import argparse
+
+    from market_data import MarketData
+    from security_master import SecurityMaster, sort_listing
+
+    parser = argparse.ArgumentParser(description="시총 상위 종목 OHLCV 미리 불러오기")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_N, help="시장별 시총 상위 N개 종목")
+    parser.add_argument("--days", type=int, default=DEFAULT_PRESET_DAYS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    market_data = MarketData()
+    master = SecurityMaster(lambda market: sort_listing(market_data.listing(market)))
+    CacheWarmer(market_data, master, top_n=args.top, preset_days=args.days).run_once()